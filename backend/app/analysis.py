@@ -0,0 +1,182 @@
+"""Resume analysis pipeline.
+
+Uploads are streamed to a temporary file in fixed-size chunks, then text
+extraction and scoring run in a bounded process pool so a large PDF never
+blocks the event loop or holds the GIL other requests need.
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from fastapi import UploadFile
+from sqlalchemy.orm import Session
+
+from .cache import resume_cache
+from .database import run_db
+from .extract import extract_text
+from .scoring import score_text
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 64 * 1024
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", str(min(4, os.cpu_count() or 1))))
+# "process" isolates CPU-heavy parsing from the event loop; "thread" is
+# cheaper on memory-constrained hosts and handy for debugging.
+ANALYSIS_EXECUTOR = os.getenv("ANALYSIS_EXECUTOR", "process")
+# Analyses in flight per process, synchronous and queued together. Past
+# this, /api/resume/analyze answers 503 rather than letting the pool's
+# backlog (and every waiting upload's temp file) grow without bound.
+ANALYSIS_MAX_CONCURRENT = int(os.getenv("ANALYSIS_MAX_CONCURRENT", str(ANALYSIS_WORKERS * 2)))
+
+_executor: Optional[Executor] = None
+_slots = threading.BoundedSemaphore(ANALYSIS_MAX_CONCURRENT)
+
+
+class AnalysisBusy(Exception):
+    pass
+
+
+def try_acquire_slot() -> bool:
+    return _slots.acquire(blocking=False)
+
+
+def release_slot() -> None:
+    _slots.release()
+
+
+@dataclass
+class SpooledUpload:
+    path: str
+    filename: str
+    size: int = 0
+    sha256: str = ""
+
+    def discard(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+
+@dataclass
+class AnalysisResult:
+    score: Dict
+    content_hash: str
+    cached: bool = False
+    timings: Dict[str, float] = field(default_factory=dict)
+
+    def server_timing(self) -> str:
+        return ", ".join(f"{stage};dur={ms:.1f}" for stage, ms in self.timings.items())
+
+
+def get_executor() -> Executor:
+    global _executor
+    if _executor is None:
+        if ANALYSIS_EXECUTOR == "thread":
+            _executor = ThreadPoolExecutor(max_workers=ANALYSIS_WORKERS, thread_name_prefix="analysis")
+        else:
+            # spawn keeps workers independent of whatever threads the server has started.
+            _executor = ProcessPoolExecutor(
+                max_workers=ANALYSIS_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def spool_upload(file: UploadFile) -> SpooledUpload:
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=os.path.splitext(file.filename or "")[1])
+    upload = SpooledUpload(path=path, filename=file.filename or "")
+    digest = hashlib.sha256()
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while chunk := await file.read(CHUNK_SIZE):
+                digest.update(chunk)
+                out.write(chunk)
+                upload.size += len(chunk)
+    except BaseException:
+        upload.discard()
+        raise
+    upload.sha256 = digest.hexdigest()
+    return upload
+
+
+def analyze_path(path: str, filename: str = "") -> Dict:
+    """Extract and score one file. Runs inside the worker pool."""
+    started = time.perf_counter()
+    text = extract_text(path, filename)
+    extracted = time.perf_counter()
+    score = score_text(text)
+    scored = time.perf_counter()
+    return {
+        "score": score,
+        "timings": {
+            "extract": (extracted - started) * 1000,
+            "score": (scored - extracted) * 1000,
+        },
+    }
+
+
+async def analyze_upload(file: UploadFile, db: Optional[Session] = None) -> AnalysisResult:
+    started = time.perf_counter()
+    upload = await spool_upload(file)
+    spooled = time.perf_counter()
+    try:
+        cached = resume_cache.get(upload.sha256)
+        if cached is None and resume_cache.persist and db is not None:
+            cached = await run_db(db, lambda session: resume_cache.load(upload.sha256, session))
+        if cached is not None:
+            finished = time.perf_counter()
+            return AnalysisResult(
+                score=cached,
+                content_hash=upload.sha256,
+                cached=True,
+                timings={
+                    "upload": (spooled - started) * 1000,
+                    "cache": (finished - spooled) * 1000,
+                    "total": (finished - started) * 1000,
+                },
+            )
+        if not try_acquire_slot():
+            raise AnalysisBusy()
+        try:
+            loop = asyncio.get_running_loop()
+            outcome = await loop.run_in_executor(get_executor(), analyze_path, upload.path, upload.filename)
+        finally:
+            release_slot()
+    finally:
+        upload.discard()
+    finished = time.perf_counter()
+
+    resume_cache.set(upload.sha256, outcome["score"])
+    if resume_cache.persist and db is not None:
+        await run_db(db, lambda session: resume_cache.store(upload.sha256, outcome["score"], session))
+
+    worker_ms = outcome["timings"]["extract"] + outcome["timings"]["score"]
+    timings = {
+        "upload": (spooled - started) * 1000,
+        "queue": max(0.0, (finished - spooled) * 1000 - worker_ms),
+        **outcome["timings"],
+        "total": (finished - started) * 1000,
+    }
+    logger.info(
+        "analyzed %s (%d bytes, sha256=%s): %s",
+        upload.filename or "<upload>",
+        upload.size,
+        upload.sha256[:12],
+        " ".join(f"{k}={v:.1f}ms" for k, v in timings.items()),
+    )
+    return AnalysisResult(score=outcome["score"], content_hash=upload.sha256, timings=timings)
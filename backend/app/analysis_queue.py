@@ -0,0 +1,282 @@
+"""Asynchronous resume analysis backed by a database table.
+
+``POST /api/resume/tasks`` spools the upload, inserts an ``analysis_tasks``
+row and returns at once. Each server process runs an ``AnalysisQueue``
+dispatcher that claims queued rows (highest priority first, then oldest)
+with a conditional UPDATE, so several workers can share one queue without
+a broker, and runs them on the analysis process pool. Clients poll the
+task or follow it over Server-Sent Events.
+
+Uploads are spooled to the local temp directory, so every process serving
+a queue must share that filesystem (one host, any number of workers).
+"""
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.orm import Session
+
+from . import sql_models
+from .analysis import (
+    ANALYSIS_WORKERS, SpooledUpload, analyze_path, get_executor, release_slot, try_acquire_slot,
+)
+from .cache import resume_cache
+from .database import SessionLocal
+from .recommendations import record_resume, refresher
+
+logger = logging.getLogger(__name__)
+
+# Tasks this process runs at once; the rest of the analysis pool stays free
+# for synchronous /api/resume/analyze calls.
+ANALYSIS_QUEUE_CONCURRENCY = int(os.getenv("ANALYSIS_QUEUE_CONCURRENCY", str(ANALYSIS_WORKERS)))
+# Queued plus running tasks across all workers before submissions get a 429.
+ANALYSIS_QUEUE_MAX_PENDING = int(os.getenv("ANALYSIS_QUEUE_MAX_PENDING", "100"))
+ANALYSIS_QUEUE_POLL_SECONDS = float(os.getenv("ANALYSIS_QUEUE_POLL_SECONDS", "1"))
+# A task still "running" after this long belonged to a worker that died; it is queued again.
+ANALYSIS_TASK_TIMEOUT = int(os.getenv("ANALYSIS_TASK_TIMEOUT", "300"))
+# How often an SSE stream re-reads its task.
+ANALYSIS_EVENTS_POLL_SECONDS = float(os.getenv("ANALYSIS_EVENTS_POLL_SECONDS", "0.5"))
+# Finished tasks are kept this long for clients to collect.
+ANALYSIS_TASK_RETENTION = int(os.getenv("ANALYSIS_TASK_RETENTION", "86400"))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+_tasks = sql_models.AnalysisTask.__table__
+
+
+class QueueFull(Exception):
+    pass
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def pending_count(db: Session) -> int:
+    return db.scalar(select(func.count()).select_from(_tasks).where(_tasks.c.status.in_((QUEUED, RUNNING))))
+
+
+def submit(
+    db: Session, upload: SpooledUpload, user_id: Optional[str] = None, priority: int = 0,
+    max_pending: Optional[int] = None,
+) -> sql_models.AnalysisTask:
+    """Queue an analysis; already-analysed documents come back finished. Raises QueueFull."""
+    cached = resume_cache.get(upload.sha256)
+    if cached is None and resume_cache.persist:
+        cached = resume_cache.load(upload.sha256, db)
+    if cached is None:
+        limit = ANALYSIS_QUEUE_MAX_PENDING if max_pending is None else max_pending
+        if pending_count(db) >= limit:
+            raise QueueFull()
+    task = sql_models.AnalysisTask(
+        status=QUEUED, priority=priority, user_id=user_id, filename=upload.filename,
+        path=upload.path, content_hash=upload.sha256, createdAt=_now(),
+    )
+    if cached is not None:
+        upload.discard()
+        task.status, task.result, task.path = DONE, cached, None
+        task.startedAt = task.finishedAt = task.createdAt
+    db.add(task)
+    db.commit()
+    if cached is not None and user_id is not None:
+        _recommend_for(db, user_id, upload.sha256, cached)
+    return task
+
+
+def _recommend_for(db: Session, user_id: str, content_hash: str, score: dict) -> None:
+    if record_resume(db, user_id, content_hash, score.get("keywords") or []):
+        refresher.enqueue(user_id)
+
+
+def load(db: Session, task_id: str) -> Optional[sql_models.AnalysisTask]:
+    # Fresh read: another worker may have moved the task on since this session last saw it.
+    db.expire_all()
+    return db.get(sql_models.AnalysisTask, task_id)
+
+
+def claim(db: Session) -> Optional[sql_models.AnalysisTask]:
+    """Take the next queued task, or None. Safe against other workers claiming concurrently."""
+    while True:
+        task_id = db.scalar(
+            select(_tasks.c.id)
+            .where(_tasks.c.status == QUEUED)
+            .order_by(_tasks.c.priority.desc(), _tasks.c.createdAt, _tasks.c.id)
+            .limit(1)
+        )
+        if task_id is None:
+            return None
+        claimed = db.execute(
+            update(_tasks)
+            .where(_tasks.c.id == task_id, _tasks.c.status == QUEUED)
+            .values(status=RUNNING, startedAt=_now())
+        ).rowcount
+        db.commit()
+        if claimed:
+            return db.get(sql_models.AnalysisTask, task_id)
+        # Another worker won this one; try the next.
+
+
+def complete(db: Session, task_id: str, score: Optional[dict] = None, error: Optional[str] = None) -> None:
+    task = db.get(sql_models.AnalysisTask, task_id)
+    if task is None:
+        return
+    if task.path:
+        SpooledUpload(path=task.path, filename=task.filename or "").discard()
+    task.path = None
+    task.status = FAILED if error else DONE
+    task.result = score
+    task.error = error
+    task.finishedAt = _now()
+    db.commit()
+    if score is not None:
+        resume_cache.set(task.content_hash, score)
+        if resume_cache.persist:
+            resume_cache.store(task.content_hash, score, db)
+        if task.user_id is not None:
+            _recommend_for(db, task.user_id, task.content_hash, score)
+
+
+def release(db: Session, task_id: str) -> None:
+    """Put a claimed task back, e.g. when shutdown cancelled it before it ran."""
+    db.execute(update(_tasks).where(_tasks.c.id == task_id, _tasks.c.status == RUNNING)
+               .values(status=QUEUED, startedAt=None))
+    db.commit()
+
+
+def requeue_abandoned(db: Session, timeout: int = ANALYSIS_TASK_TIMEOUT) -> int:
+    requeued = db.execute(
+        update(_tasks)
+        .where(_tasks.c.status == RUNNING, _tasks.c.startedAt < _now() - timedelta(seconds=timeout))
+        .values(status=QUEUED, startedAt=None)
+    ).rowcount
+    db.commit()
+    return requeued
+
+
+def prune_finished(db: Session, retention: int = ANALYSIS_TASK_RETENTION) -> int:
+    pruned = db.execute(
+        delete(_tasks)
+        .where(_tasks.c.status.in_(FINISHED), _tasks.c.finishedAt < _now() - timedelta(seconds=retention))
+    ).rowcount
+    db.commit()
+    return pruned
+
+
+class AnalysisQueue:
+    """Per-process dispatcher: claims tasks up to ``concurrency`` and runs them on the analysis pool."""
+
+    def __init__(
+        self, concurrency: int, poll_interval: float, session_factory: Callable[[], Session] = SessionLocal
+    ):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.session_factory = session_factory
+        self._running = 0
+        self._wake = threading.Condition()
+        self._signalled = False
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+        self._last_maintenance = 0.0
+
+    @property
+    def running(self) -> int:
+        return self._running
+
+    def notify(self) -> None:
+        """Wake the dispatcher, e.g. right after a submission."""
+        with self._wake:
+            self._signalled = True
+            self._wake.notify()
+
+    def dispatch(self) -> int:
+        """Claim and start as many tasks as there are free slots. Returns how many started."""
+        started = 0
+        with self.session_factory() as db:
+            if time.monotonic() - self._last_maintenance > 60:
+                self._last_maintenance = time.monotonic()
+                requeue_abandoned(db)
+                prune_finished(db)
+            while True:
+                with self._wake:
+                    if self._stopping or self._running >= self.concurrency:
+                        return started
+                # Queued work shares the process-wide analysis cap with synchronous uploads.
+                if not try_acquire_slot():
+                    return started
+                task = claim(db)
+                if task is None:
+                    release_slot()
+                    return started
+                with self._wake:
+                    self._running += 1
+                try:
+                    future = get_executor().submit(analyze_path, task.path, task.filename or "")
+                except BaseException:
+                    # A broken or shut-down pool: hand back the task and both slots.
+                    release(db, task.id)
+                    release_slot()
+                    with self._wake:
+                        self._running -= 1
+                    raise
+                future.add_done_callback(lambda done, task_id=task.id: self._finish(task_id, done))
+                started += 1
+
+    def _finish(self, task_id: str, future: Future) -> None:
+        try:
+            with self.session_factory() as db:
+                if future.cancelled():
+                    release(db, task_id)
+                    return
+                error = future.exception()
+                if error is None:
+                    complete(db, task_id, score=future.result()["score"])
+                else:
+                    logger.warning("analysis task %s failed: %s", task_id, error)
+                    complete(db, task_id, error=str(error) or type(error).__name__)
+        except Exception:
+            logger.exception("could not record analysis task %s", task_id)
+        finally:
+            release_slot()
+            with self._wake:
+                self._running -= 1
+                self._signalled = True
+                self._wake.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._wake:
+                if not self._signalled and not self._stopping:
+                    self._wake.wait(self.poll_interval)
+                self._signalled = False
+                if self._stopping:
+                    return
+            try:
+                self.dispatch()
+            except Exception:
+                logger.exception("analysis queue dispatch failed")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping = False
+            # Pick up whatever was left queued by the previous run straight away.
+            self._signalled = True
+            self._thread = threading.Thread(target=self._loop, name="analysis-queue", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Stop claiming; tasks already running finish, and anything left queued waits for the next start."""
+        if self._thread is not None:
+            with self._wake:
+                self._stopping = True
+                self._wake.notify()
+            self._thread.join()
+            self._thread = None
+
+
+analysis_queue = AnalysisQueue(ANALYSIS_QUEUE_CONCURRENCY, ANALYSIS_QUEUE_POLL_SECONDS)
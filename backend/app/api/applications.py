@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Dict, List, Optional
+from sqlalchemy.orm import Session
+from ..models import Application, ApplicationPage, Job, User
+from .. import sql_models
+from ..database import get_db, run_db
+from ..pagination import keyset_page
+from ..repository import JobRepository, JobRunner, job_runner, runs_inline
+from ..responses import json_response
+from .auth import get_current_user
+
+router = APIRouter(prefix="/api/applications", tags=["applications"])
+
+# Newest first; served by ix_applications_user_applied_at_id.
+HISTORY_ORDER = (sql_models.Application.appliedAt, sql_models.Application.id)
+
+def _list_applications(db: Session, user_id: str, cursor: Optional[str], limit: int):
+    query = db.query(sql_models.Application).filter(sql_models.Application.user_id == user_id)
+    return keyset_page(query, HISTORY_ORDER, cursor, limit)
+
+@runs_inline
+def _jobs_by_id(jobs: JobRepository, job_ids: List[str]) -> Dict[str, sql_models.Job]:
+    return jobs.get_many(job_ids)
+
+@router.get("", response_model=ApplicationPage)
+async def list_my_applications(
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    run_jobs: JobRunner = Depends(job_runner),
+):
+    rows, next_cursor = await run_db(db, _list_applications, user.id, cursor, limit)
+    jobs = await run_jobs(_jobs_by_id, [row.job_id for row in rows])
+    return json_response(ApplicationPage(
+        items=[
+            Application(
+                id=row.id,
+                jobId=row.job_id,
+                appliedAt=row.appliedAt,
+                job=Job.from_row(jobs[row.job_id]) if row.job_id in jobs else None,
+            )
+            for row in rows
+        ],
+        nextCursor=next_cursor,
+    ))
@@ -1,119 +1,127 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from ..models import LoginCredentials, SignupCredentials, AuthResponse
+from ..models import LoginCredentials, SignupCredentials, AuthResponse, User
 from .. import sql_models
-from ..database import get_db
+from ..database import get_db, run_db
+from ..passwords import hash_password_async, verify_password_async
+from ..security import InvalidToken, decode_token, issue_token, revocations, user_cache
+import hmac
+import os
 import uuid
+from typing import Optional
 from datetime import datetime, timezone
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 
+# Shared secret for the operational endpoints (cache and pool stats); unset disables them.
+OPS_API_KEY = os.getenv("OPS_API_KEY")
+
 router = APIRouter(prefix="/auth", tags=["auth"])
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    # In a real app, verify JWT properly. 
-    # For now, we are using a simplified mock token approach where we'd need a Token table to verify.
-    # To keep this simple as requested (using SQL), let's assume the token IS the user_id for this migration step 
-    # OR we implement a Token table. Let's implementing a basic Token table is better but might be overkill.
-    # Alternative: Use the User table to store a current token? No, that's bad.
-    # Let's use a simple in-memory cache for tokens OR just trust the token for now if we want to be stateless (JWT).
-    # Since we previously had a token->user map in memory, let's replicate that behavior using a new table or just 
-    # simplifying to say the token is a dummy JWT. 
-    
-    # Actually, let's just query the user by ID directly if we used JWT.
-    # But since we are migrating from a mock token system...
-    # Let's add a `token` column to User for simplicity in this demo? No, that limits to 1 session.
-    # Let's create a Token model? 
-    # Detailed Plan: 
-    # 1. We'll simply lookup the user by email for login/signup.
-    # 2. Authorization is trickier without a real JWT library. 
-    # Let's stick to the previous behavior: Token map. 
-    # But we want to use the DB. 
-    # Let's assume we use the Token map in memory for active sessions to avoid creating a new table just for this unless needed.
-    # Wait, the user asked for Postgres/Sqlite. 
-    
-    # CORRECT APPROACH: 
-    # Use a real JWT library `python-jose`? OR just simulate it.
-    # Let's simulate: We'll put the "token" in a `tokens` table or just keep using the in-memory dictionary for tokens 
-    # since that wasn't explicitly asked to be moved to SQL, but it makes sense.
-    
-    # Let's use a simple Token table in sql_models.
-    pass 
-    # Re-reading: simple migration. I will use a simple global dict for tokens to keep it simple, 
-    # or I can query the user by ID if I put the ID in the token.
-    # Let's keep existing token behavior (in-memory) for now to minimize friction, 
-    # BUT query the User from DB.
-    
-    # However, `get_user_by_token` in `db.py` was used.
-    # Let's just implement a simple look up.
-    return None
-
-# Temporary in-memory token store for migration simplicity
-# Ideally use a Redis or DB table
-token_store = {}
-
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    token = credentials.credentials
-    email = token_store.get(token)
-    if not email:
+def _resolve_user(db: Session, token: str) -> User:
+    # Signature and expiry are checked in memory; the revocation mirror and
+    # user cache only reach the database when stale or on a miss.
+    try:
+        claims = decode_token(token, db)
+    except InvalidToken:
         raise HTTPException(status_code=401, detail="Invalid token")
-    
-    user = db.query(sql_models.User).filter(sql_models.User.email == email).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+    if revocations.is_revoked(claims["jti"], db):
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+    user = user_cache.get(claims["sub"])
+    if user is None:
+        row = db.get(sql_models.User, claims["sub"])
+        if not row:
+            raise HTTPException(status_code=401, detail="User not found")
+        user = User.model_validate(row)
+        user_cache.set(user.id, user)
     return user
 
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)) -> User:
+    return await run_db(db, _resolve_user, credentials.credentials)
+
+async def get_optional_user(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security), db: Session = Depends(get_db)
+) -> Optional[User]:
+    """The signed-in user, or None for anonymous requests; a bad token is still a 401."""
+    if credentials is None:
+        return None
+    return await run_db(db, _resolve_user, credentials.credentials)
+
+async def require_ops_key(x_api_key: Optional[str] = Header(None)) -> None:
+    """Guard for operational endpoints, checked like the ingestion key."""
+    if not OPS_API_KEY:
+        raise HTTPException(status_code=403, detail="Operational endpoints are disabled")
+    if not x_api_key or not hmac.compare_digest(x_api_key, OPS_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+
+def _find_user(db: Session, email: str):
+    return db.query(sql_models.User).filter(sql_models.User.email == email).first()
+
+def _issue_token(db: Session, user: sql_models.User) -> str:
+    return issue_token(user, db)
+
+def _save_password(db: Session, user: sql_models.User, password_hash: str) -> None:
+    user.password = password_hash
+    db.commit()
+
+# Login and signup are async so that hashing waits on the dedicated hash pool
+# (app/passwords.py) without holding a request thread.
 @router.post("/login", response_model=AuthResponse)
-def login(credentials: LoginCredentials, db: Session = Depends(get_db)):
-    user = db.query(sql_models.User).filter(sql_models.User.email == credentials.email).first()
-    if not user or user.password != credentials.password:
+async def login(credentials: LoginCredentials, db: Session = Depends(get_db)):
+    user = await run_db(db, _find_user, credentials.email)
+    ok, new_hash = await verify_password_async(credentials.password, user.password if user else None)
+    if not ok:
         raise HTTPException(status_code=401, detail="Invalid credentials")
-    
-    token = str(uuid.uuid4())
-    token_store[token] = user.email
-    
-    return AuthResponse(
-        user=user,
-        token=token
-    )
+    if new_hash:
+        # Legacy plaintext or outdated cost parameters; upgrade in place.
+        await run_db(db, _save_password, user, new_hash)
 
-@router.post("/signup", response_model=AuthResponse, status_code=201)
-def signup(credentials: SignupCredentials, db: Session = Depends(get_db)):
-    existing_user = db.query(sql_models.User).filter(sql_models.User.email == credentials.email).first()
-    if existing_user:
-        raise HTTPException(status_code=409, detail="User already exists")
-    
+    return AuthResponse(user=user, token=await run_db(db, _issue_token, user))
+
+def _create_user(db: Session, credentials: SignupCredentials, password_hash: str) -> sql_models.User:
     new_user = sql_models.User(
         id=str(uuid.uuid4()),
         email=credentials.email,
         username=credentials.username,
-        password=credentials.password, # Plaintext for now as per mock
+        password=password_hash,
         createdAt=datetime.now(timezone.utc)
     )
-    
     db.add(new_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="User already exists")
     db.refresh(new_user)
-    
-    token = str(uuid.uuid4())
-    token_store[token] = new_user.email
-    
-    return AuthResponse(user=new_user, token=token)
+    return new_user
 
-@router.post("/logout")
-def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    token = credentials.credentials
-    if token in token_store:
-        del token_store[token]
-    return {"message": "Logged out successfully"}
+@router.post("/signup", response_model=AuthResponse, status_code=201)
+async def signup(credentials: SignupCredentials, db: Session = Depends(get_db)):
+    existing_user = await run_db(db, _find_user, credentials.email)
+    if existing_user:
+        raise HTTPException(status_code=409, detail="User already exists")
 
-from ..models import LoginCredentials, SignupCredentials, AuthResponse, User
+    password_hash = await hash_password_async(credentials.password)
+    new_user = await run_db(db, _create_user, credentials, password_hash)
+
+    return AuthResponse(user=new_user, token=await run_db(db, _issue_token, new_user))
 
-# ...
+def _revoke(db: Session, token: str) -> None:
+    try:
+        claims = decode_token(token, db)
+    except InvalidToken:
+        # Nothing to revoke; the token is already unusable.
+        return
+    revocations.revoke(claims, db)
+
+@router.post("/logout")
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+    await run_db(db, _revoke, credentials.credentials)
+    return {"message": "Logged out successfully"}
 
-@router.get("/me", response_model=User) # Note: AuthResponse includes token, but User model doesn't. 
-# The OpenAPI spec says /me returns User.
-# Let's fix the response model to User.
-def get_me(user: sql_models.User = Depends(get_current_user)):
+@router.get("/me", response_model=User)
+async def get_me(user: User = Depends(get_current_user)):
     return user
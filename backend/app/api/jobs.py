@@ -1,112 +1,360 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Depends, File, Header, Query, Request, UploadFile
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+from sqlalchemy import func, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from ..models import Job, JobApplicationResponse, ResumeScore, JobType
+from starlette.concurrency import run_in_threadpool
+from ..models import (
+    Job, JobApplicationResponse, ResumeScore, JobType, JobMatch, JobPage, JobSearchPage, JobSort,
+    BatchRecommendationRequest, BatchRecommendationResponse, IngestReport, ApplicantCount, User, UserRecommendations,
+)
 from .. import sql_models
-from ..database import get_db
+from ..database import get_db, run_db
+from ..matching import relevance_to_match_score
+from ..batch_scoring import JobMatrix, top_matches
+from .. import catalog, ingest, recommendations, search, skills
+from .auth import get_current_user
+from ..pagination import rank_cursor, rank_offset
+from ..recency import as_utc, utcnow
+from ..repository import JobRepository, JobRunner, job_runner, runs_inline
+from ..responses import json_response, matches_etag, not_modified, weak_etag
+import hmac
+import io
+import os
 import uuid
-from datetime import datetime
+from datetime import timedelta
 
 router = APIRouter(prefix="/api/jobs", tags=["jobs"])
 
-# Seed jobs if empty
-def seed_jobs(db: Session):
-    if db.query(sql_models.Job).count() == 0:
-        jobs_data = [
-            sql_models.Job(
-                id="1",
-                title="Senior Software Engineer",
-                company="TechCorp Inc.",
-                location="San Francisco, CA",
-                salary="$150,000 - $200,000",
-                matchScore=92,
-                description="Join our innovative team to build next-generation cloud solutions.",
-                requirements=["5+ years experience", "React/TypeScript", "Cloud platforms"],
-                postedAt="2 days ago",
-                type=JobType.FULL_TIME
-            ),
-             sql_models.Job(
-                id="2",
-                title="Full Stack Developer",
-                company="StartupXYZ",
-                location="Remote",
-                salary="$120,000 - $160,000",
-                matchScore=88,
-                description="Build and scale our core product with modern technologies.",
-                requirements=["3+ years experience", "Node.js", "React", "PostgreSQL"],
-                postedAt="1 week ago",
-                type=JobType.REMOTE
-            ),
-             sql_models.Job(
-                id="3",
-                title="Frontend Engineer",
-                company="DesignStudio",
-                location="New York, NY",
-                salary="$110,000 - $140,000",
-                matchScore=85,
-                description="Create beautiful, responsive user interfaces for our clients.",
-                requirements=["2+ years experience", "React", "CSS/Tailwind", "Figma"],
-                postedAt="3 days ago",
-                type=JobType.FULL_TIME
-            ),
-             sql_models.Job(
-                id="4",
-                title="Backend Developer",
-                company="DataFlow Systems",
-                location="Austin, TX",
-                salary="$130,000 - $170,000",
-                matchScore=79,
-                description="Design and implement robust backend services and APIs.",
-                requirements=["4+ years experience", "Python/Django", "REST APIs", "AWS"],
-                postedAt="5 days ago",
-                type=JobType.FULL_TIME
-            ),
-             sql_models.Job(
-                id="5",
-                title="DevOps Engineer",
-                company="CloudNative Co",
-                location="Seattle, WA",
-                salary="$140,000 - $180,000",
-                matchScore=74,
-                description="Manage and improve our cloud infrastructure and CI/CD pipelines.",
-                requirements=["3+ years experience", "Kubernetes", "Terraform", "AWS/GCP"],
-                postedAt="1 day ago",
-                type=JobType.CONTRACT
-            ),
-        ]
-        db.add_all(jobs_data)
-        db.commit()
+# Listings change only when the catalog does; browsers may reuse one for this
+# long and must then revalidate, which costs a 304 while nothing changed.
+JOB_LIST_MAX_AGE = int(os.getenv("JOB_LIST_MAX_AGE", "30"))
+JOB_LIST_CACHE_CONTROL = f"public, max-age={JOB_LIST_MAX_AGE}, must-revalidate"
+# Per-user and refreshed in the background: always revalidate.
+USER_CACHE_CONTROL = "private, no-cache"
+
+class JobFilters:
+    """Listing filters, pushed down to SQL as indexed equality/range predicates.
+
+    ``matcher`` builds the same test for jobs held in memory.
+    """
+
+    def __init__(
+        self,
+        type: Optional[JobType] = None,
+        location: Optional[str] = None,
+        company: Optional[str] = None,
+        min_match_score: Optional[int] = Query(None, alias="minMatchScore", ge=0, le=100),
+        min_salary: Optional[int] = Query(None, alias="minSalary", ge=0),
+        max_salary: Optional[int] = Query(None, alias="maxSalary", ge=0),
+        currency: Optional[str] = Query(None, min_length=3, max_length=3),
+        posted_within_days: Optional[int] = Query(None, alias="postedWithinDays", ge=1),
+        skill: Optional[List[str]] = Query(None, description="Only jobs requiring all of these skills"),
+    ):
+        self.type = type
+        self.location = location
+        self.company = company
+        self.min_match_score = min_match_score
+        self.min_salary = min_salary
+        self.max_salary = max_salary
+        self.currency = currency.upper() if currency else None
+        self.posted_within_days = posted_within_days
+        self.skills = skills.canonicalize(skill)
+
+    @property
+    def active(self) -> bool:
+        return bool(self.skills) or any(v is not None for v in (
+            self.type, self.location, self.company, self.min_match_score,
+            self.min_salary, self.max_salary, self.currency, self.posted_within_days,
+        ))
+
+    def apply(self, query):
+        if self.type is not None:
+            query = query.filter(sql_models.Job.type == self.type.value)
+        if self.location is not None:
+            query = query.filter(sql_models.Job.location == self.location)
+        if self.company is not None:
+            query = query.filter(sql_models.Job.company == self.company)
+        if self.min_match_score is not None:
+            query = query.filter(sql_models.Job.matchScore >= self.min_match_score)
+        # Salary bounds select jobs whose advertised range overlaps the requested
+        # one; a missing bound ("$100k+", "Up to $90k") is open on that side.
+        job = sql_models.Job
+        if self.min_salary is not None or self.max_salary is not None:
+            query = query.filter(job.salary_high.is_not(None))
+        if self.min_salary is not None:
+            query = query.filter(or_(job.salary_max.is_(None), job.salary_max >= self.min_salary))
+        if self.max_salary is not None:
+            query = query.filter(or_(job.salary_min.is_(None), job.salary_min <= self.max_salary))
+        if self.currency is not None:
+            query = query.filter(sql_models.Job.salary_currency == self.currency)
+        if self.posted_within_days is not None:
+            query = query.filter(sql_models.Job.posted_at >= utcnow() - timedelta(days=self.posted_within_days))
+        # One indexed job_skills lookup per required skill.
+        for jobs_requiring in skills.requiring(self.skills):
+            query = query.filter(sql_models.Job.id.in_(jobs_requiring))
+        return query
+
+    def matcher(self) -> Callable[[sql_models.Job, Collection[str]], bool]:
+        """``apply`` as a test of one job held in memory and its canonical skill names.
+
+        Only the filters that are set are checked. NULLs never match, as in SQL,
+        except for the open salary bounds that ``apply`` allows.
+        """
+        checks: List[Callable[[sql_models.Job, Collection[str]], bool]] = []
+        for field, value in (
+            ("type", self.type.value if self.type is not None else None),
+            ("location", self.location),
+            ("company", self.company),
+            ("salary_currency", self.currency),
+        ):
+            if value is not None:
+                checks.append(lambda job, _, field=field, value=value: getattr(job, field) == value)
+        if self.min_match_score is not None:
+            score = self.min_match_score
+            checks.append(lambda job, _: job.matchScore is not None and job.matchScore >= score)
+        if self.min_salary is not None or self.max_salary is not None:
+            low, high = self.min_salary, self.max_salary
+            checks.append(lambda job, _: job.salary_high is not None
+                          and (low is None or job.salary_max is None or job.salary_max >= low)
+                          and (high is None or job.salary_min is None or job.salary_min <= high))
+        if self.posted_within_days is not None:
+            cutoff = utcnow() - timedelta(days=self.posted_within_days)
+            checks.append(lambda job, _: job.posted_at is not None and as_utc(job.posted_at) >= cutoff)
+        if self.skills:
+            required = self.skills
+            checks.append(lambda _, job_skills: all(name in job_skills for name in required))
+        if len(checks) == 1:
+            return checks[0]
+        return lambda job, job_skills: all(check(job, job_skills) for check in checks)
+
+def _list_jobs(jobs: JobRepository, filters: JobFilters, sort: JobSort, cursor: Optional[str], limit: int) -> Dict:
+    rows, next_cursor = jobs.page(filters, sort, cursor, limit)
+    # JobPage-shaped; encoded once by json_response rather than validated per row.
+    return {"items": [Job.payload(job) for job in rows], "nextCursor": next_cursor}
+
+# Handlers are async and run their catalog logic through run_jobs (and the
+# rest through run_db), so the same code serves the threadpool (sync
+# engine), DATABASE_ASYNC and in-memory catalog modes.
+def _clock_bucket() -> str:
+    # Ages ("3 days ago") and postedWithinDays move with the clock, not just
+    # the catalog, so cached listings are re-rendered at least hourly.
+    return utcnow().strftime("%Y%m%d%H")
+
+@runs_inline
+def _listing_etag(jobs: JobRepository, request: Request) -> str:
+    return weak_etag(
+        catalog.JOBS, jobs.version(cached=True), _clock_bucket(), sorted(request.query_params.multi_items())
+    )
+
+@router.get("", response_model=JobPage)
+async def list_jobs(
+    request: Request,
+    filters: JobFilters = Depends(),
+    sort: JobSort = JobSort.MATCH,
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    run_jobs: JobRunner = Depends(job_runner),
+):
+    etag = await run_jobs(_listing_etag, request)
+    if matches_etag(request, etag):
+        return not_modified(etag, JOB_LIST_CACHE_CONTROL)
+    page = await run_jobs(_list_jobs, filters, sort, cursor, limit)
+    return json_response(page, headers={"ETag": etag, "Cache-Control": JOB_LIST_CACHE_CONTROL})
+
+def _search(jobs: JobRepository, words: List[str], prefix: bool, filters: JobFilters, cursor: Optional[str], limit: int) -> Dict:
+    # Every match is ranked before the first page comes back anyway, so
+    # pages are addressed by rank rather than by a keyset.
+    offset = rank_offset(cursor)
+    hits = jobs.search(words, prefix, filters, offset, limit + 1)
+    return {
+        "items": [{**Job.payload(job), "highlights": search.highlights(job, words, prefix)} for job in hits[:limit]],
+        "nextCursor": rank_cursor(offset + limit) if len(hits) > limit else None,
+    }
+
+@router.get("/search", response_model=JobSearchPage)
+async def search_jobs(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=200),
+    prefix: bool = Query(True, description="Treat the last word as incomplete, for search-as-you-type"),
+    filters: JobFilters = Depends(),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    run_jobs: JobRunner = Depends(job_runner),
+):
+    words = search.terms(q)
+    if not words:
+        return json_response({"items": [], "nextCursor": None})
+    etag = await run_jobs(_listing_etag, request)
+    if matches_etag(request, etag):
+        return not_modified(etag, JOB_LIST_CACHE_CONTROL)
+    page = await run_jobs(_search, words, prefix, filters, cursor, limit)
+    return json_response(page, headers={"ETag": etag, "Cache-Control": JOB_LIST_CACHE_CONTROL})
+
+def _skill_matches(jobs: JobRepository, names: List[str], filters: JobFilters, cursor: Optional[str], limit: int) -> Dict:
+    offset = rank_offset(cursor)
+    ranked = jobs.skill_matches(names, filters, offset, limit + 1)
+    return {
+        # matchScore becomes the share of the requested skills the job asks for.
+        "items": [Job.payload(job, round(100 * count / len(names))) for job, count in ranked[:limit]],
+        "nextCursor": rank_cursor(offset + limit) if len(ranked) > limit else None,
+    }
+
+@router.get("/skill-matches", response_model=JobPage)
+async def match_skills(
+    request: Request,
+    have: List[str] = Query(..., description="Skills to match, e.g. from a resume; compound entries are split"),
+    filters: JobFilters = Depends(),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    run_jobs: JobRunner = Depends(job_runner),
+):
+    names = skills.canonicalize(have)
+    if not names:
+        return json_response({"items": [], "nextCursor": None})
+    etag = await run_jobs(_listing_etag, request)
+    if matches_etag(request, etag):
+        return not_modified(etag, JOB_LIST_CACHE_CONTROL)
+    page = await run_jobs(_skill_matches, names, filters, cursor, limit)
+    return json_response(page, headers={"ETag": etag, "Cache-Control": JOB_LIST_CACHE_CONTROL})
+
+def _recommend(
+    jobs: JobRepository, score: Optional[ResumeScore], filters: JobFilters, cursor: Optional[str], limit: int
+) -> Tuple[List[Dict], Optional[str]]:
+    if score and score.keywords:
+        # Relevance is computed per request, so ranked pages are addressed by rank.
+        offset = rank_offset(cursor)
+        hits = jobs.rank(score.keywords, filters, offset + limit + 1)
+        if hits:
+            next_cursor = rank_cursor(offset + limit) if len(hits) > offset + limit else None
+            match_scores = relevance_to_match_score([relevance for _, relevance in hits])
+            page = list(zip(hits, match_scores))[offset:offset + limit]
+            # Only the page's rows are fetched, by primary key.
+            rows = jobs.get_many(job_id for (job_id, _), _ in page)
+            return [Job.payload(rows[job_id], match) for (job_id, _), match in page if job_id in rows], next_cursor
+    # No resume keywords to rank by: fall back to the catalog's own ordering.
+    rows, next_cursor = jobs.page(filters, JobSort.MATCH, cursor, limit)
+    return [Job.payload(job) for job in rows], next_cursor
 
 @router.post("/recommendations", response_model=List[Job])
-def get_recommendations(score: Optional[ResumeScore] = None, db: Session = Depends(get_db)):
-    seed_jobs(db) # Ensure data exists
-    jobs = db.query(sql_models.Job).all()
-    # Convert SQLAlchemy models to Pydantic models
-    return [Job(
-        id=job.id,
-        title=job.title,
-        company=job.company,
-        location=job.location,
-        salary=job.salary,
-        matchScore=job.matchScore,
-        description=job.description,
-        requirements=job.requirements,
-        postedAt=job.postedAt,
-        type=job.type
-    ) for job in jobs]
+async def get_recommendations(
+    score: Optional[ResumeScore] = None,
+    filters: JobFilters = Depends(),
+    cursor: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    run_jobs: JobRunner = Depends(job_runner),
+):
+    # The body stays a plain list for existing clients; the next page's
+    # cursor travels in the X-Next-Cursor header.
+    jobs, next_cursor = await run_jobs(_recommend, score, filters, cursor, limit)
+    return json_response(jobs, headers={"X-Next-Cursor": next_cursor} if next_cursor else None)
 
-@router.post("/{id}/apply", response_model=JobApplicationResponse)
-def apply_to_job(id: str, db: Session = Depends(get_db)):
-    job = db.query(sql_models.Job).filter(sql_models.Job.id == id).first()
-    if not job:
+@router.get("/recommendations/me", response_model=UserRecommendations)
+async def get_my_recommendations(
+    request: Request, user: User = Depends(get_current_user), db: Session = Depends(get_db)
+):
+    """Precomputed matches for the signed-in user's latest resume upload."""
+    parts = await run_db(db, recommendations.fingerprint, user.id)
+    if parts is None:
+        raise HTTPException(status_code=404, detail="No resume analysed for this user")
+    etag = weak_etag(user.id, *parts, _clock_bucket())
+    if matches_etag(request, etag):
+        return not_modified(etag, USER_CACHE_CONTROL)
+    result = await run_db(db, recommendations.read, user.id)
+    if result.stale:
+        # Serve what we have (possibly nothing yet); the refresher catches up in the background.
+        recommendations.refresher.enqueue(user.id)
+    return json_response(result, headers={"ETag": etag, "Cache-Control": USER_CACHE_CONTROL})
+
+def _catalog(jobs: JobRepository) -> JobMatrix:
+    return jobs.matrix()
+
+@router.post("/recommendations/batch", response_model=BatchRecommendationResponse)
+async def get_batch_recommendations(request: BatchRecommendationRequest, run_jobs: JobRunner = Depends(job_runner)):
+    matrix = await run_jobs(_catalog)
+    # Scores every resume against every job in chunked matrix products; kept
+    # off the event loop in either mode.
+    matches = await run_in_threadpool(top_matches, request.resumes, matrix, k=request.limit)
+    return BatchRecommendationResponse(results=[
+        [JobMatch(jobId=job_id, matchScore=int(round(100 * score))) for job_id, score in ranked]
+        for ranked in matches
+    ])
+
+@router.post("/ingest", response_model=IngestReport)
+async def ingest_jobs(
+    file: UploadFile = File(...),
+    format: Optional[str] = Query(None, pattern="^(jsonl|csv)$"),
+    x_api_key: Optional[str] = Header(None),
+    run_jobs: JobRunner = Depends(job_runner),
+):
+    if not ingest.INGEST_API_KEY:
+        raise HTTPException(status_code=403, detail="Ingestion is disabled")
+    if not x_api_key or not hmac.compare_digest(x_api_key, ingest.INGEST_API_KEY):
+        raise HTTPException(status_code=401, detail="Invalid API key")
+    # The upload is already spooled to disk; rows are decoded and written
+    # batch by batch straight from it.
+    stream = io.TextIOWrapper(file.file, encoding="utf-8", newline="")
+    try:
+        return await run_jobs(ingest.ingest_stream, stream, format or ingest.guess_format(file.filename))
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="Feed must be UTF-8")
+    finally:
+        stream.detach()
+
+@runs_inline
+def _job_exists(jobs: JobRepository, id: str) -> bool:
+    return jobs.get(id) is not None
+
+def _existing_application(db: Session, user_id: str, job_id: str) -> Optional[str]:
+    existing = db.query(sql_models.Application.id).filter(
+        sql_models.Application.user_id == user_id, sql_models.Application.job_id == job_id
+    ).first()
+    return existing.id if existing else None
+
+def _apply(db: Session, user_id: str, job_id: str, job_exists: bool) -> Tuple[str, bool]:
+    """Create the application unless it exists; returns (application id, already applied)."""
+    existing = _existing_application(db, user_id, job_id)
+    if existing:
+        return existing, True
+    if not job_exists:
         raise HTTPException(status_code=404, detail="Job not found")
-    
-    # Ideally, we would create an Application record here using sql_models.Application
-    # but the API doesn't require user context for this specific endpoint in the spec 
-    # (it just takes an ID). 
-    # We'll just return success.
-    
+    application = sql_models.Application(id=str(uuid.uuid4()), user_id=user_id, job_id=job_id)
+    db.add(application)
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        # A concurrent submission that won the unique (user_id, job_id) index
+        # is the one recoverable case; anything else (e.g. a foreign key to a
+        # row that is gone) would fail the same way again.
+        existing = _existing_application(db, user_id, job_id)
+        if existing:
+            return existing, True
+        raise HTTPException(status_code=409, detail="Could not record the application")
+    return application.id, False
+
+@router.post("/{id}/apply", response_model=JobApplicationResponse)
+async def apply_to_job(
+    id: str,
+    user: User = Depends(get_current_user),
+    db: Session = Depends(get_db),
+    run_jobs: JobRunner = Depends(job_runner),
+):
+    job_exists = await run_jobs(_job_exists, id)
+    application_id, already_applied = await run_db(db, _apply, user.id, id, job_exists)
     return JobApplicationResponse(
         success=True,
-        message="Your application has been submitted successfully!"
+        message="You have already applied to this job." if already_applied
+        else "Your application has been submitted successfully!",
+        applicationId=application_id,
+        alreadyApplied=already_applied,
     )
+
+def _count_applicants(db: Session, job_id: str) -> int:
+    return db.query(func.count(sql_models.Application.id)).filter(sql_models.Application.job_id == job_id).scalar()
+
+@router.get("/{id}/applicants/count", response_model=ApplicantCount)
+async def count_applicants(id: str, db: Session = Depends(get_db), run_jobs: JobRunner = Depends(job_runner)):
+    if not await run_jobs(_job_exists, id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    return ApplicantCount(jobId=id, count=await run_db(db, _count_applicants, id))
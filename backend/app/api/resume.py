@@ -1,28 +1,124 @@
-from fastapi import APIRouter, UploadFile, File
-from ..models import ResumeScore, ResumeCategories
-import random
+import asyncio
+from typing import Optional
+from fastapi import APIRouter, UploadFile, File, Response, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from ..models import AnalysisTask, ResumeScore, User
+from ..analysis import AnalysisBusy, analyze_upload, spool_upload
+from ..analysis_queue import (
+    ANALYSIS_EVENTS_POLL_SECONDS, ANALYSIS_QUEUE_POLL_SECONDS, FINISHED, QueueFull, analysis_queue, load, submit,
+)
+from ..cache import resume_cache
+from ..database import get_db, run_db
+from ..recommendations import record_resume, refresher
+from .auth import get_optional_user, require_ops_key
 
 router = APIRouter(prefix="/api/resume", tags=["resume"])
 
+# SSE comment line sent while nothing changes, so proxies keep the stream open.
+HEARTBEAT_SECONDS = 15
+
 @router.post("/analyze", response_model=ResumeScore)
-async def analyze_resume(file: UploadFile = File(...)):
-    # Mock processing
-    base_score = 65 + random.random() * 25
-    
-    return ResumeScore(
-        overall=int(base_score),
-        categories=ResumeCategories(
-            formatting=int(60 + random.random() * 35),
-            keywords=int(55 + random.random() * 40),
-            experience=int(50 + random.random() * 45),
-            education=int(70 + random.random() * 25),
-            skills=int(60 + random.random() * 35)
-        ),
-        suggestions=[
-            'Add more industry-specific keywords to improve ATS compatibility',
-            'Consider adding quantifiable achievements (e.g., "Increased sales by 25%")',
-            'Include a professional summary at the top of your resume',
-            'Add more technical skills relevant to your target positions',
-            'Consider reformatting to use bullet points for better readability',
-        ]
+async def analyze_resume(
+    response: Response,
+    file: UploadFile = File(...),
+    user: Optional[User] = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
+    try:
+        result = await analyze_upload(file, db)
+    except AnalysisBusy:
+        raise HTTPException(
+            status_code=503,
+            detail="Too many analyses in progress; retry shortly or use /api/resume/tasks",
+            headers={"Retry-After": "5"},
+        )
+    # Per-stage timings show up in the browser devtools network panel.
+    response.headers["Server-Timing"] = result.server_timing()
+    response.headers["X-Cache"] = "HIT" if result.cached else "MISS"
+    score = ResumeScore(**result.score)
+    if user is not None:
+        # Signed-in uploads get their recommendations precomputed off the request path.
+        if await run_db(db, record_resume, user.id, result.content_hash, score.keywords):
+            refresher.enqueue(user.id)
+    return score
+
+@router.post("/tasks", response_model=AnalysisTask, status_code=202)
+async def submit_analysis(
+    response: Response,
+    file: UploadFile = File(...),
+    priority: int = Query(0, ge=0, le=9, description="Higher runs first"),
+    user: Optional[User] = Depends(get_optional_user),
+    db: Session = Depends(get_db),
+):
+    """Queue an analysis and return immediately; poll the task or follow its events."""
+    upload = await spool_upload(file)
+    try:
+        task = await run_db(db, submit, upload, user.id if user else None, priority)
+    except QueueFull:
+        upload.discard()
+        raise HTTPException(
+            status_code=429,
+            detail="Analysis queue is full, try again shortly",
+            headers={"Retry-After": str(max(1, round(ANALYSIS_QUEUE_POLL_SECONDS * 5)))},
+        )
+    except BaseException:
+        upload.discard()
+        raise
+    analysis_queue.notify()
+    response.headers["Location"] = f"{router.prefix}/tasks/{task.id}"
+    return task
+
+def _load_task(db: Session, task_id: str, user_id: Optional[str]) -> AnalysisTask:
+    task = load(db, task_id)
+    # A signed-in user's task is theirs alone; to anyone else it does not exist.
+    if task is None or (task.user_id is not None and task.user_id != user_id):
+        raise HTTPException(status_code=404, detail="Task not found")
+    result = AnalysisTask.model_validate(task)
+    # End the read transaction so an open event stream does not pin a pooled connection.
+    db.rollback()
+    return result
+
+@router.get("/tasks/{id}", response_model=AnalysisTask)
+async def get_analysis(
+    id: str, user: Optional[User] = Depends(get_optional_user), db: Session = Depends(get_db)
+):
+    return await run_db(db, _load_task, id, user.id if user else None)
+
+@router.get("/tasks/{id}/events")
+async def analysis_events(
+    id: str, request: Request, user: Optional[User] = Depends(get_optional_user), db: Session = Depends(get_db)
+):
+    """Server-Sent Events: one `status` event per change, ending with the finished task."""
+    user_id = user.id if user else None
+    task = await run_db(db, _load_task, id, user_id)
+
+    async def stream():
+        current = task
+        last_status = None
+        idle = 0.0
+        while True:
+            if current.status != last_status:
+                last_status = current.status
+                idle = 0.0
+                yield f"event: status\ndata: {current.model_dump_json()}\n\n"
+                if current.status.value in FINISHED:
+                    return
+            elif idle >= HEARTBEAT_SECONDS:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(ANALYSIS_EVENTS_POLL_SECONDS)
+            idle += ANALYSIS_EVENTS_POLL_SECONDS
+            if await request.is_disconnected():
+                return
+            current = await run_db(db, _load_task, id, user_id)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
+
+@router.get("/cache/stats", dependencies=[Depends(require_ops_key)])
+def cache_stats():
+    return resume_cache.stats()
@@ -0,0 +1,173 @@
+"""Vectorised scoring of many resumes against the whole job catalog.
+
+Jobs and resumes are mapped into the same hashed TF-IDF feature space.
+Jobs are kept as a sparse CSR matrix and densified one chunk at a time,
+so an N x M match matrix is produced with one matrix multiplication per
+chunk while peak memory stays bounded by ``chunk_size``.
+"""
+import os
+import threading
+import zlib
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from . import catalog, sql_models
+from .matching import job_index, job_terms
+from .models import ResumeScore
+from .text import terms
+
+BATCH_FEATURES = int(os.getenv("BATCH_FEATURES", "2048"))
+BATCH_CHUNK_SIZE = int(os.getenv("BATCH_CHUNK_SIZE", "4096"))
+
+JobRow = Tuple[str, str, str, Optional[Sequence[str]]]
+ResumeLike = Union[ResumeScore, Sequence[str]]
+
+
+def feature_of(term: str, dim: int) -> int:
+    # crc32 is stable across processes, unlike hash() under PYTHONHASHSEED.
+    return zlib.crc32(term.encode()) % dim
+
+
+@dataclass
+class JobMatrix:
+    """Hashed, L2-normalised TF-IDF rows for a set of jobs in CSR layout."""
+
+    job_ids: List[str]
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    idf: np.ndarray
+    dim: int
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[JobRow], dim: int = BATCH_FEATURES) -> "JobMatrix":
+        job_ids: List[str] = []
+        indptr = [0]
+        indices: List[int] = []
+        counts: List[float] = []
+        for job_id, title, description, requirements in rows:
+            features = {}
+            for term, tf in job_terms(title, description, requirements).items():
+                feature = feature_of(term, dim)
+                features[feature] = features.get(feature, 0) + tf
+            job_ids.append(job_id)
+            indices.extend(features)
+            counts.extend(features.values())
+            indptr.append(len(indices))
+
+        indices_arr = np.asarray(indices, dtype=np.int32)
+        df = np.bincount(indices_arr, minlength=dim).astype(np.float32)
+        idf = np.log((1 + len(job_ids)) / (1 + df)).astype(np.float32) + 1.0
+        data = np.log1p(np.asarray(counts, dtype=np.float32)) * idf[indices_arr]
+
+        indptr_arr = np.asarray(indptr, dtype=np.int64)
+        row_of = np.repeat(np.arange(len(job_ids)), np.diff(indptr_arr))
+        norms = np.sqrt(np.bincount(row_of, weights=data * data, minlength=len(job_ids)))
+        data /= np.maximum(norms, 1e-12)[row_of]
+        return cls(job_ids, indptr_arr, indices_arr, data.astype(np.float32), idf, dim)
+
+    @classmethod
+    def from_jobs(cls, jobs: Iterable[sql_models.Job], dim: int = BATCH_FEATURES) -> "JobMatrix":
+        return cls.from_rows(((j.id, j.title, j.description, j.requirements) for j in jobs), dim)
+
+    def __len__(self) -> int:
+        return len(self.job_ids)
+
+    def dense_chunk(self, start: int, stop: int) -> np.ndarray:
+        lo, hi = self.indptr[start], self.indptr[stop]
+        chunk = np.zeros((stop - start, self.dim), dtype=np.float32)
+        rows = np.repeat(np.arange(stop - start), np.diff(self.indptr[start:stop + 1]))
+        chunk[rows, self.indices[lo:hi]] = self.data[lo:hi]
+        return chunk
+
+    def featurize(self, resumes: Sequence[ResumeLike]) -> np.ndarray:
+        """Dense, L2-normalised TF-IDF rows for resumes in the job feature space."""
+        matrix = np.zeros((len(resumes), self.dim), dtype=np.float32)
+        for row, resume in enumerate(resumes):
+            phrases = resume.keywords if isinstance(resume, ResumeScore) else resume
+            for phrase in phrases:
+                for term in terms(phrase):
+                    matrix[row, feature_of(term, self.dim)] += 1.0
+        matrix = np.log1p(matrix) * self.idf
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.maximum(norms, 1e-12)
+
+    def iter_scores(self, resume_matrix: np.ndarray, chunk_size: int = BATCH_CHUNK_SIZE):
+        """Yield ``(start, scores)`` with cosine scores for one job chunk at a time."""
+        for start in range(0, len(self), chunk_size):
+            stop = min(start + chunk_size, len(self))
+            yield start, resume_matrix @ self.dense_chunk(start, stop).T
+
+
+def score_matrix(resumes: Sequence[ResumeLike], jobs: Union[JobMatrix, Iterable[sql_models.Job]],
+                 chunk_size: int = BATCH_CHUNK_SIZE) -> np.ndarray:
+    """Full ``len(resumes) x len(jobs)`` cosine match matrix."""
+    matrix = jobs if isinstance(jobs, JobMatrix) else JobMatrix.from_jobs(jobs)
+    resume_matrix = matrix.featurize(resumes)
+    out = np.empty((len(resumes), len(matrix)), dtype=np.float32)
+    for start, scores in matrix.iter_scores(resume_matrix, chunk_size):
+        out[:, start:start + scores.shape[1]] = scores
+    return out
+
+
+def top_matches(resumes: Sequence[ResumeLike], matrix: JobMatrix, k: int = 10,
+                chunk_size: int = BATCH_CHUNK_SIZE) -> List[List[Tuple[str, float]]]:
+    """Best ``k`` jobs per resume without materialising the full match matrix."""
+    resume_matrix = matrix.featurize(resumes)
+    best_scores = np.full((len(resumes), 0), -np.inf, dtype=np.float32)
+    best_jobs = np.empty((len(resumes), 0), dtype=np.int64)
+    for start, scores in matrix.iter_scores(resume_matrix, chunk_size):
+        cand_scores = np.concatenate([best_scores, scores], axis=1)
+        cand_jobs = np.concatenate(
+            [best_jobs, np.broadcast_to(np.arange(start, start + scores.shape[1]), scores.shape)], axis=1
+        )
+        if cand_scores.shape[1] > k:
+            keep = np.argpartition(-cand_scores, k - 1, axis=1)[:, :k]
+            cand_scores = np.take_along_axis(cand_scores, keep, axis=1)
+            cand_jobs = np.take_along_axis(cand_jobs, keep, axis=1)
+        best_scores, best_jobs = cand_scores, cand_jobs
+
+    order = np.argsort(-best_scores, axis=1, kind="stable")
+    best_scores = np.take_along_axis(best_scores, order, axis=1)
+    best_jobs = np.take_along_axis(best_jobs, order, axis=1)
+    return [
+        [(matrix.job_ids[j], float(s)) for j, s in zip(jobs_row, scores_row) if s > 0]
+        for jobs_row, scores_row in zip(best_jobs, best_scores)
+    ]
+
+
+class CatalogMatrixCache:
+    """Process-wide JobMatrix rebuilt only when the job catalog changes.
+
+    Keyed on the catalog version as well as the index generation, so writes
+    made by other worker processes are picked up too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._matrix: Optional[JobMatrix] = None
+        self._generation: Tuple[int, int] = (-1, -1)
+
+    def get(self, db: Session) -> JobMatrix:
+        with self._lock:
+            generation = (job_index.generation, catalog.cached_current(db))
+            if self._matrix is None or self._generation != generation:
+                rows = db.query(
+                    sql_models.Job.id,
+                    sql_models.Job.title,
+                    sql_models.Job.description,
+                    sql_models.Job.requirements,
+                ).yield_per(5000)
+                self._matrix = JobMatrix.from_rows(rows)
+                self._generation = generation
+            return self._matrix
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrix = None
+
+
+catalog_matrix = CatalogMatrixCache()
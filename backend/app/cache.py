@@ -0,0 +1,163 @@
+"""Content-addressed cache for resume analysis results.
+
+Two tiers: an in-process LRU with TTL and size-based eviction, and an
+optional table in the application database so results survive restarts
+and are shared between workers. Keys are SHA-256 digests of the uploaded
+bytes prefixed with the scoring version, so changing the scorer never
+serves stale results.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import sql_models
+from .scoring import SCORING_VERSION
+
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "1024"))
+RESUME_CACHE_MAX_BYTES = int(os.getenv("RESUME_CACHE_MAX_BYTES", str(4 * 1024 * 1024)))
+RESUME_CACHE_TTL = float(os.getenv("RESUME_CACHE_TTL", "86400"))
+RESUME_CACHE_PERSIST = os.getenv("RESUME_CACHE_PERSIST", "0").lower() in ("1", "true", "yes")
+
+
+def _json_size(value: Any) -> int:
+    return len(json.dumps(value))
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by entry count and approximate byte size.
+
+    ``sizeof`` measures an entry against ``max_bytes``; the default is its
+    JSON length.
+    """
+
+    def __init__(self, max_entries: int, max_bytes: int, ttl: float,
+                 sizeof: Callable[[Any], int] = _json_size):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.sizeof = sizeof
+        self._data: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, size, value = entry
+            if time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self._bytes -= size
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        size = self.sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._data[key] = (time.monotonic(), size, value)
+            self._bytes += size
+            while len(self._data) > self.max_entries or self._bytes > self.max_bytes:
+                _, (_, evicted_size, _) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class ResumeScoreCache:
+    def __init__(self, memory: LRUCache, persist: bool):
+        self.memory = memory
+        self.persist = persist
+        self.db_hits = 0
+        self.db_misses = 0
+
+    @staticmethod
+    def key(content_hash: str) -> str:
+        return f"{SCORING_VERSION}:{content_hash}"
+
+    def get(self, content_hash: str) -> Optional[Dict]:
+        return self.memory.get(self.key(content_hash))
+
+    def set(self, content_hash: str, value: Dict) -> None:
+        self.memory.set(self.key(content_hash), value)
+
+    def load(self, content_hash: str, db: Session) -> Optional[Dict]:
+        """Look up the persistent tier, promoting hits into memory."""
+        key = self.key(content_hash)
+        row = db.get(sql_models.ResumeAnalysisCache, key)
+        if row is None or self._expired(row.createdAt):
+            self.db_misses += 1
+            return None
+        self.db_hits += 1
+        self.memory.set(key, row.result)
+        return row.result
+
+    def store(self, content_hash: str, value: Dict, db: Session) -> None:
+        row = sql_models.ResumeAnalysisCache(
+            key=self.key(content_hash), result=value, createdAt=datetime.now(timezone.utc)
+        )
+        try:
+            db.merge(row)
+            db.commit()
+        except IntegrityError:
+            # Another worker stored the same document first; its result is identical.
+            db.rollback()
+
+    def _expired(self, created_at: datetime) -> bool:
+        if created_at.tzinfo is None:
+            created_at = created_at.replace(tzinfo=timezone.utc)
+        return datetime.now(timezone.utc) - created_at > timedelta(seconds=self.memory.ttl)
+
+    def stats(self) -> Dict:
+        return {
+            "memory": self.memory.stats(),
+            "persistent": {"enabled": self.persist, "hits": self.db_hits, "misses": self.db_misses},
+        }
+
+
+resume_cache = ResumeScoreCache(
+    LRUCache(RESUME_CACHE_MAX_ENTRIES, RESUME_CACHE_MAX_BYTES, RESUME_CACHE_TTL),
+    persist=RESUME_CACHE_PERSIST,
+)
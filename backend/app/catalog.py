@@ -0,0 +1,93 @@
+"""Job catalog version counter.
+
+Any transaction that writes jobs also bumps ``catalog_versions['jobs']``,
+so every process (and every worker of a multi-process deployment) can
+tell whether data derived from the catalog is out of date with one
+primary-key read.
+
+Each process also remembers which versions its own commits produced, so
+a process-local structure kept up to date by this process's write hooks
+(``matching.job_index``) can tell "only my writes happened" from "another
+worker wrote too" and reload only in the second case.
+"""
+import os
+import time
+from typing import Dict, Set, Tuple
+
+from sqlalchemy import event, select, update
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from . import sql_models
+
+JOBS = "jobs"
+# How long cached_current may serve a version without asking the database.
+# Writes in this process drop the cached value at once; other workers' writes
+# are seen within this many seconds.
+CATALOG_VERSION_CACHE_SECONDS = float(os.getenv("CATALOG_VERSION_CACHE_SECONDS", "1"))
+
+_table = sql_models.CatalogVersion.__table__
+_cached: Dict[str, Tuple[int, float]] = {}
+# Versions of JOBS committed by this process; bounded, forgetting the oldest.
+_written_here: Set[int] = set()
+_WRITTEN_HERE_MAX = 4096
+_PENDING_KEY = "catalog_bumps"
+
+
+def bump(connection: Connection, name: str = JOBS) -> None:
+    result = connection.execute(
+        update(_table).where(_table.c.name == name).values(version=_table.c.version + 1)
+    )
+    if result.rowcount == 0:
+        connection.execute(_table.insert().values(name=name, version=1))
+    _cached.pop(name, None)
+    if name == JOBS:
+        # The row stays locked until commit, so this is the version the commit produces.
+        connection.info.setdefault(_PENDING_KEY, []).append(current(connection, name))
+
+
+def current(connection, name: str = JOBS) -> int:
+    """Accepts a Session or a Connection."""
+    return connection.execute(select(_table.c.version).where(_table.c.name == name)).scalar() or 0
+
+
+def cached_current(connection, name: str = JOBS, max_age: float = CATALOG_VERSION_CACHE_SECONDS) -> int:
+    """``current``, reusing a recent read; cheap enough to call on every conditional request."""
+    hit = _cached.get(name)
+    now = time.monotonic()
+    if hit is not None and now - hit[1] < max_age:
+        return hit[0]
+    version = current(connection, name)
+    _cached[name] = (version, now)
+    return version
+
+
+def clear_cache() -> None:
+    _cached.clear()
+    _written_here.clear()
+
+
+def changed_elsewhere(since: int, until: int) -> bool:
+    """Whether any jobs version after ``since`` up to ``until`` came from another process."""
+    return any(version not in _written_here for version in range(since + 1, until + 1))
+
+
+@event.listens_for(Engine, "commit")
+def _remember_committed_bumps(connection: Connection) -> None:
+    versions = connection.info.pop(_PENDING_KEY, None)
+    if versions:
+        _written_here.update(versions)
+        while len(_written_here) > _WRITTEN_HERE_MAX:
+            _written_here.discard(min(_written_here))
+
+
+@event.listens_for(Engine, "rollback")
+def _forget_rolled_back_bumps(connection: Connection) -> None:
+    connection.info.pop(_PENDING_KEY, None)
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_on_job_writes(session: Session, flush_context) -> None:
+    # Same transaction as the write, so the bump commits or rolls back with it.
+    if any(isinstance(obj, sql_models.Job) for obj in (*session.new, *session.dirty, *session.deleted)):
+        bump(session.connection())
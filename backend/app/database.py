@@ -1,22 +1,206 @@
 import os
-from sqlalchemy import create_engine
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, TypeVar
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 # Default to SQLite, but allow override via env var for Postgres
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
+# Serve requests through an asyncio driver (aiosqlite/asyncpg) instead of
+# holding a threadpool thread for every database round-trip.
+DATABASE_ASYNC = os.getenv("DATABASE_ASYNC", "0").lower() in ("1", "true", "yes")
+
+# Connection pool (ignored for in-memory SQLite, which has a single connection).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Recycle before typical server/proxy idle timeouts drop the connection.
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1").lower() in ("1", "true", "yes")
+
+# SQLite tuning, applied to every new connection.
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+_ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+
+def async_url(url: str) -> str:
+    scheme, sep, rest = url.partition("://")
+    return _ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+
+
+class PoolMetrics:
+    """Checkout wait times across every instrumented pool in the process."""
+
+    def __init__(self, window: int = 1024):
+        self._lock = threading.Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def observe(self, wait: float, timed_out: bool = False) -> None:
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent.append(wait)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._recent.clear()
+            self.checkouts = self.timeouts = 0
+            self.total_wait = self.max_wait = 0.0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            recent = sorted(self._recent)
+            count = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "waitMsAvg": round(1000 * self.total_wait / count, 3) if count else 0.0,
+                "waitMsP99": round(1000 * recent[max(0, int(len(recent) * 0.99) - 1)], 3) if recent else 0.0,
+                "waitMsMax": round(1000 * self.max_wait, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _TimedCheckout:
+    # _do_get is where QueuePool blocks when every connection is in use.
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            pool_metrics.observe(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.observe(time.perf_counter() - started)
+        return connection
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
 
-engine = create_engine(
-    DATABASE_URL, 
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def _sqlite_pragmas(dbapi_connection, connection_record) -> None:
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed during a write; busy_timeout makes writers
+    # wait for the lock instead of failing with "database is locked".
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    parsed = make_url(url)
+    options: Dict[str, Any] = {}
+    if parsed.get_backend_name() == "sqlite" and not parsed.get_driver_name().startswith("aiosqlite"):
+        options["connect_args"] = {"check_same_thread": False}
+    default_pool = parsed.get_dialect().get_pool_class(parsed)
+    if issubclass(default_pool, QueuePool):
+        options.update(
+            poolclass=TimedAsyncQueuePool if issubclass(default_pool, AsyncAdaptedQueuePool) else TimedQueuePool,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+    return options
+
+
+def make_engine(url: str) -> Engine:
+    engine = create_engine(url, **_engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine, "connect", _sqlite_pragmas)
+    return engine
+
+
+def make_async_engine(url: str):
+    engine = create_async_engine(url, **_engine_options(url))
+    if engine.dialect.name == "sqlite":
+        event.listen(engine.sync_engine, "connect", _sqlite_pragmas)
+    return engine
+
+
+def pool_stats(engine) -> Dict[str, Any]:
+    pool = engine.pool
+    stats: Dict[str, Any] = {"pool": type(pool).__name__, **pool_metrics.stats()}
+    if isinstance(pool, QueuePool):
+        # Every queue pool here is built with DB_MAX_OVERFLOW (see _engine_options).
+        capacity = pool.size() + max(0, DB_MAX_OVERFLOW)
+        stats.update(
+            size=pool.size(),
+            checkedOut=pool.checkedout(),
+            overflow=max(0, pool.overflow()),
+            saturation=round(pool.checkedout() / capacity, 3) if capacity else 0.0,
+        )
+    return stats
+
+
+# The sync engine is always available: migrations, seeding and background
+# work use it even when requests are served asynchronously.
+engine = make_engine(DATABASE_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+async_engine = None
+AsyncSessionLocal = None
+if DATABASE_ASYNC:
+    async_engine = make_async_engine(os.getenv("ASYNC_DATABASE_URL", async_url(DATABASE_URL)))
+    # Nothing may lazy-load outside run_db, so keep attributes after commit.
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def get_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+else:
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+T = TypeVar("T")
+
+
+async def run_db(db, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run ``fn(session, *args)`` with whatever session ``get_db`` produced.
+
+    Route logic is written once against the sync Session API. An
+    AsyncSession runs it via ``run_sync`` on the event loop with
+    non-blocking I/O; a plain Session runs it in the threadpool as before.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
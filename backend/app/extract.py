@@ -0,0 +1,164 @@
+"""Plain-text extraction for uploaded resumes (PDF, DOCX and plain text).
+
+Only the standard library is used so the extractors can run inside the
+analysis worker processes without extra dependencies. Extraction is best
+effort: anything we cannot decode is skipped rather than failing the upload.
+"""
+import mmap
+import re
+import zipfile
+import zlib
+from typing import Iterator, List
+from xml.etree import ElementTree
+
+# Hard cap on extracted text so a huge upload cannot pin a worker forever.
+MAX_CHARS = 200_000
+# Largest inflated PDF stream we read, so a small deflate bomb cannot exhaust memory.
+MAX_DECODED_BYTES = 16 * 1024 * 1024
+
+PDF_MAGIC = b"%PDF"
+ZIP_MAGIC = b"PK\x03\x04"
+
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+_STREAM_RE = re.compile(rb"stream\r?\n")
+_TEXT_OP_RE = re.compile(
+    rb"\((?P<lit>(?:\\.|[^\\)])*)\)\s*(?:Tj|'|\")"
+    rb"|\[(?P<arr>[^\]]*)\]\s*TJ"
+    rb"|(?P<nl>T\*|Td|TD|ET)\b",
+    re.S,
+)
+_ARRAY_STR_RE = re.compile(rb"\(((?:\\.|[^\\)])*)\)|(-?\d+(?:\.\d+)?)")
+_ESCAPES = {b"n": b"\n", b"r": b"\r", b"t": b"\t", b"b": b"", b"f": b"", b"(": b"(", b")": b")", b"\\": b"\\"}
+_ESCAPE_RE = re.compile(rb"\\([0-7]{1,3}|.)", re.S)
+
+
+def sniff_kind(head: bytes, filename: str = "") -> str:
+    if head.startswith(PDF_MAGIC):
+        return "pdf"
+    if head.startswith(ZIP_MAGIC) or filename.lower().endswith(".docx"):
+        return "docx"
+    return "text"
+
+
+def extract_text(path: str, filename: str = "") -> str:
+    with open(path, "rb") as fh:
+        head = fh.read(8)
+    if not head:
+        return ""
+    kind = sniff_kind(head, filename)
+    if kind == "pdf":
+        text = _extract_pdf(path)
+    elif kind == "docx":
+        text = _extract_docx(path)
+    else:
+        text = _extract_plain(path)
+    return text[:MAX_CHARS]
+
+
+def _extract_plain(path: str) -> str:
+    parts: List[str] = []
+    size = 0
+    with open(path, "r", encoding="utf-8", errors="replace") as fh:
+        while size < MAX_CHARS:
+            chunk = fh.read(64 * 1024)
+            if not chunk:
+                break
+            parts.append(chunk)
+            size += len(chunk)
+    return "".join(parts)
+
+
+def _extract_docx(path: str) -> str:
+    try:
+        archive = zipfile.ZipFile(path)
+        doc = archive.open("word/document.xml")
+    except (zipfile.BadZipFile, KeyError):
+        return _extract_plain(path)
+    parts: List[str] = []
+    size = 0
+    with archive, doc:
+        for _, elem in ElementTree.iterparse(doc, events=("end",)):
+            if elem.tag == _W_NS + "t" and elem.text:
+                parts.append(elem.text)
+                size += len(elem.text)
+            elif elem.tag == _W_NS + "tab":
+                parts.append("\t")
+            elif elem.tag in (_W_NS + "p", _W_NS + "br"):
+                parts.append("\n")
+                elem.clear()
+            if size >= MAX_CHARS:
+                break
+    return "".join(parts)
+
+
+def _extract_pdf(path: str) -> str:
+    parts: List[str] = []
+    size = 0
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for content in _iter_pdf_streams(buf):
+            for piece in _iter_pdf_text(content):
+                parts.append(piece)
+                size += len(piece)
+                if size >= MAX_CHARS:
+                    return "".join(parts)
+    return "".join(parts)
+
+
+def _iter_pdf_streams(buf) -> Iterator[bytes]:
+    pos = 0
+    while True:
+        match = _STREAM_RE.search(buf, pos)
+        if not match:
+            return
+        start = match.end()
+        end = buf.find(b"endstream", start)
+        if end == -1:
+            return
+        pos = end + len(b"endstream")
+        header = buf[max(0, match.start() - 512):match.start()]
+        header = header[header.rfind(b"<<"):]
+        # Images, fonts and embedded files never carry page text.
+        if b"/Image" in header or b"/Length1" in header or b"/FontFile" in header or b"/XRef" in header:
+            continue
+        data = buf[start:end]
+        if b"/FlateDecode" in header:
+            inflater = zlib.decompressobj()
+            try:
+                data = inflater.decompress(data, MAX_DECODED_BYTES)
+            except zlib.error:
+                continue
+            if inflater.unconsumed_tail:
+                # Inflates past the cap: too large to be page text worth reading.
+                continue
+        elif b"/Filter" in header:
+            continue
+        if b"BT" in data:
+            yield data
+
+
+def _iter_pdf_text(content: bytes) -> Iterator[str]:
+    for match in _TEXT_OP_RE.finditer(content):
+        if match.group("nl"):
+            yield "\n"
+        elif match.group("lit") is not None:
+            yield _decode_pdf_string(match.group("lit"))
+        else:
+            pieces = []
+            for string, kerning in _ARRAY_STR_RE.findall(match.group("arr")):
+                if string or not kerning:
+                    pieces.append(_decode_pdf_string(string))
+                elif float(kerning) < -200:
+                    # Large negative kerning inside TJ is how PDFs encode word gaps.
+                    pieces.append(" ")
+            yield "".join(pieces)
+
+
+def _decode_pdf_string(raw: bytes) -> str:
+    def unescape(match):
+        seq = match.group(1)
+        if seq[:1].isdigit():
+            return bytes([int(seq, 8) & 0xFF])
+        return _ESCAPES.get(seq, seq)
+
+    return _ESCAPE_RE.sub(unescape, raw).decode("latin-1")
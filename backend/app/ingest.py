@@ -0,0 +1,229 @@
+"""Streaming bulk import of job feeds.
+
+Feeds are JSONL (one object per line) or CSV with a header row. Rows are
+validated as ``JobFeedItem`` and written in fixed-size batches with a
+single multi-row INSERT ... ON CONFLICT DO UPDATE per batch, so memory
+stays flat however large the feed is and re-importing a feed updates
+postings in place instead of duplicating them. Postings the feed does not
+date keep the date they were first imported with.
+
+    python -m app.ingest jobs.jsonl
+    python -m app.ingest --format csv - < jobs.csv
+"""
+import argparse
+import csv
+import hashlib
+import json
+import logging
+import os
+import sys
+import time
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from . import catalog, skills, sql_models
+from .matching import job_index
+from .models import IngestError, IngestReport, JobFeedItem
+from .recency import parse_posted_at, utcnow
+from .salary import parse_salary
+
+logger = logging.getLogger(__name__)
+
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "1000"))
+# Shared secret for POST /api/jobs/ingest; the endpoint is disabled when unset.
+INGEST_API_KEY = os.getenv("INGEST_API_KEY")
+MAX_REPORTED_ERRORS = 20
+FORMATS = ("jsonl", "csv")
+
+
+def natural_key(item: JobFeedItem) -> str:
+    """Stable id for feeds that do not supply one, so re-imports dedupe."""
+    if item.id:
+        return item.id
+    raw = "\x1f".join(part.strip().lower() for part in (item.company, item.title, item.location))
+    return "feed-" + hashlib.sha1(raw.encode()).hexdigest()[:20]
+
+
+def iter_records(stream: TextIO, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (line number, raw record); records that fail to parse are yielded as exceptions."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        while True:
+            line = reader.line_num
+            try:
+                row = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # e.g. a field over csv.field_size_limit(). The reader has consumed the
+                # bad record (without counting its lines) and resumes after it.
+                yield line + 1, exc
+                continue
+            # Empty cells mean "not given", not an empty string.
+            yield reader.line_num, {key: value for key, value in row.items() if key and value not in ("", None)}
+    for number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield number, json.loads(line)
+        except ValueError as exc:
+            yield number, exc
+
+
+def to_row(item: JobFeedItem, now) -> Dict:
+    # Core inserts bypass the ORM hooks in sql_models, so derived columns are set here.
+    parsed = parse_salary(item.salary)
+    salary_min, salary_max, salary_currency = parsed if parsed else (None, None, None)
+    return {
+        "id": natural_key(item),
+        "title": item.title,
+        "company": item.company,
+        "location": item.location,
+        "salary": item.salary,
+        "salary_min": salary_min,
+        "salary_max": salary_max,
+        "salary_currency": salary_currency,
+        "matchScore": item.matchScore,
+        "description": item.description,
+        "requirements": item.requirements,
+        "postedAt": item.postedAt or "",
+        # None when the feed gives no usable date; write_batch then keeps the stored one.
+        "posted_at": parse_posted_at(item.postedAt, now),
+        "type": item.type.value,
+    }
+
+
+def _upsert_statement(db: Session, keep: Tuple[str, ...] = ()):
+    """The batch upsert; ``keep`` names columns an update leaves as they are."""
+    table = sql_models.Job.__table__
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        insert = postgresql.insert
+    elif dialect == "sqlite":
+        insert = sqlite.insert
+    else:
+        return None
+    stmt = insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.id],
+        set_={
+            column.name: stmt.excluded[column.name] for column in table.columns
+            if column.name != "id" and column.name not in keep
+        },
+    )
+
+
+def _upsert(db: Session, rows: List[Dict], keep: Tuple[str, ...] = ()) -> None:
+    stmt = _upsert_statement(db, keep)
+    if stmt is not None:
+        # One executemany; SQLAlchemy batches it into multi-row VALUES.
+        db.execute(stmt, rows)
+    else:
+        for row in rows:
+            db.merge(sql_models.Job(**{key: value for key, value in row.items() if key not in keep}))
+
+
+def write_batch(db: Session, rows: List[Dict]) -> None:
+    dated = [row for row in rows if row["posted_at"] is not None]
+    undated = [row for row in rows if row["posted_at"] is None]
+    if dated:
+        _upsert(db, dated)
+    posted = {}
+    if undated:
+        # New postings are dated now; ones already stored keep their date, so
+        # re-importing a feed does not make old postings look new.
+        now = utcnow()
+        _upsert(db, [{**row, "posted_at": now} for row in undated], keep=("posted_at",))
+        ids = [row["id"] for row in undated]
+        posted = dict(db.query(sql_models.Job.id, sql_models.Job.posted_at).filter(sql_models.Job.id.in_(ids)))
+    # Core statements skip the Session hooks that normally do these.
+    skills.sync(db.connection(), ((row["id"], row["requirements"]) for row in rows))
+    catalog.bump(db.connection())
+    db.commit()
+    job_index.apply_bulk_upsert(
+        (row["id"], row["title"], row["description"], row["requirements"], row["posted_at"] or posted.get(row["id"]))
+        for row in rows
+    )
+
+
+def ingest_stream(db, stream: TextIO, fmt: str = "jsonl", batch_size: int = INGEST_BATCH_SIZE) -> IngestReport:
+    """Import a feed through ``db``, a Session or a ``repository.JobRepository``."""
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown feed format {fmt!r}")
+    started = time.perf_counter()
+    now = utcnow()
+    received = written = invalid = 0
+    errors: List[IngestError] = []
+    # Keyed by id: a feed repeating a posting within one batch keeps the last
+    # copy (Postgres rejects ON CONFLICT touching a row twice in one statement).
+    batch: Dict[str, Dict] = {}
+    write = db.write_rows if hasattr(db, "write_rows") else partial(write_batch, db)
+
+    def flush() -> None:
+        nonlocal written
+        if batch:
+            write(list(batch.values()))
+            written += len(batch)
+            batch.clear()
+            elapsed = time.perf_counter() - started
+            logger.info("ingested %d rows (%.0f rows/s)", written, written / elapsed if elapsed else 0.0)
+
+    for line, record in iter_records(stream, fmt):
+        received += 1
+        try:
+            if isinstance(record, Exception):
+                raise record
+            row = to_row(JobFeedItem.model_validate(record), now)
+        except (ValueError, ValidationError, csv.Error) as exc:
+            invalid += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append(IngestError(line=line, error=str(exc).splitlines()[0][:200]))
+            continue
+        batch[row["id"]] = row
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+
+    seconds = time.perf_counter() - started
+    return IngestReport(
+        received=received,
+        written=written,
+        invalid=invalid,
+        seconds=round(seconds, 3),
+        rowsPerSecond=round(written / seconds, 1) if seconds else 0.0,
+        errors=errors,
+    )
+
+
+def guess_format(filename: Optional[str]) -> str:
+    return "csv" if filename and filename.lower().endswith(".csv") else "jsonl"
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Bulk import a JSONL or CSV job feed.")
+    parser.add_argument("path", help="feed file, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=INGEST_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    from .database import SessionLocal, engine
+    from .migrations import run_migrations
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    run_migrations(engine)
+    fmt = args.format or guess_format(args.path)
+    with SessionLocal() as db:
+        if args.path == "-":
+            report = ingest_stream(db, sys.stdin, fmt, args.batch_size)
+        else:
+            with open(args.path, newline="", encoding="utf-8") as stream:
+                report = ingest_stream(db, stream, fmt, args.batch_size)
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
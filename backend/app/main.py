@@ -1,13 +1,45 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import Depends, FastAPI, Response
+from starlette.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from .api import auth, resume, jobs
-from .database import engine, Base
-from . import sql_models
+from fastapi.middleware.gzip import GZipMiddleware
+from .api import auth, resume, jobs, applications
+from .api.auth import require_ops_key
+from .database import async_engine, engine, pool_stats
+from .startup import prepare_database
+from .analysis import shutdown_executor
+from . import passwords
+from .metrics import CONTENT_TYPE_LATEST, MetricsMiddleware, render as render_metrics
+from .recommendations import refresher
+from .analysis_queue import analysis_queue
+from .ratelimit import RateLimitMiddleware
+from .repository import JOB_REPOSITORY, load_memory_catalog
+from .upload_limit import UploadSizeLimitMiddleware
 
-# Create tables
-Base.metadata.create_all(bind=engine)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Migrate and seed once per boot (serialised across workers), not at
+    # import time and never inside request handlers.
+    await run_in_threadpool(prepare_database, engine)
+    if JOB_REPOSITORY == "memory":
+        await run_in_threadpool(load_memory_catalog, engine)
+    refresher.start()
+    analysis_queue.start()
+    yield
+    await run_in_threadpool(analysis_queue.stop)
+    await run_in_threadpool(refresher.stop)
+    shutdown_executor()
+    passwords.shutdown_executor()
+    if async_engine is not None:
+        await async_engine.dispose()
 
-app = FastAPI(title="Resume Boost API")
+app = FastAPI(title="Resume Boost API", lifespan=lifespan)
+
+# Job listings are large and repetitive JSON; small bodies are not worth compressing.
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=6)
+# Both answer before the request body is read; inside CORS so browsers can see the 413/429.
+app.add_middleware(UploadSizeLimitMiddleware)
+app.add_middleware(RateLimitMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -16,13 +48,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
+# Outermost, so the timings include CORS handling and every other middleware.
+app.add_middleware(MetricsMiddleware)
 
 # Include Routers
 app.include_router(auth.router)
 app.include_router(resume.router)
 app.include_router(jobs.router)
+app.include_router(applications.router)
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to Resume Boost API"}
+
+@app.get("/api/db/stats", dependencies=[Depends(require_ops_key)])
+def db_stats():
+    # Request-serving pool first: that is where checkout waits hurt.
+    return pool_stats(async_engine or engine)
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return Response(render_metrics(), media_type=CONTENT_TYPE_LATEST)
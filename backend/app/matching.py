@@ -0,0 +1,296 @@
+"""In-memory BM25 index over the job catalog.
+
+The index is built once from the database and then kept current by
+session hooks that apply job inserts, updates and deletes after each
+commit, so recommendation requests never scan the jobs table. Those
+hooks only see this process's writes; ``ensure_current`` reloads when the
+catalog version shows another worker has written since the load.
+
+Postings are stored as compact ``array`` buffers per term; BM25 impact
+vectors are materialised lazily with NumPy and reused until the next
+write, which keeps a query to a handful of vector additions.
+"""
+import math
+import threading
+from datetime import datetime
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from . import catalog, sql_models  # catalog registers the version-bump hook
+from .recency import RECENCY_WEIGHT, as_utc, decay_factors
+from .text import terms
+
+# Title words say more about a job than boilerplate in the description.
+FIELD_WEIGHTS = (("title", 3), ("requirements", 2), ("description", 1))
+
+# Terms present in more than 1/DENSE_IMPACT_RATIO of jobs get dense impact vectors.
+DENSE_IMPACT_RATIO = 32
+
+_PENDING_KEY = "job_index_pending"
+
+
+def job_terms(title: str, description: str, requirements: Optional[Sequence[str]]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    fields = {"title": title or "", "description": description or "", "requirements": " ".join(requirements or [])}
+    for name, weight in FIELD_WEIGHTS:
+        for term in terms(fields[name]):
+            counts[term] = counts.get(term, 0) + weight
+    return counts
+
+
+class JobIndex:
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.RLock()
+        # Bumped on every committed catalog change, loaded or not, so derived
+        # structures (e.g. the batch scoring matrix) know when to rebuild.
+        self.generation = 0
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.generation += 1
+            self.loaded = False
+            # Catalog version the contents reflect; None when not loaded from a database.
+            self.version: Optional[int] = None
+            self._job_ids: List[Optional[str]] = []
+            self._doc_of: Dict[str, int] = {}
+            self._doc_len = array("f")
+            self._alive = array("b")
+            self._posted = array("d")  # epoch seconds, NaN when unknown
+            self._postings: Dict[str, Tuple[array, array]] = {}
+            self._total_len = 0.0
+            self._live = 0
+            self._impacts: Dict[str, Tuple[Optional[np.ndarray], np.ndarray]] = {}
+
+    def __len__(self) -> int:
+        return self._live
+
+    def load(self, db: Session, batch_size: int = 5000) -> None:
+        """(Re)build the index from the jobs table, streaming rows in batches."""
+        # Read before the rows: a write in between makes the index look stale, never current.
+        version = catalog.current(db)
+        rows = db.query(
+            sql_models.Job.id,
+            sql_models.Job.title,
+            sql_models.Job.description,
+            sql_models.Job.requirements,
+            sql_models.Job.posted_at,
+        ).yield_per(batch_size)
+        with self._lock:
+            self.load_rows(rows)
+            self.version = version
+
+    def load_rows(self, rows: Iterable[Tuple]) -> None:
+        """(Re)build the index from (id, title, description, requirements, posted_at) rows."""
+        with self._lock:
+            self.reset()
+            for job_id, title, description, requirements, posted_at in rows:
+                self._add(job_id, job_terms(title, description, requirements), posted_at)
+            self.loaded = True
+
+    def ensure_loaded(self, db: Session) -> None:
+        if not self.loaded:
+            with self._lock:
+                if not self.loaded:
+                    self.load(db)
+
+    def ensure_current(self, db: Session) -> None:
+        """``ensure_loaded``, reloading if another process has changed the catalog since."""
+        if self.loaded and self.version is not None:
+            latest = catalog.cached_current(db)
+            with self._lock:
+                if self.loaded and self.version is not None and latest > self.version:
+                    if catalog.changed_elsewhere(self.version, latest):
+                        self.loaded = False
+                    else:
+                        self.version = latest
+        self.ensure_loaded(db)
+
+    def upsert(self, job_id: str, title: str, description: str, requirements: Optional[Sequence[str]],
+               posted_at: Optional[datetime] = None) -> None:
+        with self._lock:
+            self._remove(job_id)
+            self._add(job_id, job_terms(title, description, requirements), posted_at)
+
+    def remove(self, job_id: str) -> None:
+        with self._lock:
+            self._remove(job_id)
+
+    def apply_bulk_upsert(self, jobs: Iterable[Tuple]) -> None:
+        """Record jobs written with Core statements, which the Session hooks below never see.
+
+        ``jobs`` yields the ``upsert`` arguments for each committed row.
+        """
+        with self._lock:
+            self.generation += 1
+            if not self.loaded:
+                return
+            for job in jobs:
+                self._remove(job[0])
+                self._add(job[0], job_terms(*job[1:4]), job[4] if len(job) > 4 else None)
+
+    def _add(self, job_id: str, counts: Dict[str, int], posted_at: Optional[datetime] = None) -> None:
+        doc = len(self._job_ids)
+        self._job_ids.append(job_id)
+        self._doc_of[job_id] = doc
+        length = float(sum(counts.values()))
+        self._doc_len.append(length)
+        self._alive.append(1)
+        self._posted.append(as_utc(posted_at).timestamp() if posted_at else math.nan)
+        self._total_len += length
+        self._live += 1
+        for term, tf in counts.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = (array("i"), array("f"))
+            postings[0].append(doc)
+            postings[1].append(tf)
+        self._impacts.clear()
+
+    def _remove(self, job_id: str) -> None:
+        doc = self._doc_of.pop(job_id, None)
+        if doc is None:
+            return
+        # Tombstone the slot; its postings are dropped on the next compaction.
+        self._alive[doc] = 0
+        self._job_ids[doc] = None
+        self._total_len -= self._doc_len[doc]
+        self._live -= 1
+        self._impacts.clear()
+        if len(self._job_ids) > 1024 and self._live < len(self._job_ids) // 2:
+            self._compact()
+
+    def _compact(self) -> None:
+        remap = {}
+        job_ids: List[Optional[str]] = []
+        doc_len = array("f")
+        posted = array("d")
+        for doc, job_id in enumerate(self._job_ids):
+            if job_id is not None:
+                remap[doc] = len(job_ids)
+                job_ids.append(job_id)
+                doc_len.append(self._doc_len[doc])
+                posted.append(self._posted[doc])
+        postings = {}
+        for term, (docs, tfs) in self._postings.items():
+            kept = [(remap[d], tf) for d, tf in zip(docs, tfs) if d in remap]
+            if kept:
+                postings[term] = (array("i", (d for d, _ in kept)), array("f", (tf for _, tf in kept)))
+        self._job_ids = job_ids
+        self._doc_of = {job_id: doc for doc, job_id in enumerate(job_ids)}
+        self._doc_len = doc_len
+        self._posted = posted
+        self._alive = array("b", [1]) * len(job_ids)
+        self._postings = postings
+
+    def _impact(self, term: str) -> Optional[Tuple[Optional[np.ndarray], np.ndarray]]:
+        cached = self._impacts.get(term)
+        if cached is not None:
+            return cached
+        postings = self._postings.get(term)
+        if postings is None or not self._live:
+            return None
+        docs = np.frombuffer(postings[0], dtype=np.int32).copy()
+        tf = np.frombuffer(postings[1], dtype=np.float32)
+        alive = np.frombuffer(self._alive, dtype=np.int8)[docs].astype(bool)
+        docs, tf = docs[alive], tf[alive]
+        df = len(docs)
+        if not df:
+            return None
+        idf = math.log(1 + (self._live - df + 0.5) / (df + 0.5))
+        avgdl = self._total_len / self._live or 1.0
+        dl = np.frombuffer(self._doc_len, dtype=np.float32)[docs]
+        weights = (idf * tf * (self.k1 + 1) / (tf + self.k1 * (1 - self.b + self.b * dl / avgdl))).astype(np.float32)
+        if df * DENSE_IMPACT_RATIO > len(self._job_ids):
+            # Common terms are cheaper to add as a dense vector than to scatter.
+            dense = np.zeros(len(self._job_ids), dtype=np.float32)
+            dense[docs] = weights
+            self._impacts[term] = (None, dense)
+        else:
+            self._impacts[term] = (docs, weights)
+        return self._impacts[term]
+
+    def search(self, query: Iterable[str], k: int = 20, allowed: Optional[Iterable[str]] = None,
+               recency: bool = True) -> List[Tuple[str, float]]:
+        """Top-k ``(job_id, score)`` pairs for the free-text query terms.
+
+        ``allowed`` restricts results to the given job ids (e.g. the ids
+        matching SQL-side filters). With ``recency`` the BM25 score is
+        scaled by a decay on posting age, evaluated at query time.
+        """
+        query_terms = set()
+        for phrase in query:
+            query_terms.update(terms(phrase))
+        with self._lock:
+            if not query_terms or not self._live:
+                return []
+            scores = np.zeros(len(self._job_ids), dtype=np.float32)
+            for term in query_terms:
+                impact = self._impact(term)
+                if impact is None:
+                    continue
+                docs, weights = impact
+                if docs is None:
+                    scores += weights
+                else:
+                    scores[docs] += weights
+            if recency and RECENCY_WEIGHT:
+                scores *= decay_factors(np.frombuffer(self._posted, dtype=np.float64)).astype(np.float32)
+            if allowed is not None:
+                mask = np.zeros(len(self._job_ids), dtype=bool)
+                mask[[self._doc_of[job_id] for job_id in allowed if job_id in self._doc_of]] = True
+                scores[~mask] = 0
+            candidates = np.flatnonzero(scores)
+            if len(candidates) > k:
+                # Partial selection is the vectorised equivalent of a bounded top-k heap.
+                candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+            order = candidates[np.lexsort((candidates, -scores[candidates]))]
+            return [(self._job_ids[doc], float(scores[doc])) for doc in order]
+
+
+def relevance_to_match_score(scores: Sequence[float]) -> List[int]:
+    """Scale BM25 scores to the 0-100 range shown to users, best match first."""
+    if not scores:
+        return []
+    top = max(scores) or 1.0
+    return [max(1, min(99, int(round(99 * s / top)))) for s in scores]
+
+
+job_index = JobIndex()
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_job_changes(session: Session, flush_context) -> None:
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    for obj in list(session.new) + list(session.dirty):
+        if isinstance(obj, sql_models.Job):
+            pending[obj.id] = (obj.title, obj.description, obj.requirements, obj.posted_at)
+    for obj in session.deleted:
+        if isinstance(obj, sql_models.Job):
+            pending[obj.id] = None
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_job_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    job_index.generation += 1
+    if not job_index.loaded:
+        return
+    for job_id, fields in pending.items():
+        if fields is None:
+            job_index.remove(job_id)
+        else:
+            job_index.upsert(job_id, *fields)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_job_changes(session: Session, previous_transaction) -> None:
+    session.info.pop(_PENDING_KEY, None)
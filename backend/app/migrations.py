@@ -0,0 +1,192 @@
+"""Lightweight, idempotent schema migrations.
+
+``create_all`` only creates missing tables, so databases created by an
+older release would never get new columns or indexes. ``run_migrations``
+adds whatever the models declare but the database lacks, then runs each
+registered data migration once (recorded in ``schema_migrations``); it is
+safe to run on every start. Once a database matches the current models, a
+fingerprint row lets later starts skip schema reflection entirely.
+
+    python -m app.migrations
+"""
+import hashlib
+import logging
+from datetime import datetime, timezone
+from typing import Callable, List, Set, Tuple
+
+from sqlalchemy import bindparam, inspect, select, text, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+
+from .database import Base
+from . import search, skills, sql_models
+from .recency import parse_posted_at, utcnow
+from .salary import parse_salary
+
+logger = logging.getLogger(__name__)
+
+
+def _add_missing_columns(engine: Engine) -> None:
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = column.type.compile(dialect=engine.dialect)
+            preparer = engine.dialect.identifier_preparer
+            with engine.begin() as conn:
+                conn.execute(text(
+                    f"ALTER TABLE {preparer.quote(table.name)} ADD COLUMN {preparer.quote(column.name)} {ddl}"
+                ))
+            logger.info("added column %s.%s", table.name, column.name)
+
+
+def _index_names(engine: Engine, inspector, table_name: str) -> Set[str]:
+    if engine.dialect.name == "sqlite":
+        # SQLAlchemy does not reflect SQLite expression indexes; sqlite_master lists them all.
+        with engine.connect() as conn:
+            return set(conn.execute(
+                text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table"),
+                {"table": table_name},
+            ).scalars())
+    return {index["name"] for index in inspector.get_indexes(table_name)}
+
+
+def _create_missing_indexes(engine: Engine) -> None:
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        existing = _index_names(engine, inspector, table.name)
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(bind=engine)
+                logger.info("created index %s", index.name)
+
+
+def backfill_salaries(engine: Engine, batch_size: int = 1000) -> int:
+    """Parse `salary` into salary_min/max/currency for rows written before those columns existed."""
+    job = sql_models.Job.__table__
+    updated = 0
+    last_id = ""
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(job.c.id, job.c.salary)
+                .where(job.c.id > last_id, job.c.salary.is_not(None))
+                .order_by(job.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return updated
+            params = []
+            for job_id, salary in rows:
+                parsed = parse_salary(salary)
+                if parsed:
+                    params.append({"b_id": job_id, "salary_min": parsed.min,
+                                   "salary_max": parsed.max, "salary_currency": parsed.currency})
+            if params:
+                conn.execute(
+                    update(job).where(job.c.id == bindparam("b_id")),
+                    params,
+                )
+            updated += len(params)
+            last_id = rows[-1][0]
+
+
+def backfill_posted_at(engine: Engine, batch_size: int = 1000) -> int:
+    """Convert legacy relative `postedAt` strings into absolute `posted_at` timestamps.
+
+    The strings were relative to an unknown moment, so the migration time is
+    the best available reference point.
+    """
+    job = sql_models.Job.__table__
+    now = utcnow()
+    updated = 0
+    last_id = ""
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(job.c.id, job.c.postedAt)
+                .where(job.c.id > last_id, job.c.posted_at.is_(None))
+                .order_by(job.c.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                return updated
+            conn.execute(
+                update(job).where(job.c.id == bindparam("b_id")),
+                [{"b_id": job_id, "posted_at": parse_posted_at(text, now) or now} for job_id, text in rows],
+            )
+            updated += len(rows)
+            last_id = rows[-1][0]
+
+
+# Ordered one-shot data migrations; never rename an entry once released.
+DATA_MIGRATIONS: List[Tuple[str, Callable[[Engine], object]]] = [
+    ("0001_backfill_salaries", backfill_salaries),
+    ("0002_backfill_posted_at", backfill_posted_at),
+    ("0003_full_text_search", search.install),
+    ("0004_backfill_job_skills", skills.backfill),
+]
+
+
+def schema_fingerprint() -> str:
+    """Stable digest of the declared tables, columns and indexes."""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(table.name.encode())
+        for column in table.columns:
+            digest.update(f"{column.name}:{column.type!r}".encode())
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            digest.update(index.name.encode())
+    return "schema:" + digest.hexdigest()[:16]
+
+
+def _applied(engine: Engine) -> Set[str]:
+    table = sql_models.SchemaMigration.__table__
+    try:
+        with engine.connect() as conn:
+            return set(conn.execute(select(table.c.name)).scalars())
+    except DBAPIError:
+        # Fresh database: schema_migrations does not exist yet.
+        return set()
+
+
+def _record(engine: Engine, name: str) -> None:
+    table = sql_models.SchemaMigration.__table__
+    with engine.begin() as conn:
+        conn.execute(table.insert().values(name=name, appliedAt=datetime.now(timezone.utc)))
+
+
+def _run_data_migrations(engine: Engine, applied: Set[str]) -> None:
+    for name, migrate in DATA_MIGRATIONS:
+        if name in applied:
+            continue
+        result = migrate(engine)
+        _record(engine, name)
+        logger.info("applied data migration %s (%s)", name, result)
+
+
+def run_migrations(engine: Engine) -> bool:
+    """Bring the database up to date; returns False when it already was."""
+    fingerprint = schema_fingerprint()
+    applied = _applied(engine)
+    if fingerprint in applied and all(name in applied for name, _ in DATA_MIGRATIONS):
+        return False
+    if fingerprint not in applied:
+        Base.metadata.create_all(bind=engine)
+        _add_missing_columns(engine)
+        _create_missing_indexes(engine)
+    _run_data_migrations(engine, applied)
+    if fingerprint not in applied:
+        _record(engine, fingerprint)
+    return True
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    logging.basicConfig(level=logging.INFO)
+    run_migrations(engine)
@@ -1,7 +1,8 @@
-from pydantic import BaseModel, EmailStr, Field, ConfigDict
+from pydantic import BaseModel, EmailStr, Field, ConfigDict, field_validator
 from typing import List, Optional
 from datetime import datetime
 from enum import Enum
+from .recency import as_utc, humanize_age
 
 class User(BaseModel):
     model_config = ConfigDict(from_attributes=True)
@@ -34,6 +35,25 @@ class ResumeScore(BaseModel):
     overall: int
     categories: ResumeCategories
     suggestions: List[str]
+    # Skills and salient terms from the resume, used to rank job recommendations.
+    keywords: List[str] = []
+
+class AnalysisTaskStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+class AnalysisTask(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+    id: str
+    status: AnalysisTaskStatus
+    priority: int
+    result: Optional[ResumeScore] = None
+    error: Optional[str] = None
+    createdAt: datetime
+    startedAt: Optional[datetime] = None
+    finishedAt: Optional[datetime] = None
 
 class JobType(str, Enum):
     FULL_TIME = "Full-time"
@@ -48,12 +68,142 @@ class Job(BaseModel):
     company: str
     location: str
     salary: Optional[str] = None
+    # Annualised bounds parsed from `salary`; null when it could not be parsed.
+    salaryMin: Optional[int] = None
+    salaryMax: Optional[int] = None
+    salaryCurrency: Optional[str] = None
     matchScore: int
     description: str
     requirements: List[str]
-    postedAt: str
+    postedAt: str # Human-readable age ("3 days ago"), derived from postedDate
+    postedDate: Optional[datetime] = None
     type: JobType
 
+    @staticmethod
+    def payload(job, match_score: Optional[int] = None) -> dict:
+        """This model's fields straight from a ``sql_models.Job``, unvalidated.
+
+        The columns already have the right types, so listing routes encode
+        these dicts directly instead of building a model per row.
+        """
+        return {
+            "id": job.id,
+            "title": job.title,
+            "company": job.company,
+            "location": job.location,
+            "salary": job.salary,
+            "salaryMin": job.salary_min,
+            "salaryMax": job.salary_max,
+            "salaryCurrency": job.salary_currency,
+            "matchScore": job.matchScore if match_score is None else match_score,
+            "description": job.description,
+            "requirements": job.requirements,
+            "postedAt": humanize_age(job.posted_at) or job.postedAt or "",
+            "postedDate": as_utc(job.posted_at) if job.posted_at else None,
+            "type": job.type,
+        }
+
+    @classmethod
+    def from_row(cls, job, match_score: Optional[int] = None) -> "Job":
+        """Build from a ``sql_models.Job``; ``match_score`` overrides the stored catalog score."""
+        return cls(**cls.payload(job, match_score))
+
+class JobSort(str, Enum):
+    MATCH = "match"
+    SALARY_DESC = "salary_desc"
+    SALARY_ASC = "salary_asc"
+    RECENT = "recent"
+
+class JobPage(BaseModel):
+    items: List[Job]
+    # Opaque keyset cursor for the next page; null on the last page.
+    nextCursor: Optional[str] = None
+
+class SearchHighlights(BaseModel):
+    # HTML-escaped text with matched words wrapped in <mark>...</mark>.
+    title: str
+    description: str
+
+class JobSearchHit(Job):
+    highlights: SearchHighlights
+
+class JobSearchPage(BaseModel):
+    items: List[JobSearchHit]
+    nextCursor: Optional[str] = None
+
+class JobMatch(BaseModel):
+    jobId: str
+    matchScore: int
+
+class BatchRecommendationRequest(BaseModel):
+    resumes: List[ResumeScore] = Field(..., max_length=1000)
+    limit: int = Field(10, ge=1, le=100)
+
+class BatchRecommendationResponse(BaseModel):
+    # One ranked list per resume, in request order.
+    results: List[List[JobMatch]]
+
 class JobApplicationResponse(BaseModel):
     success: bool
     message: str
+    applicationId: Optional[str] = None
+    # True when this user had already applied; no new application was created.
+    alreadyApplied: bool = False
+
+class Application(BaseModel):
+    id: str
+    jobId: str
+    appliedAt: datetime
+    # Null if the posting has since been removed from the catalog.
+    job: Optional[Job] = None
+
+class ApplicationPage(BaseModel):
+    items: List[Application]
+    nextCursor: Optional[str] = None
+
+class ApplicantCount(BaseModel):
+    jobId: str
+    count: int
+
+class UserRecommendations(BaseModel):
+    # sha256 of the resume the list was computed from.
+    resumeHash: str
+    items: List[Job]
+    computedAt: datetime
+    # True while a refresh against a newer catalog is pending.
+    stale: bool = False
+
+class JobFeedItem(BaseModel):
+    """One posting from an ingestion feed (JSONL object or CSV row)."""
+    # Feeds without their own ids are keyed on company/title/location.
+    id: Optional[str] = Field(None, max_length=128)
+    title: str = Field(..., min_length=1)
+    company: str = Field(..., min_length=1)
+    location: str = ""
+    salary: Optional[str] = None
+    matchScore: int = Field(0, ge=0, le=100)
+    description: str = ""
+    requirements: List[str] = []
+    postedAt: Optional[str] = None # Relative text or ISO date
+    type: JobType = JobType.FULL_TIME
+
+    @field_validator("requirements", mode="before")
+    @classmethod
+    def _split_requirements(cls, value):
+        # CSV feeds carry requirements as one "a; b; c" cell.
+        if isinstance(value, str):
+            return [part.strip() for part in value.split(";") if part.strip()]
+        return value
+
+class IngestError(BaseModel):
+    line: int
+    error: str
+
+class IngestReport(BaseModel):
+    received: int
+    written: int
+    invalid: int
+    seconds: float
+    rowsPerSecond: float
+    # First few rejected rows only, so a bad feed cannot balloon the response.
+    errors: List[IngestError] = []
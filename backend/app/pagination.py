@@ -0,0 +1,118 @@
+"""Opaque keyset cursors.
+
+A cursor is the sort key of the last row on a page, so fetching the next
+page is an index range scan that starts where the previous one stopped
+instead of an OFFSET that re-reads every earlier row.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import Query
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=_json_default).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+# Ranked pages are addressed by position; this keeps one within an SQL OFFSET.
+MAX_RANK = 2**31 - 1
+
+
+def rank_cursor(rank: int) -> str:
+    """Cursor for a ranked listing resuming at position ``rank``."""
+    return encode_cursor({"rank": rank})
+
+
+def rank_offset(cursor: Optional[str]) -> int:
+    """The position a ``rank_cursor`` resumes at; 0 for the first page."""
+    values = decode_cursor(cursor)
+    if values is None:
+        return 0
+    rank = values.get("rank")
+    # bool is an int too, but never a position.
+    if type(rank) is not int or not 0 <= rank <= MAX_RANK:
+        raise HTTPException(status_code=400, detail="Cursor does not match this sort order")
+    return rank
+
+
+def cursor_key(columns: Sequence, cursor: Optional[str]) -> Optional[List[Any]]:
+    """The sort key a cursor for ``columns`` resumes after; None for the first page."""
+    values = decode_cursor(cursor)
+    if values is None:
+        return None
+    try:
+        key = [_key_value(column, values[column.key]) for column in columns]
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor does not match this sort order")
+    if key[-1] is None:
+        # The last column is the unique tie-breaker, never NULL.
+        raise HTTPException(status_code=400, detail="Cursor does not match this sort order")
+    return key
+
+
+def _key_value(column, value: Any) -> Any:
+    """A decoded cursor value as ``column``'s Python type, so only scalars of that type reach a query."""
+    if value is None:
+        return None
+    if isinstance(column.type, DateTime):
+        if not isinstance(value, str):
+            raise TypeError(value)
+        return datetime.fromisoformat(value)
+    python_type = column.type.python_type
+    # bool is an int too; JSON numbers without a fraction decode as int.
+    if type(value) is python_type or (python_type is float and type(value) is int):
+        return value
+    raise TypeError(value)
+
+
+def cursor_after(columns: Sequence, row: Any) -> str:
+    """Cursor for the page following the one ending with ``row``."""
+    return encode_cursor({column.key: getattr(row, column.key) for column in columns})
+
+
+def keyset_page(
+    query: Query,
+    columns: Sequence,
+    cursor: Optional[str],
+    limit: int,
+    descending: bool = True,
+) -> Tuple[List[Any], Optional[str]]:
+    """Fetch one page ordered by ``columns`` (last one must be unique).
+
+    Returns the rows and the cursor for the following page, or None when
+    this is the last page.
+    """
+    key = cursor_key(columns, cursor)
+    if key is not None:
+        bound = tuple_(*columns) < tuple_(*key) if descending else tuple_(*columns) > tuple_(*key)
+        query = query.filter(bound)
+    order = [column.desc() if descending else column.asc() for column in columns]
+    rows = query.order_by(*order).limit(limit + 1).all()
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, cursor_after(columns, rows[-1])
@@ -0,0 +1,112 @@
+"""Password hashing off the request threads.
+
+argon2 and bcrypt are deliberately slow and release the GIL, so they run on
+a small dedicated thread pool. A login burst then queues there instead of
+occupying every Starlette threadpool worker and stalling unrelated
+requests. Hashes carry their own parameters; when the configured scheme or
+cost changes, ``verify_password`` returns a replacement hash so the stored
+value is upgraded on the user's next successful login.
+"""
+import asyncio
+import hmac
+import os
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Optional, Tuple
+
+import bcrypt
+from argon2 import PasswordHasher
+from argon2.exceptions import InvalidHashError, VerificationError
+
+PASSWORD_SCHEME = os.getenv("PASSWORD_SCHEME", "argon2")  # "argon2" or "bcrypt"
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", "2"))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", str(19 * 1024)))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", "1"))
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# Each argon2 hash holds ARGON2_MEMORY_COST while it runs, so this also caps memory.
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_argon2 = PasswordHasher(
+    time_cost=ARGON2_TIME_COST, memory_cost=ARGON2_MEMORY_COST, parallelism=ARGON2_PARALLELISM
+)
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _is_argon2(stored: str) -> bool:
+    return stored.startswith("$argon2")
+
+
+def _is_bcrypt(stored: str) -> bool:
+    return stored.startswith(("$2a$", "$2b$", "$2y$"))
+
+
+def _bcrypt_secret(password: str) -> bytes:
+    # bcrypt only reads the first 72 bytes and newer releases refuse longer input.
+    return password.encode()[:72]
+
+
+def hash_password(password: str) -> str:
+    if PASSWORD_SCHEME == "bcrypt":
+        return bcrypt.hashpw(_bcrypt_secret(password), bcrypt.gensalt(BCRYPT_ROUNDS)).decode()
+    return _argon2.hash(password)
+
+
+def _needs_rehash(stored: str) -> bool:
+    if PASSWORD_SCHEME == "bcrypt":
+        return not _is_bcrypt(stored) or int(stored.split("$")[2]) != BCRYPT_ROUNDS
+    return not _is_argon2(stored) or _argon2.check_needs_rehash(stored)
+
+
+def verify_password(password: str, stored: Optional[str]) -> Tuple[bool, Optional[str]]:
+    """Check ``password`` against ``stored``.
+
+    Returns ``(ok, new_hash)``; ``new_hash`` is set when the login succeeded
+    but the stored value should be replaced (legacy plaintext, another
+    scheme, or outdated cost parameters).
+    """
+    if not stored:
+        # Unknown account: spend the same time as a real check so response
+        # time does not reveal which emails are registered.
+        verify_password(password, _dummy_hash())
+        return False, None
+    if _is_argon2(stored):
+        try:
+            ok = _argon2.verify(stored, password)
+        except (VerificationError, InvalidHashError):
+            ok = False
+    elif _is_bcrypt(stored):
+        ok = bcrypt.checkpw(_bcrypt_secret(password), stored.encode())
+    else:
+        # Accounts created before hashing stored the password as-is.
+        ok = hmac.compare_digest(stored.encode(), password.encode())
+    if not ok:
+        return False, None
+    return True, hash_password(password) if _needs_rehash(stored) else None
+
+
+@lru_cache(maxsize=1)
+def _dummy_hash() -> str:
+    return hash_password(secrets.token_urlsafe(16))
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=HASH_WORKERS, thread_name_prefix="password-hash")
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True, cancel_futures=True)
+        _executor = None
+
+
+async def hash_password_async(password: str) -> str:
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), hash_password, password)
+
+
+async def verify_password_async(password: str, stored: Optional[str]) -> Tuple[bool, Optional[str]]:
+    return await asyncio.get_running_loop().run_in_executor(get_executor(), verify_password, password, stored)
@@ -0,0 +1,106 @@
+"""Opt-in sampling profiler for slow requests.
+
+Set ``PROFILE_SLOW_REQUEST_MS`` to enable. A sampled request (see
+``PROFILE_SAMPLE_RATE``) runs with a background thread that snapshots the
+stacks of every thread each ``PROFILE_INTERVAL_MS``, so work pushed to the
+threadpool or the async DB driver shows up too. If the request turns out
+slower than the threshold, the samples are written to ``PROFILE_DIR`` in
+folded-stack format, ready for flamegraph.pl or speedscope:
+
+    speedscope profiles/20260101T120000-GET-api_jobs-1234ms.folded
+
+Only one request is profiled at a time, and the samples include anything
+else the process did meanwhile.
+"""
+import logging
+import os
+import random
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_SLOW_REQUEST_MS = float(os.getenv("PROFILE_SLOW_REQUEST_MS", "0"))
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "1.0"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "5"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "resume-boost-profiles"))
+
+
+class StackSampler:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def start(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class SlowRequestProfiler:
+    def __init__(self, threshold_ms: float, sample_rate: float, interval_ms: float, directory: str):
+        self.threshold_ms = threshold_ms
+        self.sample_rate = sample_rate
+        self.interval = interval_ms / 1000
+        self.directory = directory
+        self._busy = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.threshold_ms > 0
+
+    def begin(self) -> Optional[StackSampler]:
+        """Start sampling this request, or None if it is not sampled."""
+        if not self.enabled or random.random() >= self.sample_rate:
+            return None
+        if not self._busy.acquire(blocking=False):
+            return None
+        return StackSampler(self.interval).start()
+
+    def end(self, sampler: StackSampler, method: str, route: str, elapsed_ms: float) -> Optional[str]:
+        """Stop sampling; returns the profile path if the request was slow enough to keep."""
+        try:
+            sampler.stop()
+        finally:
+            self._busy.release()
+        if elapsed_ms < self.threshold_ms or not sampler.samples:
+            return None
+        os.makedirs(self.directory, exist_ok=True)
+        name = re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+        stamp = time.strftime("%Y%m%dT%H%M%S")
+        path = os.path.join(self.directory, f"{stamp}-{method}-{name}-{elapsed_ms:.0f}ms.folded")
+        with open(path, "w") as out:
+            out.write(sampler.folded())
+        logger.warning("slow request %s %s took %.0fms; profile written to %s", method, route, elapsed_ms, path)
+        return path
+
+
+profiler = SlowRequestProfiler(PROFILE_SLOW_REQUEST_MS, PROFILE_SAMPLE_RATE, PROFILE_INTERVAL_MS, PROFILE_DIR)
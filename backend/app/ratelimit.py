@@ -0,0 +1,205 @@
+"""Per-client token-bucket rate limiting for expensive routes.
+
+``RateLimitMiddleware`` maps routes to named limits (``LIMITED_ROUTES``)
+and answers 429 before the request body is read. A limit is
+``count/seconds``: a client may burst ``count`` requests and then gets
+``count`` more per ``seconds``. Override or disable limits with
+``RATE_LIMITS``, e.g. ``login=20/60,analyze=off``.
+
+Clients are keyed by user when a bearer token with a valid signature is
+sent, else by IP; ``login`` and ``signup`` are always keyed by IP, so
+made-up tokens cannot buy a fresh bucket per attempt. Behind a
+proxy, run uvicorn with ``--forwarded-allow-ips`` so the client address is
+the real one. Buckets live in process memory by default, so each worker
+enforces its own budget. ``RATE_LIMIT_BACKEND=database`` keeps them in the
+``rate_limit_buckets`` table, shared by every worker, at the cost of one
+UPDATE per limited request.
+"""
+import math
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional, Tuple
+
+from fastapi.responses import JSONResponse
+from sqlalchemy import case, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from . import sql_models
+from .security import InvalidToken, signing_key, verify_token
+
+DEFAULT_LIMITS = {
+    "login": "10/60",
+    "signup": "5/60",
+    "analyze": "20/60",
+}
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")
+# The memory backend forgets the least recently seen clients past this many.
+RATE_LIMIT_MAX_CLIENTS = int(os.getenv("RATE_LIMIT_MAX_CLIENTS", "100000"))
+
+
+@dataclass(frozen=True)
+class Limit:
+    burst: int
+    per_second: float
+
+    @classmethod
+    def parse(cls, spec: str) -> Optional["Limit"]:
+        """``"10/60"`` -> burst 10, refilling 10 per 60 seconds; ``"off"`` -> None."""
+        if spec.strip().lower() in ("off", "none", "0"):
+            return None
+        count, _, seconds = spec.partition("/")
+        return cls(burst=int(count), per_second=int(count) / float(seconds or 1))
+
+
+def _parse_limits(raw: str) -> Dict[str, str]:
+    return dict(
+        (name.strip(), spec.strip())
+        for name, _, spec in (item.partition("=") for item in raw.split(",") if item.strip())
+    )
+
+
+RATE_LIMITS = {**DEFAULT_LIMITS, **_parse_limits(os.getenv("RATE_LIMITS", ""))}
+
+
+class MemoryBackend:
+    def __init__(self, max_clients: int = RATE_LIMIT_MAX_CLIENTS):
+        self.max_clients = max_clients
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        """Spend a token; returns 0 if allowed, else seconds until one is available."""
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (float(limit.burst), now))
+            tokens = min(float(limit.burst), tokens + (now - updated) * limit.per_second)
+            allowed = tokens >= 1
+            # Re-inserting keeps dict order least-recently-seen first.
+            self._buckets[key] = (tokens - 1 if allowed else tokens, now)
+            if len(self._buckets) > self.max_clients:
+                del self._buckets[next(iter(self._buckets))]
+            return 0.0 if allowed else (1 - tokens) / limit.per_second
+
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+
+
+class DatabaseBackend:
+    """Buckets in a table; each take is one conditional UPDATE, so concurrent workers cannot overspend."""
+
+    def __init__(self, engine_factory: Callable[[], Engine]):
+        self.engine_factory = engine_factory
+
+    def take(self, key: str, limit: Limit, now: float) -> float:
+        table = sql_models.RateLimitBucket.__table__
+        refilled = table.c.tokens + (now - table.c.updatedAt) * limit.per_second
+        capped = case((refilled > limit.burst, float(limit.burst)), else_=refilled)
+        with self.engine_factory().begin() as conn:
+            spent = conn.execute(
+                update(table)
+                .where(table.c.key == key, capped >= 1)
+                .values(tokens=capped - 1, updatedAt=now)
+            ).rowcount
+            if spent:
+                return 0.0
+            row = conn.execute(select(table.c.tokens, table.c.updatedAt).where(table.c.key == key)).first()
+            if row is not None:
+                tokens = min(float(limit.burst), row.tokens + (now - row.updatedAt) * limit.per_second)
+                return max(0.001, (1 - tokens) / limit.per_second)
+        try:
+            with self.engine_factory().begin() as conn:
+                conn.execute(insert(table).values(key=key, tokens=limit.burst - 1.0, updatedAt=now))
+            return 0.0
+        except IntegrityError:
+            # Another worker created the bucket first; spend from it instead.
+            return self.take(key, limit, now)
+
+    def reset(self) -> None:
+        with self.engine_factory().begin() as conn:
+            conn.execute(sql_models.RateLimitBucket.__table__.delete())
+
+
+def _default_engine() -> Engine:
+    from .database import engine
+    return engine
+
+
+class RateLimiter:
+    def __init__(self, limits: Dict[str, str], backend):
+        self.limits = {name: Limit.parse(spec) for name, spec in limits.items()}
+        self.backend = backend
+
+    def retry_after(self, name: str, client: str) -> float:
+        limit = self.limits.get(name)
+        if limit is None:
+            return 0.0
+        return self.backend.take(f"{name}:{client}", limit, time.time())
+
+    def reset(self) -> None:
+        self.backend.reset()
+
+
+# Limits for unauthenticated routes: a token there proves nothing about the client.
+IP_KEYED_LIMITS = {"login", "signup"}
+
+# (method, path) -> limit name. Checked before the body is read, so a
+# throttled client cannot make the server parse another upload.
+LIMITED_ROUTES = {
+    ("POST", "/auth/login"): "login",
+    ("POST", "/auth/signup"): "signup",
+    ("POST", "/api/resume/analyze"): "analyze",
+    ("POST", "/api/resume/tasks"): "analyze",
+}
+
+
+def client_key(scope: Scope, name: str) -> str:
+    authorization = Headers(scope=scope).get("authorization", "")
+    key = signing_key.loaded()
+    if name not in IP_KEYED_LIMITS and key is not None and authorization.lower().startswith("bearer "):
+        # Checking the signature needs no database lookup; revocation is left to the route.
+        try:
+            return "user:" + str(verify_token(authorization[7:].strip(), key)["sub"])
+        except InvalidToken:
+            pass
+    client = scope.get("client")
+    return "ip:" + (client[0] if client else "unknown")
+
+
+limiter = RateLimiter(
+    RATE_LIMITS,
+    DatabaseBackend(_default_engine) if RATE_LIMIT_BACKEND == "database" else MemoryBackend(),
+)
+
+
+class RateLimitMiddleware:
+    def __init__(
+        self, app: ASGIApp, routes: Dict[Tuple[str, str], str] = LIMITED_ROUTES, limiter: RateLimiter = limiter
+    ):
+        self.app = app
+        self.routes = routes
+        self.limiter = limiter
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        name = self.routes.get((scope.get("method"), scope.get("path"))) if scope["type"] == "http" else None
+        if name is None:
+            await self.app(scope, receive, send)
+            return
+        if isinstance(self.limiter.backend, DatabaseBackend):
+            wait = await run_in_threadpool(self.limiter.retry_after, name, client_key(scope, name))
+        else:
+            wait = self.limiter.retry_after(name, client_key(scope, name))
+        if wait <= 0:
+            await self.app(scope, receive, send)
+            return
+        response = JSONResponse(
+            {"detail": "Too many requests, slow down"},
+            status_code=429,
+            headers={"Retry-After": str(max(1, math.ceil(wait)))},
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,75 @@
+"""Posting-date helpers: relative-string parsing, humanising and decay."""
+import os
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+
+RECENCY_HALF_LIFE_DAYS = float(os.getenv("RECENCY_HALF_LIFE_DAYS", "30"))
+# Share of the ranking score that depends on freshness (0 disables decay).
+RECENCY_WEIGHT = float(os.getenv("RECENCY_WEIGHT", "0.3"))
+
+_RELATIVE_RE = re.compile(r"(\d+|an?|one)\+?\s*(minute|hour|day|week|month|year)s?\s+ago", re.I)
+_UNITS = {
+    "minute": timedelta(minutes=1),
+    "hour": timedelta(hours=1),
+    "day": timedelta(days=1),
+    "week": timedelta(weeks=1),
+    "month": timedelta(days=30),
+    "year": timedelta(days=365),
+}
+
+
+def utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes; everything we store is UTC.
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value.astimezone(timezone.utc)
+
+
+def parse_posted_at(text: Optional[str], now: Optional[datetime] = None) -> Optional[datetime]:
+    """Turn "2 days ago", "yesterday" or an ISO date into an absolute UTC timestamp."""
+    if not text:
+        return None
+    now = now or utcnow()
+    cleaned = text.strip().lower()
+    if cleaned in ("today", "just now", "new"):
+        return now
+    if cleaned == "yesterday":
+        return now - timedelta(days=1)
+    match = _RELATIVE_RE.search(cleaned)
+    if match:
+        amount = match.group(1)
+        count = int(amount) if amount.isdigit() else 1
+        return now - count * _UNITS[match.group(2)]
+    try:
+        return as_utc(datetime.fromisoformat(text.strip()))
+    except ValueError:
+        return None
+
+
+def humanize_age(posted_at: Optional[datetime], now: Optional[datetime] = None) -> str:
+    if posted_at is None:
+        return ""
+    days = max(0, ((now or utcnow()) - as_utc(posted_at)).days)
+    if days == 0:
+        return "today"
+    for unit, size in (("year", 365), ("month", 30), ("week", 7), ("day", 1)):
+        if days >= size:
+            count = days // size
+            return f"{count} {unit}{'s' if count > 1 else ''} ago"
+    return "today"
+
+
+def decay_factors(posted: np.ndarray, now: Optional[float] = None) -> np.ndarray:
+    """Ranking multipliers in [1 - RECENCY_WEIGHT, 1] for posting times in epoch seconds.
+
+    The fresh part halves every half-life; unknown (NaN) and future dates count as new.
+    """
+    age_days = ((time.time() if now is None else now) - posted) / 86400.0
+    fresh = np.exp2(-np.clip(np.nan_to_num(age_days, nan=0.0), 0, None) / RECENCY_HALF_LIFE_DAYS)
+    return (1 - RECENCY_WEIGHT) + RECENCY_WEIGHT * fresh
@@ -0,0 +1,174 @@
+"""Materialised per-user recommendations.
+
+When a signed-in user uploads a resume, its keywords are stored in
+``user_recommendations`` and the top-N jobs are computed in the
+background. Reads are then one primary-key fetch of that row. A row is
+stale once the job catalog's version (``catalog_versions['jobs']`` for
+the SQL repository) moves past the one it was computed against; stale rows keep being served while the refresher
+recomputes them. Until the first computation lands, reads return an empty,
+stale list.
+"""
+import logging
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Set, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from . import sql_models
+from .database import SessionLocal
+from .matching import relevance_to_match_score
+from .models import Job, UserRecommendations
+from .recency import humanize_age
+from .repository import repository_for
+
+logger = logging.getLogger(__name__)
+
+RECOMMENDATION_TOP_N = int(os.getenv("RECOMMENDATION_TOP_N", "50"))
+# How often the refresher checks the catalog version for changes made by
+# this or any other process.
+RECOMMENDATION_REFRESH_SECONDS = float(os.getenv("RECOMMENDATION_REFRESH_SECONDS", "30"))
+REFRESH_BATCH_SIZE = 200
+
+
+def record_resume(db: Session, user_id: str, resume_hash: str, keywords: List[str]) -> bool:
+    """Make this resume the user's current one; returns True if it needs computing."""
+    row = db.get(sql_models.UserRecommendation, (user_id, resume_hash))
+    if row is not None and row.items is not None:
+        return False
+    db.execute(delete(sql_models.UserRecommendation).where(sql_models.UserRecommendation.user_id == user_id))
+    db.add(sql_models.UserRecommendation(
+        user_id=user_id, resume_hash=resume_hash, keywords=keywords, items=None, catalogVersion=-1,
+        updatedAt=datetime.now(timezone.utc),
+    ))
+    db.commit()
+    return True
+
+
+def compute(db: Session, row: sql_models.UserRecommendation) -> None:
+    repository = repository_for(db)
+    version = repository.version()
+    hits = repository.rank(row.keywords or [], None, RECOMMENDATION_TOP_N)
+    scores = relevance_to_match_score([relevance for _, relevance in hits])
+    jobs = repository.get_many(job_id for job_id, _ in hits)
+    row.items = [
+        Job.from_row(jobs[job_id], score).model_dump(mode="json")
+        for (job_id, _), score in zip(hits, scores) if job_id in jobs
+    ]
+    row.catalogVersion = version
+    row.updatedAt = datetime.now(timezone.utc)
+    db.commit()
+
+
+def refresh_user(db: Session, user_id: str) -> Optional[sql_models.UserRecommendation]:
+    row = db.query(sql_models.UserRecommendation).filter(sql_models.UserRecommendation.user_id == user_id).first()
+    if row is not None and (row.items is None or row.catalogVersion < repository_for(db).version()):
+        compute(db, row)
+    return row
+
+
+def fingerprint(db: Session, user_id: str) -> Optional[Tuple]:
+    """What the user's response depends on, without loading the items; None if there is no row.
+
+    A catalogVersion of -1 means the items have not been computed yet.
+    """
+    table = sql_models.UserRecommendation.__table__
+    row = db.execute(
+        select(table.c.resume_hash, table.c.catalogVersion, table.c.updatedAt)
+        .where(table.c.user_id == user_id)
+        .limit(1)
+    ).first()
+    if row is None:
+        return None
+    return (*row, repository_for(db).version(cached=True))
+
+
+def read(db: Session, user_id: str) -> Optional[UserRecommendations]:
+    row = db.query(sql_models.UserRecommendation).filter(sql_models.UserRecommendation.user_id == user_id).first()
+    if row is None:
+        return None
+    if row.items is None:
+        # Not computed yet: the caller queues it rather than ranking on the read path.
+        return UserRecommendations(resumeHash=row.resume_hash, items=[], computedAt=row.updatedAt, stale=True)
+    items = [Job(**item) for item in row.items]
+    for item in items:
+        # Ages move on even when the catalog does not.
+        item.postedAt = humanize_age(item.postedDate) or item.postedAt
+    return UserRecommendations(
+        resumeHash=row.resume_hash,
+        items=items,
+        computedAt=row.updatedAt,
+        stale=row.catalogVersion < repository_for(db).version(cached=True),
+    )
+
+
+class RecommendationRefresher:
+    """Background thread that recomputes queued and stale users."""
+
+    def __init__(self, interval: float, session_factory: Callable[[], Session] = SessionLocal):
+        self.interval = interval
+        self.session_factory = session_factory
+        self._pending: Set[str] = set()
+        self._wake = threading.Condition()
+        self._stopping = False
+        self._thread: Optional[threading.Thread] = None
+
+    def enqueue(self, user_id: str) -> None:
+        with self._wake:
+            self._pending.add(user_id)
+            self._wake.notify()
+
+    def run_pending(self) -> int:
+        """One pass: queued users first, then rows behind the catalog. Returns rows refreshed."""
+        with self._wake:
+            queued, self._pending = self._pending, set()
+        refreshed = 0
+        with self.session_factory() as db:
+            for user_id in queued:
+                refreshed += refresh_user(db, user_id) is not None
+            version = repository_for(db).version()
+            while True:
+                stale = (
+                    db.query(sql_models.UserRecommendation)
+                    .filter(sql_models.UserRecommendation.catalogVersion < version)
+                    .limit(REFRESH_BATCH_SIZE)
+                    .all()
+                )
+                for row in stale:
+                    compute(db, row)
+                refreshed += len(stale)
+                if len(stale) < REFRESH_BATCH_SIZE:
+                    return refreshed
+
+    def _loop(self) -> None:
+        while True:
+            with self._wake:
+                if not self._pending and not self._stopping:
+                    self._wake.wait(self.interval)
+                if self._stopping:
+                    return
+            try:
+                refreshed = self.run_pending()
+                if refreshed:
+                    logger.info("refreshed recommendations for %d users", refreshed)
+            except Exception:
+                logger.exception("recommendation refresh failed")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._loop, name="recommendation-refresher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            with self._wake:
+                self._stopping = True
+                self._wake.notify()
+            self._thread.join()
+            self._thread = None
+
+
+refresher = RecommendationRefresher(RECOMMENDATION_REFRESH_SECONDS)
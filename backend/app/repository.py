@@ -0,0 +1,512 @@
+"""The job catalog behind one interface, stored in SQL or in process memory.
+
+Route logic is written once against ``JobRepository`` and run with the
+``JobRunner`` that the ``job_runner`` dependency provides:
+
+* ``SqlJobRepository`` works on the request's Session (sync or async, via
+  ``run_db``) and the indexed ``jobs``, ``job_skills`` and search tables.
+* ``MemoryJobRepository`` keeps the catalog in a dict by id, with
+  secondary indexes by type, company and skill, every job's key in each
+  listing order (sorted, so a cursor is a bisect) and an inverted word
+  index for search. Reads never touch the database; given an engine, writes
+  go to the jobs table first and then to memory.
+
+``JOB_REPOSITORY=memory`` serves the catalog from memory: the app loads it
+from the database once at startup, after migrations and seeding, and from
+then on catalog writes (ingest) are committed to the jobs table before the
+copy in memory changes, so they survive a restart and applications can
+reference them. Each process holds its
+own copy, so ``app.serve`` runs this mode with a single worker. Tests can also hand
+routes a repository of their own by overriding ``job_runner``. Users, applications and the other
+per-user tables stay in SQL either way. Both backends return the same jobs
+and cursors for the same calls (see tests/test_repository.py); only the
+order of search hits differs, since memory scores by weighted term counts
+rather than bm25.
+"""
+import bisect
+import heapq
+import os
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import (
+    TYPE_CHECKING, Any, Awaitable, Callable, Dict, Iterable, List, Optional, Protocol, Sequence, Set, Tuple,
+)
+
+from fastapi import Depends
+from sqlalchemy import func
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from . import catalog, ingest, search, skills, sql_models
+from .batch_scoring import JobMatrix, catalog_matrix
+from .database import get_db, run_db
+from .matching import JobIndex, job_index
+from .models import JobSort
+from .pagination import cursor_after, cursor_key, keyset_page
+from .recency import as_utc, parse_posted_at, utcnow
+
+if TYPE_CHECKING:
+    from .api.jobs import JobFilters
+
+# "sql" (default) or "memory".
+JOB_REPOSITORY = os.getenv("JOB_REPOSITORY", "sql")
+
+LISTING_ORDER = (sql_models.Job.matchScore, sql_models.Job.id)
+
+# sort -> (keyset columns, descending). Salary sorts skip jobs without a parsed
+# salary, and place open-ended ones by the bound they advertise.
+SORT_ORDERS = {
+    JobSort.MATCH: (LISTING_ORDER, True),
+    JobSort.SALARY_DESC: ((sql_models.Job.salary_high, sql_models.Job.id), True),
+    JobSort.SALARY_ASC: ((sql_models.Job.salary_low, sql_models.Job.id), False),
+    JobSort.RECENT: ((sql_models.Job.posted_at, sql_models.Job.id), True),
+}
+
+Hit = Tuple[str, float]
+
+
+class JobRepository(Protocol):
+    """Catalog reads and writes. Returned jobs are ``sql_models.Job`` rows; treat them as read-only."""
+
+    def version(self, cached: bool = False) -> int:
+        """Changes whenever the catalog does; ``cached`` may serve a recent read."""
+
+    def get(self, job_id: str) -> Optional[sql_models.Job]: ...
+
+    def get_many(self, job_ids: Iterable[str]) -> Dict[str, sql_models.Job]:
+        """The jobs among ``job_ids`` that exist, by id."""
+
+    def page(
+        self, filters: "JobFilters", sort: JobSort, cursor: Optional[str], limit: int
+    ) -> Tuple[List[sql_models.Job], Optional[str]]:
+        """One keyset page in ``sort`` order and the cursor for the next, or None on the last page."""
+
+    def search(
+        self, words: List[str], prefix: bool, filters: "JobFilters", offset: int, limit: int
+    ) -> List[sql_models.Job]:
+        """Jobs matching every word (the last as a prefix with ``prefix``), best first."""
+
+    def skill_matches(
+        self, names: List[str], filters: "JobFilters", offset: int, limit: int
+    ) -> List[Tuple[sql_models.Job, int]]:
+        """(job, how many of ``names`` it requires), most first, then by id."""
+
+    def rank(self, keywords: Sequence[str], filters: Optional["JobFilters"], k: int) -> List[Hit]:
+        """The ``k`` most relevant (job id, BM25 relevance) for resume keywords."""
+
+    def matrix(self) -> JobMatrix:
+        """The catalog as a batch-scoring matrix."""
+
+    def add(self, jobs: Iterable[sql_models.Job]) -> None:
+        """Insert or replace jobs by id."""
+
+    def write_rows(self, rows: List[Dict]) -> None:
+        """Insert or replace ``ingest.to_row`` rows."""
+
+    def remove(self, job_ids: Iterable[str]) -> None: ...
+
+
+class SqlJobRepository:
+    """The catalog in the database, through one sync Session.
+
+    Writes commit, and the Session hooks keep job_skills, the catalog
+    version and the process-wide BM25 index in step with them.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def version(self, cached: bool = False) -> int:
+        return catalog.cached_current(self.db) if cached else catalog.current(self.db)
+
+    def get(self, job_id: str) -> Optional[sql_models.Job]:
+        return self.db.get(sql_models.Job, job_id)
+
+    def get_many(self, job_ids: Iterable[str]) -> Dict[str, sql_models.Job]:
+        ids = list(job_ids)
+        if not ids:
+            return {}
+        return {job.id: job for job in self.db.query(sql_models.Job).filter(sql_models.Job.id.in_(ids))}
+
+    def page(self, filters, sort, cursor, limit):
+        columns, descending = SORT_ORDERS[sort]
+        query = filters.apply(self.db.query(sql_models.Job))
+        if sort is not JobSort.MATCH:
+            query = query.filter(columns[0].is_not(None))
+        return keyset_page(query, columns, cursor, limit, descending=descending)
+
+    def search(self, words, prefix, filters, offset, limit):
+        return search.ranked(self.db, words, prefix, offset, limit, filters.apply if filters.active else None)
+
+    def skill_matches(self, names, filters, offset, limit):
+        matched = func.count().label("matched")
+        # Counted on the covering (skill_id, job_id) index alone; jobs is joined
+        # only when filters need it, and read by id for the page's rows.
+        query = (
+            self.db.query(sql_models.JobSkill.job_id, matched)
+            .join(sql_models.Skill, sql_models.Skill.id == sql_models.JobSkill.skill_id)
+            .filter(sql_models.Skill.name.in_(names))
+            .group_by(sql_models.JobSkill.job_id)
+        )
+        if filters.active:
+            query = filters.apply(query.join(sql_models.Job, sql_models.Job.id == sql_models.JobSkill.job_id))
+        ranked = query.order_by(matched.desc(), sql_models.JobSkill.job_id).offset(offset).limit(limit).all()
+        jobs = self.get_many(job_id for job_id, _ in ranked)
+        return [(jobs[job_id], count) for job_id, count in ranked if job_id in jobs]
+
+    def rank(self, keywords, filters, k):
+        job_index.ensure_current(self.db)
+        allowed = None
+        if filters is not None and filters.active:
+            allowed = [job_id for job_id, in filters.apply(self.db.query(sql_models.Job.id))]
+        return job_index.search(keywords, k=k, allowed=allowed)
+
+    def matrix(self) -> JobMatrix:
+        return catalog_matrix.get(self.db)
+
+    def add(self, jobs):
+        for job in jobs:
+            self.db.merge(job)
+        self.db.commit()
+
+    def write_rows(self, rows):
+        ingest.write_batch(self.db, rows)
+
+    def remove(self, job_ids):
+        ids = list(job_ids)
+        for job in self.db.query(sql_models.Job).filter(sql_models.Job.id.in_(ids)):
+            self.db.delete(job)
+        self.db.commit()
+
+
+_WORD = re.compile(r"\w+")
+
+
+def _fold(text: str) -> str:
+    """Lowercase and, as FTS5's remove_diacritics does, strip accents: "Café" -> "cafe"."""
+    text = text.lower()
+    if text.isascii():
+        return text
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def _search_words(job: sql_models.Job) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for field, weight in search.SEARCH_FIELDS:
+        value = getattr(job, field)
+        text = " ".join(value) if isinstance(value, list) else value or ""
+        for word in _WORD.findall(_fold(text)):
+            weights[word] = weights.get(word, 0.0) + weight
+    return weights
+
+
+def _stored(job: sql_models.Job) -> sql_models.Job:
+    """A detached copy, completed the way the insert hooks and a database round trip would."""
+    copy = sql_models.Job(**{column.key: getattr(job, column.key) for column in sql_models.Job.__table__.columns})
+    copy.type = getattr(copy.type, "value", copy.type)
+    copy.apply_parsed_salary()
+    if copy.posted_at is None:
+        copy.posted_at = parse_posted_at(copy.postedAt) or utcnow()
+    # Stored naive UTC, as the DateTime column hands it back.
+    copy.posted_at = as_utc(copy.posted_at).replace(tzinfo=None)
+    return copy
+
+
+class MemoryJobRepository:
+    """The catalog in process memory; every method is a few dict and bisect operations.
+
+    One lock serialises access, so it may be shared by request threads and
+    background threads. Once ``load``-ed from a database, ``write_rows``
+    persists through SQL before updating memory and the version is the SQL
+    catalog version; otherwise (tests, benchmarks) both stay in memory.
+    """
+
+    def __init__(self, jobs: Iterable[sql_models.Job] = (), engine: Optional[Engine] = None):
+        self.engine = engine
+        self._lock = threading.RLock()
+        self._version = 0
+        self._jobs: Dict[str, sql_models.Job] = {}
+        self._skills: Dict[str, Set[str]] = {}
+        self._by_type: Dict[str, Set[str]] = defaultdict(set)
+        self._by_company: Dict[str, Set[str]] = defaultdict(set)
+        self._by_skill: Dict[str, Set[str]] = defaultdict(set)
+        # Per sort, the key of every job that has one, ascending.
+        self._orders: Dict[JobSort, List[Tuple]] = {sort: [] for sort in SORT_ORDERS}
+        self._words: Dict[str, Dict[str, float]] = defaultdict(dict)  # word -> job id -> weight
+        self._vocabulary: Optional[List[str]] = None
+        self._index: Optional[JobIndex] = None
+        self._matrix: Optional[Tuple[int, JobMatrix]] = None
+        self.add(jobs)
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def version(self, cached: bool = False) -> int:
+        return self._version
+
+    def load(self, engine: Engine, batch_size: int = 5000) -> None:
+        """Fill from the jobs table and send writes there; the version follows ``catalog_versions``."""
+        self.engine = engine
+        with Session(bind=engine) as db, self._lock:
+            self.add(db.query(sql_models.Job).yield_per(batch_size))
+            self._version = catalog.current(db)
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    def get_many(self, job_ids):
+        with self._lock:
+            return {job_id: self._jobs[job_id] for job_id in job_ids if job_id in self._jobs}
+
+    @staticmethod
+    def _key(sort: JobSort, job: sql_models.Job) -> Optional[Tuple]:
+        columns, _ = SORT_ORDERS[sort]
+        key = tuple(getattr(job, column.key) for column in columns)
+        return None if key[0] is None else key
+
+    def _candidates(self, filters: "JobFilters") -> Optional[Set[str]]:
+        """Ids the indexed filters allow, or None when none of them is set."""
+        sets = []
+        if filters.type is not None:
+            sets.append(self._by_type.get(filters.type.value, set()))
+        if filters.company is not None:
+            sets.append(self._by_company.get(filters.company, set()))
+        sets.extend(self._by_skill.get(name, set()) for name in filters.skills)
+        if not sets:
+            return None
+        sets.sort(key=len)
+        return sets[0].intersection(*sets[1:])
+
+    def _filtered(self, filters: "JobFilters", job_ids: Iterable[str]) -> List[str]:
+        if not filters.active:
+            return list(job_ids)
+        test, jobs, job_skills = filters.matcher(), self._jobs, self._skills
+        return [job_id for job_id in job_ids if test(jobs[job_id], job_skills[job_id])]
+
+    def page(self, filters, sort, cursor, limit):
+        columns, descending = SORT_ORDERS[sort]
+        after = cursor_key(columns, cursor)
+        if after is not None and after[0] is None:
+            # Past the rows without a key (SQL sorts them last), which memory does not list.
+            return [], None
+        test = filters.matcher() if filters.active else None
+        with self._lock:
+            jobs, job_skills = self._jobs, self._skills
+            candidates = self._candidates(filters)
+            order = self._orders[sort]
+            if candidates is not None and len(candidates) * 16 < len(order):
+                # Few enough to sort outright.
+                order = sorted(key for key in (self._key(sort, jobs[job_id]) for job_id in candidates) if key)
+                candidates = None
+            if descending:
+                start = len(order) if after is None else bisect.bisect_left(order, tuple(after))
+                positions = range(start - 1, -1, -1)
+            else:
+                start = 0 if after is None else bisect.bisect_right(order, tuple(after))
+                positions = range(start, len(order))
+            keys = []
+            for position in positions:
+                job_id = order[position][-1]
+                if candidates is not None and job_id not in candidates:
+                    continue
+                if test is not None and not test(jobs[job_id], job_skills[job_id]):
+                    continue
+                keys.append(order[position])
+                if len(keys) > limit:
+                    break
+            rows = [jobs[key[-1]] for key in keys[:limit]]
+        if len(keys) <= limit:
+            return rows, None
+        return rows, cursor_after(columns, rows[-1])
+
+    def _postings(self, word: str, prefix: bool) -> Dict[str, float]:
+        if not prefix:
+            return self._words.get(word, {})
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._words)
+        merged: Dict[str, float] = {}
+        position = bisect.bisect_left(self._vocabulary, word)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(word):
+            for job_id, weight in self._words[self._vocabulary[position]].items():
+                merged[job_id] = merged.get(job_id, 0.0) + weight
+            position += 1
+        return merged
+
+    def search(self, words, prefix, filters, offset, limit):
+        words = [_fold(word) for word in words]
+        with self._lock:
+            postings = [self._postings(word, prefix and i == len(words) - 1) for i, word in enumerate(words)]
+            postings.sort(key=len)
+            scores = dict(postings[0])
+            for other in postings[1:]:
+                scores = {job_id: score + other[job_id] for job_id, score in scores.items() if job_id in other}
+            ranked = heapq.nsmallest(
+                offset + limit, self._filtered(filters, scores), key=lambda job_id: (-scores[job_id], job_id)
+            )
+            return [self._jobs[job_id] for job_id in ranked[offset:]]
+
+    def skill_matches(self, names, filters, offset, limit):
+        with self._lock:
+            counts: Dict[str, int] = Counter()
+            for name in names:
+                counts.update(self._by_skill.get(name, ()))
+            ranked = heapq.nsmallest(
+                offset + limit, self._filtered(filters, counts), key=lambda job_id: (-counts[job_id], job_id)
+            )
+            return [(self._jobs[job_id], counts[job_id]) for job_id in ranked[offset:]]
+
+    def _job_index(self) -> JobIndex:
+        if self._index is None:
+            index = JobIndex()
+            index.load_rows(
+                (job.id, job.title, job.description, job.requirements, job.posted_at) for job in self._jobs.values()
+            )
+            self._index = index
+        return self._index
+
+    def rank(self, keywords, filters, k):
+        with self._lock:
+            allowed = None
+            if filters is not None and filters.active:
+                candidates = self._candidates(filters)
+                allowed = self._filtered(filters, self._jobs if candidates is None else candidates)
+            return self._job_index().search(keywords, k=k, allowed=allowed)
+
+    def matrix(self) -> JobMatrix:
+        with self._lock:
+            if self._matrix is None or self._matrix[0] != self._version:
+                self._matrix = (self._version, JobMatrix.from_jobs(self._jobs.values()))
+            return self._matrix[1]
+
+    def _unindex(self, job_ids: Set[str]) -> None:
+        old = [self._jobs.pop(job_id) for job_id in job_ids if job_id in self._jobs]
+        if not old:
+            return
+        for job in old:
+            self._by_type[job.type].discard(job.id)
+            self._by_company[job.company].discard(job.id)
+            for name in self._skills.pop(job.id):
+                self._by_skill[name].discard(job.id)
+            for word in _search_words(job):
+                self._words[word].pop(job.id, None)
+                if not self._words[word]:
+                    del self._words[word]
+            if self._index is not None:
+                self._index.remove(job.id)
+        gone = {job.id for job in old}
+        for sort, order in self._orders.items():
+            if len(gone) > 32:
+                order[:] = [key for key in order if key[-1] not in gone]
+                continue
+            for job in old:
+                key = self._key(sort, job)
+                if key is not None:
+                    del order[bisect.bisect_left(order, key)]
+
+    def add(self, jobs):
+        stored = {job.id: job for job in map(_stored, jobs)}
+        if not stored:
+            return
+        with self._lock:
+            self._unindex(set(stored))
+            for job in stored.values():
+                self._jobs[job.id] = job
+                self._skills[job.id] = set(skills.canonicalize(job.requirements))
+                self._by_type[job.type].add(job.id)
+                self._by_company[job.company].add(job.id)
+                for name in self._skills[job.id]:
+                    self._by_skill[name].add(job.id)
+                for word, weight in _search_words(job).items():
+                    self._words[word][job.id] = weight
+                if self._index is not None:
+                    self._index.upsert(job.id, job.title, job.description, job.requirements, job.posted_at)
+            for sort, order in self._orders.items():
+                order.extend(key for key in (self._key(sort, job) for job in stored.values()) if key is not None)
+                # The new keys are one unsorted run after a sorted one, which timsort merges in linear time.
+                order.sort()
+            self._vocabulary = None
+            self._version += 1
+
+    def write_rows(self, rows):
+        if self.engine is not None:
+            with Session(bind=self.engine) as db:
+                ingest.write_batch(db, rows)
+                # Read back what was stored, undated postings' kept dates included.
+                ids = [row["id"] for row in rows]
+                with self._lock:
+                    self.add(db.query(sql_models.Job).filter(sql_models.Job.id.in_(ids)))
+                    # The shared counter, so versions (and the ETags and recommendation
+                    # rows keyed on them) keep increasing across restarts.
+                    self._version = catalog.current(db)
+            return
+        with self._lock:
+            # Rows the feed did not date keep the date already held, as in write_batch.
+            held = {row["id"]: self._jobs[row["id"]].posted_at for row in rows if row["id"] in self._jobs}
+            self.add(
+                sql_models.Job(**{**row, "posted_at": row["posted_at"] or held.get(row["id"])}) for row in rows
+            )
+
+    def remove(self, job_ids):
+        with self._lock:
+            self._unindex(set(job_ids))
+            self._vocabulary = None
+            self._version += 1
+
+
+# The process's catalog when JOB_REPOSITORY=memory.
+memory_jobs = MemoryJobRepository()
+
+
+def load_memory_catalog(engine: Engine, batch_size: int = 5000) -> int:
+    """Fill ``memory_jobs`` from the jobs table, and send its writes there; returns how many jobs it holds."""
+    memory_jobs.load(engine, batch_size)
+    return len(memory_jobs)
+
+
+def repository_for(db: Session) -> JobRepository:
+    """The configured repository, for code that holds a sync Session (e.g. background refreshes)."""
+    return memory_jobs if JOB_REPOSITORY == "memory" else SqlJobRepository(db)
+
+
+JobRunner = Callable[..., Awaitable[Any]]
+
+
+def runs_inline(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Mark route logic that costs a few lookups, which ``memory_runner`` then runs on the event loop."""
+    fn.runs_inline = True
+    return fn
+
+
+def memory_runner(repository: MemoryJobRepository) -> JobRunner:
+    async def run(fn: Callable[..., Any], *args: Any) -> Any:
+        if getattr(fn, "runs_inline", False):
+            # Cheaper than the threadpool hop.
+            return fn(repository, *args)
+        # Listings, ranking, matrix rebuilds and ingest take long enough to
+        # stall every other request; the repository's lock makes threads safe.
+        return await run_in_threadpool(fn, repository, *args)
+    return run
+
+
+def _on_session(db: Session, fn: Callable[..., Any], *args: Any) -> Any:
+    return fn(SqlJobRepository(db), *args)
+
+
+def sql_runner(db) -> JobRunner:
+    async def run(fn: Callable[..., Any], *args: Any) -> Any:
+        return await run_db(db, _on_session, fn, *args)
+    return run
+
+
+# ``await run_jobs(fn, *args)`` calls ``fn(repository, *args)``, the way
+# ``run_db`` calls ``fn(session, *args)``. Async, so FastAPI resolves them
+# without a threadpool hop.
+if JOB_REPOSITORY == "memory":
+    async def job_runner() -> JobRunner:
+        return memory_runner(memory_jobs)
+else:
+    async def job_runner(db: Session = Depends(get_db)) -> JobRunner:
+        return sql_runner(db)
@@ -0,0 +1,43 @@
+"""Encode response bodies to JSON in one pass, and answer conditional requests.
+
+With ``response_model`` set, FastAPI validates a handler's return value
+against the model again and dumps it to Python dicts, and only then does
+``json.dumps`` run. The listing routes instead build ``Job.payload`` dicts
+straight from ORM rows and return ``json_response``, which encodes them
+once with pydantic-core. ``response_model`` stays on those routes for the
+OpenAPI schema; FastAPI passes ``Response`` objects through untouched.
+
+Cacheable routes derive a weak ETag from whatever versions their body
+depends on (e.g. the catalog version), so an ``If-None-Match`` revalidation
+is answered with a 304 before any rows are read.
+"""
+import hashlib
+from typing import Any, Mapping, Optional
+
+from fastapi import Request, Response
+from pydantic_core import to_json
+
+
+def json_response(value: Any, status_code: int = 200, headers: Optional[Mapping[str, str]] = None) -> Response:
+    """``value`` may mix models, dicts, lists and datetimes; it is encoded, not validated."""
+    return Response(to_json(value), status_code=status_code, media_type="application/json", headers=headers)
+
+
+def weak_etag(*parts: Any) -> str:
+    digest = hashlib.sha1("\x1f".join(map(str, parts)).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+
+def matches_etag(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+
+def not_modified(etag: str, cache_control: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
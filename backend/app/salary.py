@@ -0,0 +1,80 @@
+"""Parse free-form salary strings into structured, annualised ranges.
+
+    >>> parse_salary("$150,000 - $200,000")
+    ParsedSalary(min=150000, max=200000, currency='USD')
+    >>> parse_salary("€45/hr")
+    ParsedSalary(min=93600, max=93600, currency='EUR')
+"""
+import re
+from typing import List, NamedTuple, Optional
+
+DEFAULT_CURRENCY = "USD"
+
+_SYMBOLS = (("CA$", "CAD"), ("C$", "CAD"), ("A$", "AUD"), ("$", "USD"), ("€", "EUR"), ("£", "GBP"), ("₹", "INR"), ("¥", "JPY"))
+_CODE_RE = re.compile(r"\b(USD|EUR|GBP|CAD|AUD|INR|JPY|CHF|SGD|NZD)\b", re.I)
+_AMOUNT_RE = re.compile(r"(\d[\d,.]*)\s*([kKmM])?\b")
+_EURO_THOUSANDS_RE = re.compile(r"^\d{1,3}(?:\.\d{3})+$")
+
+# Multipliers that turn a quoted rate into a yearly amount.
+_PERIODS = (
+    (re.compile(r"/\s*h(?:ou)?r|per hour|hourly|an hour", re.I), 2080),
+    (re.compile(r"/\s*w(?:ee)?k|per week|weekly", re.I), 52),
+    (re.compile(r"/\s*mo(?:nth)?|per month|monthly", re.I), 12),
+    (re.compile(r"/\s*day|per day|daily", re.I), 260),
+)
+_UPPER_ONLY_RE = re.compile(r"\b(?:up to|max(?:imum)?|under)\b", re.I)
+_LOWER_ONLY_RE = re.compile(r"\+|\b(?:from|min(?:imum)?|starting at|at least)\b", re.I)
+
+
+class ParsedSalary(NamedTuple):
+    min: Optional[int]
+    max: Optional[int]
+    currency: str
+
+
+def _amount(number: str, suffix: Optional[str]) -> Optional[float]:
+    if _EURO_THOUSANDS_RE.match(number):
+        number = number.replace(".", "")
+    number = number.replace(",", "").rstrip(".")
+    try:
+        value = float(number)
+    except ValueError:
+        return None
+    if suffix:
+        value *= 1_000 if suffix.lower() == "k" else 1_000_000
+    return value
+
+
+def _currency(text: str) -> str:
+    match = _CODE_RE.search(text)
+    if match:
+        return match.group(1).upper()
+    for symbol, code in _SYMBOLS:
+        if symbol in text:
+            return code
+    return DEFAULT_CURRENCY
+
+
+def parse_salary(text: Optional[str]) -> Optional[ParsedSalary]:
+    if not text:
+        return None
+    amounts: List[float] = []
+    for number, suffix in _AMOUNT_RE.findall(text):
+        value = _amount(number, suffix)
+        if value is not None:
+            amounts.append(value)
+    if not amounts:
+        return None
+
+    multiplier = 1
+    for pattern, factor in _PERIODS:
+        if pattern.search(text):
+            multiplier = factor
+            break
+    low, high = min(amounts[:2]) * multiplier, max(amounts[:2]) * multiplier
+
+    if len(amounts) == 1 and _UPPER_ONLY_RE.search(text):
+        return ParsedSalary(None, int(round(high)), _currency(text))
+    if len(amounts) == 1 and _LOWER_ONLY_RE.search(text):
+        return ParsedSalary(int(round(low)), None, _currency(text))
+    return ParsedSalary(int(round(low)), int(round(high)), _currency(text))
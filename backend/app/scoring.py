@@ -0,0 +1,243 @@
+"""Deterministic resume scoring.
+
+Every category is a weighted checklist over features pulled from the
+extracted text, so the same document always produces the same score.
+"""
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Set
+
+from .text import STOPWORDS, tokenize
+
+SECTION_HEADINGS = {
+    "summary": ("summary", "profile", "objective", "about me"),
+    "experience": ("experience", "employment", "work history", "professional experience"),
+    "education": ("education", "academic", "qualifications"),
+    "skills": ("skills", "technical skills", "core competencies", "technologies"),
+    "projects": ("projects", "portfolio"),
+    "certifications": ("certifications", "certificates", "licenses"),
+}
+
+SKILLS = frozenset(
+    """
+    python java javascript typescript go golang rust ruby php scala kotlin swift c c++ c# sql nosql
+    react angular vue node.js node django flask fastapi spring rails next.js express graphql rest
+    html css tailwind sass figma redux jquery
+    aws gcp azure docker kubernetes terraform ansible jenkins ci/cd linux git github gitlab
+    postgresql postgres mysql mongodb redis elasticsearch kafka rabbitmq spark hadoop airflow snowflake
+    pandas numpy tensorflow pytorch scikit-learn machine-learning nlp tableau excel powerbi
+    agile scrum jira microservices serverless devops testing pytest jest selenium
+    salesforce sap seo marketing analytics
+    """.split()
+)
+
+KEYWORDS = frozenset(
+    """
+    leadership management managed led mentored collaboration stakeholder stakeholders strategy
+    strategic optimization optimized scalable scalability performance architecture designed
+    delivered launched implemented developed built automated automation reduced increased improved
+    revenue budget roadmap cross-functional customer customers communication analysis analytical
+    problem-solving ownership initiative deployment production reliability security compliance
+    """.split()
+)
+
+ACTION_VERBS = frozenset(
+    """
+    achieved built created delivered designed developed drove established grew implemented improved
+    increased launched led managed mentored optimized reduced resolved scaled shipped spearheaded
+    streamlined automated architected coordinated negotiated owned
+    """.split()
+)
+
+DEGREES = (
+    "bachelor", "master", "phd", "ph.d", "doctorate", "mba", "associate degree",
+    "b.s", "b.sc", "bsc", "b.a", "m.s", "m.sc", "msc", "m.a", "b.tech", "m.tech",
+)
+INSTITUTIONS = ("university", "college", "institute", "school of")
+
+BULLET_RE = re.compile(r"^\s*(?:[-*•▪●–◦]|\d+[.)])\s+")
+QUANTIFIED_RE = re.compile(r"\d+(?:\.\d+)?\s*%|[$€£]\s*\d|\b\d{2,}[kKmM]?\b\s+(?:users|customers|clients|people|engineers|projects|requests)")
+YEARS_RE = re.compile(r"(\d{1,2})\+?\s*(?:years|yrs)")
+DATE_RANGE_RE = re.compile(r"\b((?:19|20)\d{2})\s*(?:-|–|to)\s*((?:19|20)\d{2}|present|current|now)\b", re.I)
+EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+PHONE_RE = re.compile(r"\+?\d[\d\s().-]{8,}\d")
+GPA_RE = re.compile(r"\bgpa\b", re.I)
+
+# Bump whenever scoring changes so cached results keyed on it are invalidated.
+SCORING_VERSION = "2"
+
+MAX_KEYWORDS = 40
+
+WEIGHTS = {"formatting": 0.2, "keywords": 0.2, "experience": 0.25, "education": 0.15, "skills": 0.2}
+
+# Suggestion text keyed by the check that produces it, in priority order.
+SUGGESTIONS = {
+    "summary": "Include a professional summary at the top of your resume",
+    "bullets": "Consider reformatting to use bullet points for better readability",
+    "contact": "Add your email address and phone number so recruiters can reach you",
+    "length": "Aim for 400-800 words; your resume is {length} than recruiters expect",
+    "keywords": "Add more industry-specific keywords to improve ATS compatibility",
+    "quantified": 'Consider adding quantifiable achievements (e.g., "Increased sales by 25%")',
+    "action_verbs": "Start experience bullets with strong action verbs (e.g., led, built, improved)",
+    "experience_section": "Add a clearly labelled work experience section with dates",
+    "education": "List your degree, institution and graduation year in an education section",
+    "skills": "Add more technical skills relevant to your target positions",
+    "skills_section": "Group your skills under a dedicated skills section",
+}
+FALLBACK_SUGGESTION = "Tailor your resume to each job description to maximise your match score"
+
+
+@dataclass
+class TextFeatures:
+    word_count: int = 0
+    line_count: int = 0
+    bullet_lines: int = 0
+    sections: Set[str] = field(default_factory=set)
+    has_email: bool = False
+    has_phone: bool = False
+    skills: Set[str] = field(default_factory=set)
+    keywords: Set[str] = field(default_factory=set)
+    action_verbs: int = 0
+    quantified: int = 0
+    years_stated: int = 0
+    years_ranged: int = 0
+    degrees: int = 0
+    institutions: int = 0
+    has_gpa: bool = False
+    term_counts: Dict[str, int] = field(default_factory=dict)
+
+
+def extract_features(text: str) -> TextFeatures:
+    features = TextFeatures()
+    lowered = text.lower()
+    tokens = tokenize(text)
+    features.word_count = len(tokens)
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        features.line_count += 1
+        if BULLET_RE.match(line):
+            features.bullet_lines += 1
+        heading = stripped.lower().rstrip(":")
+        if len(heading) <= 40:
+            for section, names in SECTION_HEADINGS.items():
+                if heading in names:
+                    features.sections.add(section)
+
+    for token in tokens:
+        if len(token) > 2 and token not in STOPWORDS and not token[0].isdigit():
+            features.term_counts[token] = features.term_counts.get(token, 0) + 1
+    token_set = set(tokens)
+    features.skills = token_set & SKILLS
+    features.keywords = token_set & KEYWORDS
+    features.action_verbs = sum(1 for t in tokens if t in ACTION_VERBS)
+    features.quantified = len(QUANTIFIED_RE.findall(text))
+    features.has_email = EMAIL_RE.search(text) is not None
+    features.has_phone = PHONE_RE.search(text) is not None
+
+    features.years_stated = max((int(y) for y in YEARS_RE.findall(lowered)), default=0)
+    for start, end in DATE_RANGE_RE.findall(text):
+        end_year = int(end) if end.isdigit() else date.today().year
+        features.years_ranged += max(0, end_year - int(start))
+
+    features.degrees = sum(lowered.count(d) for d in DEGREES)
+    features.institutions = sum(lowered.count(i) for i in INSTITUTIONS)
+    features.has_gpa = GPA_RE.search(text) is not None
+    return features
+
+
+def resume_keywords(f: TextFeatures, limit: int = MAX_KEYWORDS) -> List[str]:
+    """Recognised skills first, then the most frequent remaining terms."""
+    keywords = sorted(f.skills)
+    frequent = sorted(f.term_counts.items(), key=lambda item: (-item[1], item[0]))
+    keywords.extend(term for term, _ in frequent if term not in f.skills)
+    return keywords[:limit]
+
+
+def _clamp(value: float) -> int:
+    return int(round(max(0.0, min(100.0, value))))
+
+
+def score_features(f: TextFeatures) -> Dict:
+    failed: List[str] = []
+    length_hint = ""
+
+    formatting = 20.0
+    if f.word_count >= 150:
+        formatting += 15
+    if 400 <= f.word_count <= 800:
+        formatting += 15
+    elif f.word_count > 0:
+        length_hint = "shorter" if f.word_count < 400 else "longer"
+        failed.append("length")
+    bullet_ratio = f.bullet_lines / f.line_count if f.line_count else 0.0
+    formatting += min(20.0, bullet_ratio * 50)
+    if bullet_ratio < 0.2:
+        failed.append("bullets")
+    formatting += min(20.0, len(f.sections) * 5)
+    if "summary" not in f.sections:
+        failed.append("summary")
+    if f.has_email and f.has_phone:
+        formatting += 10
+    else:
+        failed.append("contact")
+
+    keywords = 15.0 + min(60.0, len(f.keywords) * 6) + min(25.0, len(f.skills) * 2.5)
+    if len(f.keywords) < 6:
+        failed.append("keywords")
+
+    years = max(f.years_stated, f.years_ranged)
+    experience = 15.0 + min(35.0, years * 5) + min(25.0, f.quantified * 5) + min(15.0, f.action_verbs * 2)
+    if "experience" in f.sections:
+        experience += 10
+    else:
+        failed.append("experience_section")
+    if f.quantified < 3:
+        failed.append("quantified")
+    if f.action_verbs < 5:
+        failed.append("action_verbs")
+
+    education = 20.0 + min(40.0, f.degrees * 20) + min(20.0, f.institutions * 10)
+    if "education" in f.sections:
+        education += 15
+    if f.has_gpa:
+        education += 5
+    if f.degrees == 0 or "education" not in f.sections:
+        failed.append("education")
+
+    skills = 15.0 + min(65.0, len(f.skills) * 6.5)
+    if "skills" in f.sections:
+        skills += 20
+    else:
+        failed.append("skills_section")
+    if len(f.skills) < 8:
+        failed.append("skills")
+
+    categories = {
+        "formatting": _clamp(formatting),
+        "keywords": _clamp(keywords),
+        "experience": _clamp(experience),
+        "education": _clamp(education),
+        "skills": _clamp(skills),
+    }
+    overall = _clamp(sum(categories[name] * weight for name, weight in WEIGHTS.items()))
+
+    suggestions = [
+        SUGGESTIONS[key].format(length=length_hint) for key in SUGGESTIONS if key in failed
+    ][:5]
+    if not suggestions:
+        suggestions = [FALLBACK_SUGGESTION]
+
+    return {
+        "overall": overall,
+        "categories": categories,
+        "suggestions": suggestions,
+        "keywords": resume_keywords(f),
+    }
+
+
+def score_text(text: str) -> Dict:
+    return score_features(extract_features(text))
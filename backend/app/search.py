@@ -0,0 +1,204 @@
+"""Ranked full-text search over the job catalog.
+
+On SQLite, ``jobs_fts`` is an FTS5 index over the title, company,
+description and requirements of ``jobs``. It is an external-content table,
+so the text is stored once, and triggers on ``jobs`` keep it in sync with
+every write path: ORM flushes, ingest upserts and raw SQL alike. On
+Postgres, ``jobs.search_vector`` is a generated, GIN-indexed tsvector
+column. Both sides index words unstemmed and case-folded, so a prefix
+typed so far ("kube") matches the same jobs on either database.
+
+Both are created with the ``jobs`` table and by the ``0003_full_text_search``
+data migration for existing databases. ``VACUUM`` may renumber the rowids
+the SQLite index points at; rebuild it afterwards with
+
+    python -m app.search
+"""
+import html
+import re
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import column, event, func, literal_column, table, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from . import sql_models
+
+# Only words reach the database, so user input can never form FTS5 or
+# tsquery operators.
+MAX_TERMS = 16
+_TERM = re.compile(r"\w+")
+_WORDS = re.compile(r"(\w+)")
+SNIPPET_WORDS = 24
+# Indexed columns, in jobs_fts order, with their bm25 weights.
+SEARCH_FIELDS = (("title", 10.0), ("company", 5.0), ("description", 1.0), ("requirements", 3.0))
+_FTS_WEIGHTS = tuple(weight for _, weight in SEARCH_FIELDS)
+
+_SQLITE_DDL = (
+    """CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts USING fts5(
+        title, company, description, requirements,
+        content='jobs', tokenize='unicode61 remove_diacritics 2', prefix='2 3 4'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_insert AFTER INSERT ON jobs BEGIN
+        INSERT INTO jobs_fts(rowid, title, company, description, requirements)
+        VALUES (new.rowid, new.title, new.company, new.description, new.requirements);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_delete AFTER DELETE ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, requirements)
+        VALUES ('delete', old.rowid, old.title, old.company, old.description, old.requirements);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS jobs_fts_update AFTER UPDATE OF title, company, description, requirements
+    ON jobs BEGIN
+        INSERT INTO jobs_fts(jobs_fts, rowid, title, company, description, requirements)
+        VALUES ('delete', old.rowid, old.title, old.company, old.description, old.requirements);
+        INSERT INTO jobs_fts(rowid, title, company, description, requirements)
+        VALUES (new.rowid, new.title, new.company, new.description, new.requirements);
+    END""",
+)
+
+_POSTGRES_DDL = (
+    """ALTER TABLE jobs ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('simple', coalesce(title, '')), 'A')
+        || setweight(to_tsvector('simple', coalesce(company, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(requirements::text, '')), 'B')
+        || setweight(to_tsvector('simple', coalesce(description, '')), 'C')
+    ) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_jobs_search_vector ON jobs USING GIN (search_vector)",
+)
+
+
+def create_index(connection: Connection) -> None:
+    """Create the search index for ``jobs`` if missing and (re)fill it."""
+    dialect = connection.dialect.name
+    if dialect == "sqlite":
+        for statement in _SQLITE_DDL:
+            connection.execute(text(statement))
+        connection.execute(text("INSERT INTO jobs_fts(jobs_fts) VALUES ('rebuild')"))
+    elif dialect == "postgresql":
+        # Generated columns fill themselves, including for existing rows.
+        for statement in _POSTGRES_DDL:
+            connection.execute(text(statement))
+
+
+def install(engine: Engine) -> None:
+    with engine.begin() as conn:
+        create_index(conn)
+
+
+@event.listens_for(sql_models.Job.__table__, "after_create")
+def _after_jobs_create(target, connection, **kw) -> None:
+    create_index(connection)
+
+
+@event.listens_for(sql_models.Job.__table__, "after_drop")
+def _after_jobs_drop(target, connection, **kw) -> None:
+    if connection.dialect.name == "sqlite":
+        connection.execute(text("DROP TABLE IF EXISTS jobs_fts"))
+
+
+def terms(query: str) -> List[str]:
+    return _TERM.findall(query.lower())[:MAX_TERMS]
+
+
+def fts5_query(words: List[str], prefix: bool) -> str:
+    """All words must match; with ``prefix`` the last may be incomplete."""
+    quoted = [f'"{word}"' for word in words]
+    if prefix:
+        quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+def tsquery(words: List[str], prefix: bool) -> str:
+    if prefix:
+        words = words[:-1] + [words[-1] + ":*"]
+    return " & ".join(words)
+
+
+_fts = table("jobs_fts", column("rowid"))
+
+
+def ranked(
+    db: Session, words: List[str], prefix: bool, offset: int, limit: int,
+    apply_filters: Optional[Callable] = None,
+) -> List[sql_models.Job]:
+    """Jobs matching every word, best first.
+
+    ``apply_filters`` may add predicates on ``sql_models.Job`` to the query.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect == "sqlite":
+        fts = literal_column("jobs_fts")
+        match = fts.op("MATCH")(fts5_query(words, prefix))
+        # bm25 is lower for better matches.
+        score = func.bm25(fts, *_FTS_WEIGHTS)
+        if apply_filters is None:
+            # Nothing to filter on, so rank the index alone: sorting bare rowids
+            # rather than joined job rows is about a third faster on broad matches.
+            rowids = [
+                rowid for rowid, in
+                db.query(_fts.c.rowid).filter(match).order_by(score, _fts.c.rowid).offset(offset).limit(limit)
+            ]
+            jobs = dict(
+                (rowid, job) for job, rowid in
+                db.query(sql_models.Job, literal_column("jobs.rowid")).filter(literal_column("jobs.rowid").in_(rowids))
+            )
+            return [jobs[rowid] for rowid in rowids if rowid in jobs]
+        query = (
+            db.query(sql_models.Job)
+            .select_from(_fts)
+            .join(sql_models.Job, literal_column("jobs.rowid") == _fts.c.rowid)
+            .filter(match)
+        )
+        order = (score, sql_models.Job.id)
+    elif dialect == "postgresql":
+        vector = literal_column("jobs.search_vector")
+        ts_query = func.to_tsquery("simple", tsquery(words, prefix))
+        query = db.query(sql_models.Job).filter(vector.op("@@")(ts_query))
+        order = (func.ts_rank(vector, ts_query).desc(), sql_models.Job.id)
+    else:
+        raise NotImplementedError(f"full-text search is not supported on {dialect}")
+    if apply_filters is not None:
+        query = apply_filters(query)
+    return query.order_by(*order).offset(offset).limit(limit).all()
+
+
+def _matcher(words: List[str], prefix: bool) -> Callable[[str], bool]:
+    exact = set(words[:-1] if prefix else words)
+    last = words[-1]
+    return lambda word: word.lower() in exact or (word.lower().startswith(last) if prefix else word.lower() == last)
+
+
+def highlight(text: Optional[str], words: List[str], prefix: bool, max_words: Optional[int] = None) -> str:
+    """HTML-escape ``text`` and wrap the words the query matched in <mark>.
+
+    Done here for the page's rows only: FTS5's highlight() and snippet(),
+    like ts_headline, would run for every match before the sort.
+    With ``max_words``, returns a window around the first match.
+    """
+    matches = _matcher(words, prefix)
+    parts = _WORDS.split(text or "")  # separators at even indexes, words at odd ones
+    count = len(parts) // 2
+    if max_words is not None and count > max_words:
+        first = next((i // 2 for i in range(1, len(parts), 2) if matches(parts[i])), 0)
+        start = max(0, min(first - max_words // 4, count - max_words))
+        end = start + max_words
+        parts = parts[2 * start:2 * end] + ["…"] if end < count else parts[2 * start:]
+        if start:
+            parts[0] = "…"
+    return "".join(
+        f"<mark>{html.escape(part, quote=False)}</mark>" if i % 2 and matches(part) else html.escape(part, quote=False)
+        for i, part in enumerate(parts)
+    )
+
+
+def highlights(job, words: List[str], prefix: bool) -> Dict[str, str]:
+    return {
+        "title": highlight(job.title, words, prefix),
+        "description": highlight(job.description, words, prefix, max_words=SNIPPET_WORDS),
+    }
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    install(engine)
@@ -0,0 +1,170 @@
+"""Stateless bearer tokens.
+
+Tokens are ``<payload>.<signature>``: a base64url JSON payload signed with
+HMAC-SHA256. Any worker holding the signing key can verify a token without
+touching the database, so sessions survive restarts and need no sticky
+routing. Logout records the token id in ``revoked_tokens``; every process
+mirrors that table in memory and re-syncs it every few seconds.
+"""
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from . import sql_models
+from .cache import LRUCache
+
+SECRET_KEY = os.getenv("SECRET_KEY")
+TOKEN_TTL_SECONDS = int(os.getenv("TOKEN_TTL_SECONDS", str(7 * 24 * 3600)))
+REVOCATION_SYNC_SECONDS = float(os.getenv("REVOCATION_SYNC_SECONDS", "5"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "60"))
+
+_SIGNING_SECRET_NAME = "token_signing_key"
+# Re-read this much history on each sync so a revocation committed late by a
+# slower worker (or one with a skewed clock) is not skipped by the watermark.
+_SYNC_OVERLAP = timedelta(seconds=30)
+
+
+class InvalidToken(Exception):
+    pass
+
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+class SigningKey:
+    """Resolves the HMAC key once per process.
+
+    SECRET_KEY wins when set. Otherwise a random key is generated and
+    stored in the database so every worker and restart agrees on it.
+    """
+
+    def __init__(self):
+        self._key: Optional[bytes] = SECRET_KEY.encode() if SECRET_KEY else None
+        self._lock = threading.Lock()
+
+    def loaded(self) -> Optional[bytes]:
+        """The key if this process has resolved it already; never touches the database."""
+        return self._key
+
+    def get(self, db: Session) -> bytes:
+        if self._key is None:
+            with self._lock:
+                if self._key is None:
+                    self._key = self._load_or_create(db).encode()
+        return self._key
+
+    @staticmethod
+    def _load_or_create(db: Session) -> str:
+        row = db.get(sql_models.ServerSecret, _SIGNING_SECRET_NAME)
+        if row is None:
+            db.add(sql_models.ServerSecret(name=_SIGNING_SECRET_NAME, value=secrets.token_urlsafe(48)))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker created it first; use theirs.
+                db.rollback()
+            row = db.get(sql_models.ServerSecret, _SIGNING_SECRET_NAME)
+        return row.value
+
+
+signing_key = SigningKey()
+
+
+def issue_token(user: sql_models.User, db: Session) -> str:
+    now = int(time.time())
+    payload = {"sub": user.id, "iat": now, "exp": now + TOKEN_TTL_SECONDS, "jti": uuid.uuid4().hex}
+    body = _b64encode(json.dumps(payload, separators=(",", ":")).encode())
+    signature = hmac.new(signing_key.get(db), body.encode(), hashlib.sha256).digest()
+    return f"{body}.{_b64encode(signature)}"
+
+
+def decode_token(token: str, db: Session) -> Dict:
+    """Verify signature and expiry; raises InvalidToken. Does no I/O once the key is loaded."""
+    return verify_token(token, signing_key.get(db))
+
+
+def verify_token(token: str, key: bytes) -> Dict:
+    """``decode_token`` with the key in hand."""
+    try:
+        body, signature = token.split(".")
+        expected = hmac.new(key, body.encode(), hashlib.sha256).digest()
+        if not hmac.compare_digest(expected, _b64decode(signature)):
+            raise InvalidToken("bad signature")
+        claims = json.loads(_b64decode(body))
+    except (ValueError, TypeError):
+        raise InvalidToken("malformed token")
+    if not isinstance(claims, dict) or "sub" not in claims or "jti" not in claims:
+        raise InvalidToken("malformed token")
+    if claims.get("exp", 0) < time.time():
+        raise InvalidToken("token expired")
+    return claims
+
+
+class RevocationList:
+    """In-memory mirror of ``revoked_tokens``, refreshed incrementally."""
+
+    def __init__(self, sync_interval: float):
+        self.sync_interval = sync_interval
+        self._revoked: Dict[str, float] = {}  # jti -> exp
+        self._synced_at = 0.0
+        self._watermark: Optional[datetime] = None
+        self._lock = threading.Lock()
+
+    def is_revoked(self, jti: str, db: Session) -> bool:
+        if time.monotonic() - self._synced_at > self.sync_interval:
+            self.sync(db)
+        return jti in self._revoked
+
+    def sync(self, db: Session) -> None:
+        with self._lock:
+            query = db.query(sql_models.RevokedToken.jti, sql_models.RevokedToken.expiresAt,
+                             sql_models.RevokedToken.revokedAt)
+            if self._watermark is not None:
+                query = query.filter(sql_models.RevokedToken.revokedAt >= self._watermark - _SYNC_OVERLAP)
+            for jti, expires_at, revoked_at in query:
+                self._revoked[jti] = expires_at
+                if self._watermark is None or revoked_at > self._watermark:
+                    self._watermark = revoked_at
+            now = time.time()
+            for jti in [j for j, exp in self._revoked.items() if exp < now]:
+                del self._revoked[jti]
+            self._synced_at = time.monotonic()
+
+    def revoke(self, claims: Dict, db: Session) -> None:
+        db.merge(sql_models.RevokedToken(
+            jti=claims["jti"], expiresAt=claims["exp"], revokedAt=datetime.now(timezone.utc)
+        ))
+        # Expired tokens fail verification anyway, so their rows can go.
+        db.query(sql_models.RevokedToken).filter(sql_models.RevokedToken.expiresAt < time.time()).delete()
+        db.commit()
+        with self._lock:
+            self._revoked[claims["jti"]] = claims["exp"]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._revoked.clear()
+            self._synced_at = 0.0
+            self._watermark = None
+
+
+revocations = RevocationList(REVOCATION_SYNC_SECONDS)
+
+# Resolved users keyed by id, so authenticated requests skip the users table.
+user_cache = LRUCache(USER_CACHE_SIZE, USER_CACHE_SIZE, USER_CACHE_TTL, sizeof=lambda _: 1)
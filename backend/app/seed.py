@@ -0,0 +1,85 @@
+"""Demo catalog for fresh databases.
+
+Seeding runs once at startup (see app/startup.py), never on the request path.
+"""
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from . import sql_models
+from .models import JobType
+
+
+def demo_jobs() -> List[sql_models.Job]:
+    return [
+        sql_models.Job(
+            id="1",
+            title="Senior Software Engineer",
+            company="TechCorp Inc.",
+            location="San Francisco, CA",
+            salary="$150,000 - $200,000",
+            matchScore=92,
+            description="Join our innovative team to build next-generation cloud solutions.",
+            requirements=["5+ years experience", "React/TypeScript", "Cloud platforms"],
+            postedAt="2 days ago",
+            type=JobType.FULL_TIME
+        ),
+        sql_models.Job(
+            id="2",
+            title="Full Stack Developer",
+            company="StartupXYZ",
+            location="Remote",
+            salary="$120,000 - $160,000",
+            matchScore=88,
+            description="Build and scale our core product with modern technologies.",
+            requirements=["3+ years experience", "Node.js", "React", "PostgreSQL"],
+            postedAt="1 week ago",
+            type=JobType.REMOTE
+        ),
+        sql_models.Job(
+            id="3",
+            title="Frontend Engineer",
+            company="DesignStudio",
+            location="New York, NY",
+            salary="$110,000 - $140,000",
+            matchScore=85,
+            description="Create beautiful, responsive user interfaces for our clients.",
+            requirements=["2+ years experience", "React", "CSS/Tailwind", "Figma"],
+            postedAt="3 days ago",
+            type=JobType.FULL_TIME
+        ),
+        sql_models.Job(
+            id="4",
+            title="Backend Developer",
+            company="DataFlow Systems",
+            location="Austin, TX",
+            salary="$130,000 - $170,000",
+            matchScore=79,
+            description="Design and implement robust backend services and APIs.",
+            requirements=["4+ years experience", "Python/Django", "REST APIs", "AWS"],
+            postedAt="5 days ago",
+            type=JobType.FULL_TIME
+        ),
+        sql_models.Job(
+            id="5",
+            title="DevOps Engineer",
+            company="CloudNative Co",
+            location="Seattle, WA",
+            salary="$140,000 - $180,000",
+            matchScore=74,
+            description="Manage and improve our cloud infrastructure and CI/CD pipelines.",
+            requirements=["3+ years experience", "Kubernetes", "Terraform", "AWS/GCP"],
+            postedAt="1 day ago",
+            type=JobType.CONTRACT
+        ),
+    ]
+
+
+def seed_jobs(db: Session) -> int:
+    """Insert the demo catalog if the jobs table is empty; returns rows added."""
+    if db.query(sql_models.Job.id).first() is not None:
+        return 0
+    jobs = demo_jobs()
+    db.add_all(jobs)
+    db.commit()
+    return len(jobs)
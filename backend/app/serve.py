@@ -0,0 +1,262 @@
+"""Production launcher: N uvicorn workers forked from one preloaded master.
+
+    python -m app.serve --workers 4 --port 8000
+
+The master imports the app, migrates and seeds the database and builds the
+job index once, then freezes its heap (``gc.freeze``) and forks the workers.
+They share that memory copy-on-write instead of each building their own, and
+accept connections from one listening socket, so throughput scales with the
+number of workers up to the number of cores.
+
+State that would otherwise differ per worker is shared through the database
+when more than one worker runs (see ``shared_state_defaults``): rate-limit
+counters, the resume analysis cache and the Prometheus metrics directory.
+Sign-in keys, revocations and the analysis queue always live there.
+``JOB_REPOSITORY=memory`` keeps a catalog per process and is refused with
+more than one worker.
+
+The master restarts workers that die. On SIGTERM or SIGINT it asks every
+worker to stop: each stops accepting, finishes in-flight requests (uploads
+included) for up to ``GRACEFUL_TIMEOUT`` seconds, then runs the app's
+shutdown, which lets running analyses complete. Workers still alive after
+that are killed. A second signal kills them at once.
+"""
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+# Seconds a stopping worker may spend finishing in-flight requests.
+GRACEFUL_TIMEOUT = float(os.getenv("GRACEFUL_TIMEOUT", "30"))
+# Extra time for the app's own shutdown (running analyses, thread joins) before SIGKILL.
+SHUTDOWN_MARGIN = 10.0
+# A worker that dies sooner than this after starting counts as failing to boot.
+BOOT_SECONDS = 5.0
+MAX_BOOT_FAILURES = 5
+
+
+def shared_state_defaults(workers: int, cpus: int) -> Dict[str, str]:
+    """Settings that keep per-process state correct, and the CPU shared fairly, across ``workers``."""
+    if workers <= 1:
+        return {}
+    per_worker = str(max(1, cpus // workers))
+    return {
+        "RATE_LIMIT_BACKEND": "database",
+        "RESUME_CACHE_PERSIST": "1",
+        # Each worker has its own analysis pool and hashing threads; split the cores between them.
+        "ANALYSIS_WORKERS": per_worker,
+        "HASH_WORKERS": per_worker,
+    }
+
+
+class Supervisor:
+    """Forks ``workers`` processes running ``target`` and keeps that many alive until stopped."""
+
+    def __init__(
+        self, target: Callable[[], None], workers: int, stop_timeout: float,
+        on_exit: Optional[Callable[[int], None]] = None,
+    ):
+        self.target = target
+        self.workers = workers
+        self.stop_timeout = stop_timeout
+        self.on_exit = on_exit
+        self.children: Dict[int, float] = {}  # pid -> start time
+        self._signals = 0
+        self._boot_failures = 0
+
+    def stop(self, sig: int = signal.SIGTERM, frame=None) -> None:
+        self._signals += 1
+
+    def spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+                    signal.signal(sig, signal.SIG_DFL)
+                threading.Thread(target=_stop_when_orphaned, args=(os.getppid(),), daemon=True).start()
+                self.target()
+            except SystemExit as exc:
+                code = exc.code if isinstance(exc.code, int) else 1
+            except BaseException:
+                logger.exception("worker %d failed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self.children[pid] = time.monotonic()
+        logger.info("worker %d started", pid)
+        return pid
+
+    def reap(self) -> None:
+        while self.children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self.children.pop(pid, None)
+            if started is None:
+                continue
+            if self.on_exit is not None:
+                self.on_exit(pid)
+            if self._signals:
+                continue
+            logger.warning("worker %d exited (%s); restarting it", pid, _describe(status))
+            if time.monotonic() - started < BOOT_SECONDS:
+                self._boot_failures += 1
+            else:
+                self._boot_failures = 0
+
+    def run(self) -> int:
+        """Serve until stopped; returns the exit code for the master."""
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, self.stop)
+            signal.signal(signal.SIGINT, self.stop)
+        code = 0
+        while not self._signals:
+            if self._boot_failures >= MAX_BOOT_FAILURES:
+                logger.error("workers keep failing to boot; giving up")
+                code = 1
+                break
+            while len(self.children) < self.workers:
+                self.spawn()
+            time.sleep(0.1 * min(2 ** self._boot_failures, 50))
+            self.reap()
+        self.shutdown()
+        return code
+
+    def shutdown(self) -> None:
+        self._signals = max(self._signals, 1)
+        handled = self._signals
+        for pid in self.children:
+            _kill(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.stop_timeout
+        while self.children and time.monotonic() < deadline and self._signals == handled:
+            time.sleep(0.05)
+            self.reap()
+        for pid in list(self.children):
+            logger.warning("worker %d did not stop in time; killing it", pid)
+            _kill(pid, signal.SIGKILL)
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+            self.children.pop(pid, None)
+            if self.on_exit is not None:
+                self.on_exit(pid)
+
+
+def _kill(pid: int, sig: int) -> None:
+    try:
+        os.kill(pid, sig)
+    except ProcessLookupError:
+        pass
+
+
+def _stop_when_orphaned(master: int) -> None:
+    # A master killed outright cannot stop its workers; have them notice and stop gracefully.
+    while os.getppid() == master:
+        time.sleep(1)
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def _describe(status: int) -> str:
+    if os.WIFSIGNALED(status):
+        return f"signal {os.WTERMSIG(status)}"
+    return f"code {os.waitstatus_to_exitcode(status)}"
+
+
+def serve_worker(config: uvicorn.Config, sock) -> None:
+    server = uvicorn.Server(config)
+    server.run(sockets=[sock])
+    if not server.started:
+        # The app's startup failed; uvicorn has logged why.
+        raise SystemExit(3)
+
+
+def preload() -> None:
+    """Work done once in the master so every worker starts with it."""
+    from sqlalchemy.orm import Session
+
+    from .database import engine
+    from .matching import job_index
+    from .repository import JOB_REPOSITORY
+    from .startup import prepare_database
+
+    prepare_database(engine)
+    if JOB_REPOSITORY == "sql":
+        with Session(bind=engine) as db:
+            job_index.ensure_loaded(db)
+    # Connections must not be shared across fork; each worker opens its own.
+    engine.dispose()
+    # Keep the collector from touching (and so copying) the preloaded objects in every worker.
+    gc.collect()
+    gc.freeze()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.serve", description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    parser.add_argument("--graceful-timeout", type=float, default=GRACEFUL_TIMEOUT)
+    parser.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    parser.add_argument("--access-log", action=argparse.BooleanOptionalAction, default=True)
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=args.log_level.upper(), format="%(asctime)s %(levelname)s [%(process)d] %(message)s")
+
+    workers = max(1, args.workers)
+    if workers > 1 and os.getenv("JOB_REPOSITORY", "sql") == "memory":
+        parser.error("JOB_REPOSITORY=memory keeps a separate catalog in each process; use --workers 1")
+    # Before the app is imported: its modules read these when they load.
+    for name, value in shared_state_defaults(workers, os.cpu_count() or 1).items():
+        os.environ.setdefault(name, value)
+    metrics_dir = None
+    if workers > 1 and not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        metrics_dir = tempfile.mkdtemp(prefix="resume-boost-metrics-")
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = metrics_dir
+
+    from .main import app
+    from .metrics import MULTIPROCESS
+
+    preload()
+    config = uvicorn.Config(
+        app, host=args.host, port=args.port, log_level=args.log_level, access_log=args.access_log,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    sock = config.bind_socket()
+
+    def on_exit(pid: int) -> None:
+        if MULTIPROCESS:
+            from prometheus_client import multiprocess
+
+            multiprocess.mark_process_dead(pid)
+
+    logger.info("serving on %s:%d with %d workers", args.host, args.port, workers)
+    supervisor = Supervisor(
+        lambda: serve_worker(config, sock), workers,
+        stop_timeout=args.graceful_timeout + SHUTDOWN_MARGIN, on_exit=on_exit,
+    )
+    try:
+        return supervisor.run()
+    finally:
+        sock.close()
+        if metrics_dir is not None:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
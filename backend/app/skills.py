@@ -0,0 +1,182 @@
+"""Canonical skills and the ``job_skills`` association.
+
+``Job.requirements`` holds requirements as posted ("React/TypeScript",
+"AWS/GCP", "5+ years experience"). ``canonicalize`` splits compound entries,
+maps aliases (k8s -> kubernetes, golang -> go) and drops experience phrases.
+The result is stored in ``skills`` and ``job_skills``, so skill filters and
+skill-overlap ranking are indexed joins instead of decoding every row's JSON.
+
+``job_skills`` is rewritten in the same transaction as the job. A Session
+hook does this for ORM writes and ``ingest.write_batch`` for bulk upserts.
+The ``0004_backfill_job_skills`` migration fills it for existing rows.
+"""
+import re
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import delete, event, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from . import sql_models
+from .scoring import SKILLS
+
+ALIASES = {
+    "golang": "go",
+    "js": "javascript",
+    "ts": "typescript",
+    "reactjs": "react",
+    "react.js": "react",
+    "vuejs": "vue",
+    "vue.js": "vue",
+    "angularjs": "angular",
+    "nodejs": "node.js",
+    "node": "node.js",
+    "nextjs": "next.js",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "amazon web services": "aws",
+    "google cloud": "gcp",
+    "google cloud platform": "gcp",
+    "microsoft azure": "azure",
+    "ci": "ci/cd",
+    "cicd": "ci/cd",
+    "ci cd": "ci/cd",
+    "rest api": "rest",
+    "rest apis": "rest",
+    "restful": "rest",
+    "restful apis": "rest",
+    "graphql api": "graphql",
+    "ml": "machine-learning",
+    "machine learning": "machine-learning",
+    "sklearn": "scikit-learn",
+    "scikit learn": "scikit-learn",
+    "natural language processing": "nlp",
+    "power bi": "powerbi",
+    "cpp": "c++",
+    "csharp": "c#",
+    "c sharp": "c#",
+    "tailwindcss": "tailwind",
+    "tailwind css": "tailwind",
+    "elastic": "elasticsearch",
+    "gitlab ci": "gitlab",
+    "github actions": "github",
+}
+
+# Compound entries are split on these, except names like "ci/cd" that are one skill.
+_SEPARATORS = re.compile(r"\s*(?:/|,|;|&|\||\band\b|\bor\b)\s*")
+_WHOLE = SKILLS | ALIASES.keys()
+# "5+ years experience", "2 yrs", "years of experience": not skills.
+_EXPERIENCE = re.compile(r"\d+\s*\+?\s*(?:years?|yrs?)\b|\byears?\b|\bexperience\b")
+MAX_SKILL_LENGTH = 40
+
+
+def _canonical(part: str) -> Optional[str]:
+    name = " ".join(re.sub(r"[()\[\]\"]", " ", part).split()).strip(" .-:")
+    if not name or len(name) > MAX_SKILL_LENGTH or _EXPERIENCE.search(name):
+        return None
+    return ALIASES.get(name, name)
+
+
+def canonicalize(entries: Optional[Iterable[str]]) -> List[str]:
+    """Canonical skill names in ``entries``, deduplicated, in first-seen order."""
+    names: Dict[str, None] = {}
+    for entry in entries or ():
+        whole = " ".join(str(entry).lower().split())
+        for part in ([whole] if whole in _WHOLE else _SEPARATORS.split(whole)):
+            name = _canonical(part)
+            if name:
+                names.setdefault(name, None)
+    return list(names)
+
+
+def _chunks(values: Sequence, size: int = 500) -> Iterable[Sequence]:
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
+
+
+def _skill_ids(connection: Connection, names: Set[str]) -> Dict[str, int]:
+    """Ids for ``names``, creating the missing skills."""
+    table = sql_models.Skill.__table__
+    ordered = sorted(names)
+    ids: Dict[str, int] = {}
+    for chunk in _chunks(ordered):
+        ids.update(connection.execute(select(table.c.name, table.c.id).where(table.c.name.in_(chunk))).all())
+    missing = [{"name": name} for name in ordered if name not in ids]
+    if missing:
+        dialect = connection.dialect.name
+        if dialect in ("sqlite", "postgresql"):
+            insert = sqlite.insert if dialect == "sqlite" else postgresql.insert
+            # Another writer may add the same skill concurrently; keep theirs.
+            connection.execute(insert(table).on_conflict_do_nothing(index_elements=[table.c.name]), missing)
+        else:
+            connection.execute(table.insert(), missing)
+        for chunk in _chunks([row["name"] for row in missing]):
+            ids.update(connection.execute(select(table.c.name, table.c.id).where(table.c.name.in_(chunk))).all())
+    return ids
+
+
+def sync(connection: Connection, jobs: Iterable[Tuple[str, Optional[Sequence[str]]]]) -> None:
+    """Rewrite ``job_skills`` for each (job id, requirements); None requirements just clears it."""
+    wanted = {job_id: canonicalize(requirements) for job_id, requirements in jobs}
+    if not wanted:
+        return
+    table = sql_models.JobSkill.__table__
+    for chunk in _chunks(list(wanted)):
+        connection.execute(delete(table).where(table.c.job_id.in_(chunk)))
+    names = {name for skill_names in wanted.values() for name in skill_names}
+    if not names:
+        return
+    ids = _skill_ids(connection, names)
+    connection.execute(
+        table.insert(),
+        [{"job_id": job_id, "skill_id": ids[name]} for job_id, skill_names in wanted.items() for name in skill_names],
+    )
+
+
+def backfill(engine: Engine, batch_size: int = 1000) -> int:
+    """Derive ``job_skills`` for every existing job."""
+    job = sql_models.Job.__table__
+    synced = 0
+    last_id = ""
+    while True:
+        with engine.begin() as conn:
+            rows = conn.execute(
+                select(job.c.id, job.c.requirements).where(job.c.id > last_id).order_by(job.c.id).limit(batch_size)
+            ).all()
+            if not rows:
+                return synced
+            sync(conn, rows)
+            synced += len(rows)
+            last_id = rows[-1][0]
+
+
+def requiring(names: Iterable[str]):
+    """Per skill, a subquery of the ids of jobs requiring it."""
+    job_skill, skill = sql_models.JobSkill, sql_models.Skill
+    return [
+        select(job_skill.job_id).join(skill, skill.id == job_skill.skill_id).where(skill.name == name)
+        for name in names
+    ]
+
+
+@event.listens_for(Session, "before_flush")
+def _drop_deleted_job_skills(session: Session, flush_context, instances) -> None:
+    # Before the jobs themselves go, so the foreign key is never left dangling.
+    deleted = [obj.id for obj in session.deleted if isinstance(obj, sql_models.Job)]
+    if deleted:
+        sync(session.connection(), [(job_id, None) for job_id in deleted])
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_job_skills(session: Session, flush_context) -> None:
+    # After the jobs are written, so new rows exist for job_skills to reference.
+    changed = [(obj.id, obj.requirements) for obj in session.new if isinstance(obj, sql_models.Job)]
+    changed += [
+        (obj.id, obj.requirements) for obj in session.dirty
+        if isinstance(obj, sql_models.Job) and inspect(obj).attrs.requirements.history.has_changes()
+    ]
+    if changed:
+        sync(session.connection(), changed)
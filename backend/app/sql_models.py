@@ -1,8 +1,11 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, Float, String, Boolean, DateTime, ForeignKey, Text, JSON, Index, event, func
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 import uuid
 from .database import Base
+from .salary import parse_salary
+from .recency import parse_posted_at, utcnow
 
 class User(Base):
     __tablename__ = "users"
@@ -10,7 +13,7 @@ class User(Base):
     id = Column(String, primary_key=True, index=True, default=lambda: str(uuid.uuid4()))
     email = Column(String, unique=True, index=True)
     username = Column(String)
-    password = Column(String) # Hashed in real app, plain for now per previous mock
+    password = Column(String) # argon2/bcrypt hash; legacy plaintext is upgraded on login
     createdAt = Column(DateTime, default=lambda: datetime.now(timezone.utc))
 
 class Job(Base):
@@ -21,12 +24,84 @@ class Job(Base):
     company = Column(String)
     location = Column(String)
     salary = Column(String, nullable=True)
+    # Parsed from `salary` on write (see _sync_salary) and annualised.
+    salary_min = Column(Integer, nullable=True)
+    salary_max = Column(Integer, nullable=True)
+    salary_currency = Column(String(3), nullable=True)
     matchScore = Column(Integer)
     description = Column(Text)
     requirements = Column(JSON) # Storing list of strings as JSON
-    postedAt = Column(String)
+    postedAt = Column(String) # Legacy relative text ("2 days ago"); posted_at is authoritative
+    posted_at = Column(DateTime, nullable=True)
     type = Column(String)
 
+    # Listing filters are equality predicates followed by the keyset sort
+    # (matchScore DESC, id DESC), so each gets a composite index ending in it.
+    __table_args__ = (
+        Index("ix_jobs_match_score_id", "matchScore", "id"),
+        Index("ix_jobs_type_match_score_id", "type", "matchScore", "id"),
+        Index("ix_jobs_company_match_score_id", "company", "matchScore", "id"),
+        Index("ix_jobs_location_match_score_id", "location", "matchScore", "id"),
+        Index("ix_jobs_salary_max_id", "salary_max", "id"),
+        Index("ix_jobs_salary_min_id", "salary_min", "id"),
+        # Salary sort keys (salary_high / salary_low below).
+        Index("ix_jobs_salary_high_id", func.coalesce(salary_max, salary_min), "id"),
+        Index("ix_jobs_salary_low_id", func.coalesce(salary_min, salary_max), "id"),
+        Index("ix_jobs_posted_at_id", "posted_at", "id"),
+    )
+
+    # Open-ended postings ("$100k+", "Up to $90k") parse with one bound; sort
+    # them by the bound they have rather than dropping them.
+    @hybrid_property
+    def salary_high(self):
+        return self.salary_max if self.salary_max is not None else self.salary_min
+
+    @salary_high.inplace.expression
+    @classmethod
+    def _salary_high_expression(cls):
+        return func.coalesce(cls.salary_max, cls.salary_min)
+
+    @hybrid_property
+    def salary_low(self):
+        return self.salary_min if self.salary_min is not None else self.salary_max
+
+    @salary_low.inplace.expression
+    @classmethod
+    def _salary_low_expression(cls):
+        return func.coalesce(cls.salary_min, cls.salary_max)
+
+    def apply_parsed_salary(self):
+        parsed = parse_salary(self.salary)
+        self.salary_min, self.salary_max, self.salary_currency = parsed if parsed else (None, None, None)
+
+@event.listens_for(Job, "before_insert")
+@event.listens_for(Job, "before_update")
+def _sync_salary(mapper, connection, job):
+    job.apply_parsed_salary()
+
+@event.listens_for(Job, "before_insert")
+def _default_posted_at(mapper, connection, job):
+    if job.posted_at is None:
+        job.posted_at = parse_posted_at(job.postedAt) or utcnow()
+
+class Skill(Base):
+    __tablename__ = "skills"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    name = Column(String, unique=True, nullable=False) # Canonical form, see app.skills
+
+class JobSkill(Base):
+    __tablename__ = "job_skills"
+
+    # Derived from Job.requirements by app.skills; rewritten whenever they change.
+    job_id = Column(String, ForeignKey("jobs.id"), primary_key=True)
+    skill_id = Column(Integer, ForeignKey("skills.id"), primary_key=True)
+
+    __table_args__ = (
+        # "Jobs requiring skill X" is a range scan of this index.
+        Index("ix_job_skills_skill_id_job_id", "skill_id", "job_id"),
+    )
+
 class Application(Base):
     __tablename__ = "applications"
 
@@ -34,3 +109,83 @@ class Application(Base):
     job_id = Column(String, ForeignKey("jobs.id"))
     user_id = Column(String, ForeignKey("users.id"))
     appliedAt = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+    __table_args__ = (
+        # One application per user and job; repeat submissions hit this index
+        # instead of adding rows.
+        Index("uq_applications_user_job", "user_id", "job_id", unique=True),
+        # A user's history, newest first, as a keyset scan.
+        Index("ix_applications_user_applied_at_id", "user_id", "appliedAt", "id"),
+        Index("ix_applications_job_id", "job_id"),
+    )
+
+class ResumeAnalysisCache(Base):
+    __tablename__ = "resume_analysis_cache"
+
+    key = Column(String, primary_key=True) # "<scoring version>:<sha256 of upload>"
+    result = Column(JSON)
+    createdAt = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class ServerSecret(Base):
+    __tablename__ = "server_secrets"
+
+    name = Column(String, primary_key=True)
+    value = Column(String)
+
+class RevokedToken(Base):
+    __tablename__ = "revoked_tokens"
+
+    jti = Column(String, primary_key=True)
+    expiresAt = Column(Integer, index=True) # Unix time the token would expire anyway
+    revokedAt = Column(DateTime, index=True, default=lambda: datetime.now(timezone.utc))
+
+class CatalogVersion(Base):
+    __tablename__ = "catalog_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+class UserRecommendation(Base):
+    __tablename__ = "user_recommendations"
+
+    # One row per user: uploading a different resume replaces it.
+    user_id = Column(String, ForeignKey("users.id"), primary_key=True)
+    resume_hash = Column(String, primary_key=True)
+    keywords = Column(JSON)
+    items = Column(JSON, nullable=True) # Materialised top-N Job payloads; null until first computed
+    catalogVersion = Column(Integer, nullable=False, default=-1, index=True) # Catalog version `items` reflects
+    updatedAt = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+
+class AnalysisTask(Base):
+    __tablename__ = "analysis_tasks"
+
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    status = Column(String, nullable=False, default="queued") # queued | running | done | failed
+    priority = Column(Integer, nullable=False, default=0) # Higher runs first
+    user_id = Column(String, ForeignKey("users.id"), nullable=True)
+    filename = Column(String)
+    path = Column(String) # Spooled upload, deleted once processed
+    content_hash = Column(String)
+    result = Column(JSON, nullable=True)
+    error = Column(String, nullable=True)
+    createdAt = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    startedAt = Column(DateTime, nullable=True)
+    finishedAt = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        # Claiming the next task is an ordered scan of this index.
+        Index("ix_analysis_tasks_status_priority_created", "status", "priority", "createdAt"),
+    )
+
+class RateLimitBucket(Base):
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String, primary_key=True) # "<limit name>:<client key>"
+    tokens = Column(Float, nullable=False)
+    updatedAt = Column(Float, nullable=False) # Unix time of the last refill
+
+class SchemaMigration(Base):
+    __tablename__ = "schema_migrations"
+
+    name = Column(String, primary_key=True)
+    appliedAt = Column(DateTime, default=lambda: datetime.now(timezone.utc))
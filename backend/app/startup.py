@@ -0,0 +1,74 @@
+"""One-time database preparation, run from the app lifespan.
+
+Every worker calls ``prepare_database`` on boot, but only one at a time:
+a Postgres advisory lock or, for SQLite, a lock file next to the database
+serialises them. The first worker migrates and seeds; the rest find the
+schema fingerprint already recorded and return almost immediately.
+"""
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .migrations import run_migrations
+from .seed import seed_jobs
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process dev servers only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+SEED_DEMO_JOBS = os.getenv("SEED_DEMO_JOBS", "1").lower() in ("1", "true", "yes")
+# Arbitrary constant shared by all workers for pg_advisory_lock.
+STARTUP_LOCK_KEY = 0x5E5B0057
+
+
+def _lock_path(engine: Engine) -> str:
+    database = engine.url.database
+    if database and database != ":memory:":
+        return os.path.abspath(database) + ".startup.lock"
+    return os.path.join(tempfile.gettempdir(), "resume-boost-startup.lock")
+
+
+@contextmanager
+def startup_lock(engine: Engine) -> Iterator[None]:
+    if engine.dialect.name == "postgresql":
+        with engine.connect() as conn:
+            conn.execute(text("SELECT pg_advisory_lock(:key)"), {"key": STARTUP_LOCK_KEY})
+            try:
+                yield
+            finally:
+                conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": STARTUP_LOCK_KEY})
+        return
+    if fcntl is None:
+        yield
+        return
+    with open(_lock_path(engine), "a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def prepare_database(engine: Engine) -> None:
+    started = time.perf_counter()
+    with startup_lock(engine):
+        locked = time.perf_counter()
+        migrated = run_migrations(engine)
+        seeded = 0
+        if SEED_DEMO_JOBS:
+            with Session(bind=engine) as db:
+                seeded = seed_jobs(db)
+    logger.info(
+        "database ready in %.1fms (lock wait %.1fms, migrated=%s, seeded=%d)",
+        (time.perf_counter() - started) * 1000, (locked - started) * 1000, migrated, seeded,
+    )
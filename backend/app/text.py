@@ -0,0 +1,29 @@
+import re
+from typing import Iterator, List
+
+# Keeps tech tokens such as "c++", "c#", "node.js" and "ci/cd" intact.
+TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#]*(?:[./-][a-z0-9+#]+)*")
+
+STOPWORDS = frozenset(
+    """
+    a an and are as at be been by for from has have in into is it its of on or
+    our that the their this to was we were will with you your they them than
+    but not no so if can may all any each per via about over under more most
+    """.split()
+)
+
+
+def iter_tokens(text: str) -> Iterator[str]:
+    for match in TOKEN_RE.finditer(text.lower()):
+        token = match.group().rstrip(".")
+        if token:
+            yield token
+
+
+def tokenize(text: str) -> List[str]:
+    return list(iter_tokens(text))
+
+
+def terms(text: str) -> List[str]:
+    """Tokens with stopwords and single characters removed, for indexing."""
+    return [t for t in iter_tokens(text) if len(t) > 1 and t not in STOPWORDS]
@@ -0,0 +1,58 @@
+"""Reject oversized uploads while the body is still streaming in.
+
+Starlette parses a whole multipart body before the handler runs, so a size
+check in the handler comes too late: the bytes have already been read and
+spooled. This middleware answers 413 straight away when Content-Length
+is over the limit. For chunked bodies it counts bytes as they arrive and
+fails the request the moment the limit is passed.
+"""
+import os
+from typing import Sequence
+
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_PATH_PREFIXES = ("/api/resume/",)
+
+
+class UploadSizeLimitMiddleware:
+    def __init__(
+        self, app: ASGIApp, max_bytes: int = MAX_UPLOAD_BYTES, prefixes: Sequence[str] = UPLOAD_PATH_PREFIXES
+    ):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.prefixes = tuple(prefixes)
+
+    def _detail(self) -> str:
+        return f"Upload larger than {self.max_bytes} bytes"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["method"] not in ("POST", "PUT")
+            or not scope["path"].startswith(self.prefixes)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            response = JSONResponse({"detail": self._detail()}, status_code=413, headers={"Connection": "close"})
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    # Raised inside body parsing; FastAPI lets HTTPException through as the response.
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        await self.app(scope, limited_receive, send)
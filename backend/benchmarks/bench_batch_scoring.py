@@ -0,0 +1,39 @@
+"""Throughput of batch resume x job scoring.
+
+    python -m benchmarks.bench_batch_scoring --resumes 1000 --jobs 100000
+"""
+import argparse
+import random
+import resource
+import time
+
+from app.batch_scoring import JobMatrix, top_matches
+from app.scoring import SKILLS
+from benchmarks.bench_matching import synthetic_jobs
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resumes", type=int, default=1000)
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    parser.add_argument("--k", type=int, default=10)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    started = time.perf_counter()
+    matrix = JobMatrix.from_rows(synthetic_jobs(args.jobs, rng))
+    print(f"featurized {args.jobs} jobs in {time.perf_counter() - started:.2f}s "
+          f"({matrix.data.nbytes / 1e6:.1f} MB sparse)")
+
+    resumes = [rng.sample(sorted(SKILLS), 25) for _ in range(args.resumes)]
+    started = time.perf_counter()
+    top_matches(resumes, matrix, k=args.k, chunk_size=args.chunk_size)
+    elapsed = time.perf_counter() - started
+    pairs = args.resumes * args.jobs
+    print(f"scored {args.resumes}x{args.jobs} in {elapsed:.2f}s: {pairs / elapsed / 1e6:.1f}M pairs/s")
+    print(f"peak RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
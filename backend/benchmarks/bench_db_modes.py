@@ -0,0 +1,102 @@
+"""Listing throughput with the sync (threadpool) and async database modes.
+
+Each mode runs in its own interpreter because DATABASE_ASYNC is read at
+import time. Both hit the same throwaway SQLite catalog.
+
+    python -m benchmarks.bench_db_modes --jobs 5000 --requests 2000 --concurrency 200
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)]
+
+
+def seed(url, count):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app import sql_models
+    from app.migrations import run_migrations
+    from benchmarks.bench_matching import synthetic_jobs
+
+    engine = create_engine(url)
+    run_migrations(engine)
+    rng = random.Random(7)
+    with sessionmaker(bind=engine)() as db:
+        db.add_all(
+            sql_models.Job(
+                id=job_id, title=title, company=f"Company {i % 500}", location="Remote",
+                salary=f"${rng.randint(60, 200)},000", matchScore=rng.randint(40, 99),
+                description=description, requirements=requirements, postedAt="1 day ago", type="Full-time",
+            )
+            for i, (job_id, title, description, requirements) in enumerate(synthetic_jobs(count, rng))
+        )
+        db.commit()
+
+
+async def load(args):
+    import httpx
+    from app.database import async_engine
+    from app.main import app
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get("/api/jobs", params={"limit": 20, "minMatchScore": 40 + i % 50})
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+
+        await client.get("/api/jobs")  # warm the pool
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+    if async_engine is not None:
+        # ASGITransport skips lifespan, so dispose here or aiosqlite threads keep the process alive.
+        await async_engine.dispose()
+    mode = "async" if os.getenv("DATABASE_ASYNC") == "1" else "sync"
+    print(
+        f"{mode:5}: {args.requests / elapsed:7.1f} req/s  "
+        f"p50={statistics.median(latencies):.1f}ms p99={_percentile(latencies, 0.99):.1f}ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(load(args))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        seed(url, args.jobs)
+        for mode in ("0", "1"):
+            env = {**os.environ, "DATABASE_URL": url, "DATABASE_ASYNC": mode}
+            subprocess.run(
+                [sys.executable, "-m", "benchmarks.bench_db_modes", "--worker",
+                 "--requests", str(args.requests), "--concurrency", str(args.concurrency)],
+                env=env, check=True,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Login latency and throughput under concurrent load.
+
+Runs the app in-process against a throwaway SQLite database and fires
+``--concurrency`` simultaneous logins while probing ``GET /`` to show that
+hashing does not starve unrelated requests.
+
+    python -m benchmarks.bench_login --users 50 --requests 400 --concurrency 32
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+
+def _percentile(values, fraction):
+    values = sorted(values)
+    return values[max(0, int(len(values) * fraction) - 1)]
+
+
+async def run(args):
+    import httpx
+    from app.main import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        users = [f"user{i}@example.com" for i in range(args.users)]
+        for email in users:
+            await client.post("/auth/signup", json={"email": email, "username": email, "password": "password123"})
+
+        semaphore = asyncio.Semaphore(args.concurrency)
+        latencies, probes = [], []
+        done = asyncio.Event()
+
+        async def login(i):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post(
+                    "/auth/login", json={"email": users[i % len(users)], "password": "password123"}
+                )
+                latencies.append((time.perf_counter() - started) * 1000)
+                assert response.status_code == 200, response.text
+
+        async def probe():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/")
+                probes.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(0.01)
+
+        prober = asyncio.create_task(probe())
+        started = time.perf_counter()
+        await asyncio.gather(*(login(i) for i in range(args.requests)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await prober
+
+    print(f"logins: {args.requests / elapsed:.1f}/s with concurrency={args.concurrency}")
+    print(f"login latency: p50={statistics.median(latencies):.1f}ms p99={_percentile(latencies, 0.99):.1f}ms")
+    if probes:
+        print(f"GET / during burst: p50={statistics.median(probes):.1f}ms p99={_percentile(probes, 0.99):.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp}/bench.db")
+        asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
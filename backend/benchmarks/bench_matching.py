@@ -0,0 +1,64 @@
+"""Recommendation latency against a synthetic catalog.
+
+    python -m benchmarks.bench_matching --jobs 100000
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.matching import JobIndex
+from app.scoring import SKILLS
+
+WORDS = sorted(SKILLS) + (
+    "build scale design maintain services platform team product customers data cloud systems "
+    "engineer developer senior lead manager analyst remote hybrid startup enterprise growth"
+).split()
+TITLES = ["Software Engineer", "Backend Developer", "Frontend Engineer", "Data Engineer", "DevOps Engineer",
+          "Product Manager", "Data Scientist", "Mobile Developer", "QA Engineer", "Security Engineer"]
+
+
+def synthetic_jobs(n, rng):
+    for i in range(n):
+        yield (
+            str(i),
+            f"{rng.choice(['Senior', 'Junior', 'Staff', 'Lead'])} {rng.choice(TITLES)}",
+            " ".join(rng.choices(WORDS, k=40)),
+            rng.sample(sorted(SKILLS), 4),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=20)
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    index = JobIndex()
+    started = time.perf_counter()
+    for job in synthetic_jobs(args.jobs, rng):
+        index.upsert(*job)
+    print(f"indexed {args.jobs} jobs in {time.perf_counter() - started:.2f}s")
+
+    queries = [rng.sample(sorted(SKILLS), 25) for _ in range(args.queries)]
+    index.search(queries[0], k=args.k)  # materialise impact vectors
+    latencies = []
+    for query in queries:
+        started = time.perf_counter()
+        index.search(query, k=args.k)
+        latencies.append((time.perf_counter() - started) * 1000)
+    latencies.sort()
+    print(
+        f"search k={args.k}: p50={statistics.median(latencies):.2f}ms "
+        f"p99={latencies[int(len(latencies) * 0.99) - 1]:.2f}ms"
+    )
+
+    started = time.perf_counter()
+    index.upsert("0", "Principal Rust Engineer", "systems", ["rust"])
+    print(f"incremental upsert: {(time.perf_counter() - started) * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
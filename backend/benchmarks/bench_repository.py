@@ -0,0 +1,97 @@
+"""Catalog reads against the SQL and in-memory job repositories.
+
+    python -m benchmarks.bench_repository --jobs 100000
+"""
+import argparse
+import datetime
+import random
+import statistics
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app import ingest, search, sql_models
+from app.api.jobs import JobFilters
+from app.migrations import run_migrations
+from app.models import JobFeedItem, JobSort, JobType
+from app.repository import MemoryJobRepository, SqlJobRepository
+from benchmarks.bench_matching import WORDS, synthetic_jobs
+
+FILTER_FIELDS = (
+    "type", "location", "company", "min_match_score", "min_salary", "max_salary", "currency",
+    "posted_within_days", "skill",
+)
+
+
+def filters(**values):
+    return JobFilters(**{field: values.get(field) for field in FILTER_FIELDS})
+
+
+def rows(count):
+    rng = random.Random(7)
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    types = list(JobType)
+    return [
+        ingest.to_row(JobFeedItem(
+            id=job_id, title=title, company=f"Company {i % 500}", location="Remote",
+            salary=f"${rng.randint(60, 200)},000", matchScore=rng.randint(40, 99), type=types[i % len(types)],
+            description=description, requirements=requirements, postedAt=f"{i % 30 + 1} days ago",
+        ), now)
+        for i, (job_id, title, description, requirements) in enumerate(synthetic_jobs(count, rng))
+    ]
+
+
+def timed(name, call, repeat):
+    call()
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        call()
+        latencies.append((time.perf_counter() - started) * 1000)
+    print(f"  {name:28} p50={statistics.median(latencies):8.3f}ms  {1000 / statistics.mean(latencies):9.0f} ops/s")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--jobs", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+    feed = rows(args.jobs)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/bench.db")
+        run_migrations(engine)
+        db = sessionmaker(bind=engine)()
+        started = time.perf_counter()
+        for start in range(0, len(feed), ingest.INGEST_BATCH_SIZE):
+            ingest.write_batch(db, feed[start:start + ingest.INGEST_BATCH_SIZE])
+        print(f"sql: wrote {args.jobs} jobs in {time.perf_counter() - started:.1f}s")
+        started = time.perf_counter()
+        memory = MemoryJobRepository(sql_models.Job(**row) for row in feed)
+        print(f"memory: loaded {args.jobs} jobs in {time.perf_counter() - started:.1f}s")
+
+        for name, repository in (("sql", SqlJobRepository(db)), ("memory", memory)):
+            print(name)
+            second = repository.page(filters(), JobSort.MATCH, None, 20)[1]
+            ids = [str(i) for i in random.Random(3).sample(range(args.jobs), 20)]
+            timed("page", lambda: repository.page(filters(), JobSort.MATCH, None, 20), args.repeat)
+            timed("page, second", lambda: repository.page(filters(), JobSort.MATCH, second, 20), args.repeat)
+            timed("page, type + skill", lambda: repository.page(
+                filters(type=JobType.CONTRACT, skill=["python"]), JobSort.RECENT, None, 20), args.repeat)
+            timed("page, salary range", lambda: repository.page(
+                filters(min_salary=150000), JobSort.SALARY_ASC, None, 20), args.repeat)
+            timed("get_many(20)", lambda: repository.get_many(ids), args.repeat)
+            timed("skill_matches", lambda: repository.skill_matches(
+                ["python", "react", "aws"], filters(), 0, 21), args.repeat // 10 or 1)
+            words = search.terms(f"{WORDS[20]} {WORDS[30][:3]}")
+            timed("search", lambda: repository.search(words, True, filters(), 0, 21),
+                  args.repeat // 10 or 1)
+            db.rollback()
+        db.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
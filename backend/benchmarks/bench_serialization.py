@@ -0,0 +1,91 @@
+"""Payload time for job lists: FastAPI's response_model path vs json_response.
+
+Both paths start from the same ORM rows and must produce the same JSON.
+"response_model" is what a handler returning ``List[Job]`` goes through:
+``Job.from_row`` per row, then FastAPI validates and dumps the list again
+and JSONResponse runs json.dumps. "json_response" encodes ``Job.payload``
+dicts once.
+
+    python -m benchmarks.bench_serialization --sizes 1000 10000
+"""
+import argparse
+import asyncio
+import gc
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+from app import sql_models
+from app.main import app
+from app.models import Job
+from app.responses import json_response
+from benchmarks.bench_matching import synthetic_jobs
+
+
+def rows(count):
+    rng = random.Random(3)
+    now = datetime.now(timezone.utc)
+    return [
+        sql_models.Job(
+            id=job_id, title=title, company=f"Company {i % 500}", location="Remote",
+            salary="$120,000 - $150,000", salary_min=120000, salary_max=150000, salary_currency="USD",
+            matchScore=rng.randint(40, 99), description=description, requirements=requirements,
+            postedAt="1 day ago", posted_at=now - timedelta(hours=rng.randint(1, 500)), type="Full-time",
+        )
+        for i, (job_id, title, description, requirements) in enumerate(synthetic_jobs(count, rng))
+    ]
+
+
+def _route_field(path, method):
+    for route in app.routes:
+        if getattr(route, "path", None) == path and method in route.methods:
+            return route.response_field
+    raise LookupError(path)
+
+
+async def response_model_path(field, jobs):
+    content = await serialize_response(field=field, response_content=[Job.from_row(job) for job in jobs])
+    return JSONResponse(content).body
+
+
+async def json_response_path(field, jobs):
+    return json_response([Job.payload(job) for job in jobs]).body
+
+
+async def time_path(path, field, jobs, repeat):
+    timings = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        body = await path(field, jobs)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), body
+
+
+async def run(args):
+    field = _route_field("/api/jobs/recommendations", "POST")
+    for size in args.sizes:
+        jobs = rows(size)
+        baseline, expected = await time_path(response_model_path, field, jobs, args.repeat)
+        fast, body = await time_path(json_response_path, field, jobs, args.repeat)
+        assert json.loads(body) == json.loads(expected)
+        print(
+            f"{size:>6} jobs  response_model {baseline:8.1f}ms   json_response {fast:8.1f}ms   "
+            f"({baseline / fast:.1f}x, {len(body) / 1024:.0f} KiB)"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--repeat", type=int, default=7)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
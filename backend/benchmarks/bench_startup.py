@@ -0,0 +1,58 @@
+"""Cold-start cost: import, lifespan startup and first request.
+
+Each boot runs in a fresh interpreter, as a new worker would. The first
+boot gets an empty database (migrate and seed); the later ones find it ready.
+
+    python -m benchmarks.bench_startup --boots 3
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+CHILD = r"""
+import asyncio, json, time
+started = time.perf_counter()
+from app.main import app
+imported = time.perf_counter()
+
+async def main():
+    import httpx
+    async with app.router.lifespan_context(app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.get("/api/jobs")
+            assert response.status_code == 200, response.text
+        first = time.perf_counter()
+    print(json.dumps({
+        "import": (imported - started) * 1000,
+        "startup": (ready - imported) * 1000,
+        "firstRequest": (first - ready) * 1000,
+        "total": (first - started) * 1000,
+    }))
+
+asyncio.run(main())
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--boots", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp}/startup.db"}
+        for boot in range(args.boots):
+            output = subprocess.run(
+                [sys.executable, "-c", CHILD], env=env, check=True, capture_output=True, text=True
+            ).stdout
+            timings = json.loads(output.strip().splitlines()[-1])
+            label = "cold" if boot == 0 else "warm"
+            print(f"{label}: " + " ".join(f"{stage}={ms:.0f}ms" for stage, ms in timings.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,397 @@
+"""Load-test the API and flag regressions against a stored baseline.
+
+Seeds a throwaway SQLite catalog per size and drives the app with
+concurrent httpx clients, either in-process over the ASGI transport
+(``--target asgi``), against a real ``uvicorn`` server (``--target
+uvicorn``) or against ``--workers`` processes of the production launcher,
+``app.serve`` (``--target serve``). Scenarios:
+
+- ``signup`` / ``login``: bursts of account creation and password logins
+- ``listings@<jobs>``: catalog pages across sort orders and filters
+- ``recommendations@<jobs>``: keyword-ranked recommendations per catalog size
+- ``search@<jobs>``: full-text search, half of it as-you-type prefixes
+- ``uploads``: concurrent resume uploads, each distinct so none hit the cache
+
+Each scenario records p50/p95/p99 latency, req/s and non-2xx responses to a
+JSON file. Rate limits are switched off for the run, and unless
+``ANALYSIS_MAX_CONCURRENT`` is set it is raised to ``--concurrency`` so
+uploads measure analysis rather than the 503 fast path. ``--repository memory``
+serves the catalog from memory (``JOB_REPOSITORY=memory``), which leaves
+catalog reads without database I/O. Keep a run from a known
+good commit as the baseline and compare later runs against it on the same
+machine; ``compare`` exits 1 when p95 grows, or req/s drops, by more than
+``--threshold``, or when a scenario starts returning errors.
+
+    python -m benchmarks.harness run --jobs 1000 10000 100000 --out results.json
+    python -m benchmarks.harness run --target uvicorn --baseline baseline.json
+    python -m benchmarks.harness run --target serve --workers 4 --scenarios listings search
+    python -m benchmarks.harness run --repository memory --jobs 10000
+    python -m benchmarks.harness compare baseline.json results.json --threshold 0.15
+"""
+import argparse
+import asyncio
+import datetime
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+SCENARIOS = ("signup", "login", "listings", "recommendations", "search", "uploads")
+CATALOG_SCENARIOS = ("listings", "recommendations", "search")
+PASSWORD = "password123"
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of ``values``."""
+    values = sorted(values)
+    return values[max(0, math.ceil(len(values) * fraction) - 1)]
+
+
+def summarise(latencies, elapsed, errors, concurrency):
+    return {
+        "requests": len(latencies),
+        "concurrency": concurrency,
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50": round(percentile(latencies, 0.50), 2),
+        "p95": round(percentile(latencies, 0.95), 2),
+        "p99": round(percentile(latencies, 0.99), 2),
+        "max": round(max(latencies), 2),
+    }
+
+
+def seed(url, count):
+    """Bulk-load ``count`` synthetic jobs the way the ingestion feed does."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from app import ingest
+    from app.migrations import run_migrations
+    from app.models import JobFeedItem
+    from benchmarks.bench_matching import synthetic_jobs
+
+    engine = create_engine(url)
+    run_migrations(engine)
+    rng = random.Random(7)
+    now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+    rows = [
+        ingest.to_row(JobFeedItem(
+            id=job_id, title=title, company=f"Company {i % 500}", location="Remote",
+            salary=f"${rng.randint(60, 200)},000", matchScore=rng.randint(40, 99),
+            description=description, requirements=requirements, postedAt=f"{i % 30 + 1} days ago",
+        ), now)
+        for i, (job_id, title, description, requirements) in enumerate(synthetic_jobs(count, rng))
+    ]
+    with sessionmaker(bind=engine)() as db:
+        for start in range(0, len(rows), ingest.INGEST_BATCH_SIZE):
+            ingest.write_batch(db, rows[start:start + ingest.INGEST_BATCH_SIZE])
+    engine.dispose()
+
+
+async def drive(request, total, concurrency):
+    """Run ``request(i)`` for i in range(total) with ``concurrency`` in flight."""
+    latencies, errors = [], 0
+    queue = iter(range(total))
+
+    async def worker():
+        nonlocal errors
+        for i in queue:
+            started = time.perf_counter()
+            response = await request(i)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if not response.is_success:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarise(latencies, time.perf_counter() - started, errors, concurrency)
+
+
+async def run_scenarios(client, args):
+    from benchmarks.bench_matching import WORDS
+
+    results = {}
+    rng = random.Random(11)
+    emails = [f"bench{i}@example.com" for i in range(args.requests)]
+
+    if "signup" in args.scenarios or "login" in args.scenarios:
+        async def signup(i):
+            return await client.post(
+                "/auth/signup", json={"email": emails[i], "username": f"bench{i}", "password": PASSWORD}
+            )
+        summary = await drive(signup, args.requests, args.concurrency)
+        if "signup" in args.scenarios:
+            results["signup"] = summary
+
+    if "login" in args.scenarios:
+        async def login(i):
+            return await client.post("/auth/login", json={"email": emails[i], "password": PASSWORD})
+        results["login"] = await drive(login, args.requests, args.concurrency)
+
+    if "listings" in args.scenarios:
+        sorts = ("match", "salary_desc", "salary_asc", "recent")
+        listings = [
+            {"sort": sorts[i % 4], "limit": 20, **({"type": "Full-time"} if i % 3 == 0 else {})}
+            for i in range(8)
+        ]
+
+        async def browse(i):
+            return await client.get("/api/jobs", params=listings[i % len(listings)])
+        results[f"listings@{args.catalog}"] = await drive(browse, args.requests, args.concurrency)
+
+    if "recommendations" in args.scenarios:
+        resumes = [
+            {
+                "overall": 70,
+                "categories": dict.fromkeys(("formatting", "keywords", "experience", "education", "skills"), 70),
+                "suggestions": [],
+                "keywords": rng.sample(WORDS, 8),
+            }
+            for _ in range(50)
+        ]
+
+        async def recommend(i):
+            return await client.post("/api/jobs/recommendations", json=resumes[i % len(resumes)])
+        # The first request builds the in-memory job index; time it separately.
+        started = time.perf_counter()
+        await recommend(0)
+        first_ms = (time.perf_counter() - started) * 1000
+        summary = await drive(recommend, args.requests, args.concurrency)
+        results[f"recommendations@{args.catalog}"] = {**summary, "firstMs": round(first_ms, 2)}
+
+    if "search" in args.scenarios:
+        queries = [
+            {"q": " ".join(rng.sample(WORDS, 2)), "prefix": "false"} if i % 2 else {"q": rng.choice(WORDS)[:3]}
+            for i in range(50)
+        ]
+
+        async def find(i):
+            return await client.get("/api/jobs/search", params=queries[i % len(queries)])
+        results[f"search@{args.catalog}"] = await drive(find, args.requests, args.concurrency)
+
+    if "uploads" in args.scenarios:
+        async def upload(i):
+            text = f"Resume {i}: " + ", ".join(rng.sample(WORDS, 12))
+            return await client.post(
+                "/api/resume/analyze", files={"file": (f"resume{i}.txt", text.encode(), "text/plain")}
+            )
+        await upload(-1)  # loads the extractors
+        results["uploads"] = await drive(upload, args.requests, args.concurrency)
+
+    return results
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_ready(client, server, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with {server.returncode}")
+        try:
+            if (await client.get("/")).is_success:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("server did not become ready")
+
+
+async def worker(args):
+    import httpx
+
+    timeout = httpx.Timeout(120)
+    if args.target == "asgi":
+        from app.main import app
+
+        # ASGITransport does not send lifespan events; run them so the
+        # background workers start and engines are disposed at the end.
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=timeout) as client:
+                return await run_scenarios(client, args)
+
+    port = _free_port()
+    if args.target == "serve":
+        command = ["app.serve", "--workers", str(args.workers)]
+    else:
+        command = ["uvicorn", "app.main:app"]
+    server = subprocess.Popen(
+        [sys.executable, "-m", *command, "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning", "--no-access-log"],
+    )
+    try:
+        limits = httpx.Limits(max_connections=args.concurrency)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=timeout, limits=limits) as client:
+            await _wait_ready(client, server)
+            return await run_scenarios(client, args)
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+
+def compare(baseline, current, threshold):
+    """Returns (report lines, regressed scenario names)."""
+    lines, regressed = [], []
+    if baseline["meta"].get("target") != current["meta"].get("target"):
+        lines.append(f"warning: baseline target {baseline['meta'].get('target')}, this run {current['meta'].get('target')}")
+    if baseline["meta"].get("workers", 1) != current["meta"].get("workers", 1):
+        lines.append(
+            f"warning: baseline workers {baseline['meta'].get('workers', 1)}, this run {current['meta'].get('workers', 1)}"
+        )
+    if baseline["meta"].get("repository", "sql") != current["meta"].get("repository", "sql"):
+        lines.append(
+            f"warning: baseline repository {baseline['meta'].get('repository', 'sql')}, "
+            f"this run {current['meta'].get('repository', 'sql')}"
+        )
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            lines.append(f"{name:28} new scenario, no baseline")
+            continue
+        problems = []
+        if now["p95"] > before["p95"] * (1 + threshold):
+            problems.append("p95")
+        if now["rps"] < before["rps"] * (1 - threshold):
+            problems.append("req/s")
+        if now["errors"] > before["errors"]:
+            problems.append("errors")
+        if problems:
+            regressed.append(name)
+        lines.append(
+            f"{name:28} p95 {before['p95']:8.1f} -> {now['p95']:8.1f}ms  "
+            f"req/s {before['rps']:7.1f} -> {now['rps']:7.1f}  "
+            f"errors {before['errors']} -> {now['errors']}"
+            + (f"  REGRESSION ({', '.join(problems)})" if problems else "")
+        )
+    for name in baseline["results"].keys() - current["results"].keys():
+        lines.append(f"{name:28} missing from this run")
+    return lines, regressed
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for index, catalog in enumerate(args.jobs):
+            url = f"sqlite:///{tmp}/bench-{catalog}.db"
+            started = time.perf_counter()
+            seed(url, catalog)
+            print(f"seeded {catalog} jobs in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+            # Only the catalog reads depend on catalog size; run the rest once.
+            scenarios = args.scenarios if index == 0 else [s for s in args.scenarios if s in CATALOG_SCENARIOS]
+            if not scenarios:
+                continue
+            env = {
+                "ANALYSIS_MAX_CONCURRENT": str(args.concurrency),
+                **os.environ,
+                "DATABASE_URL": url,
+                "JOB_REPOSITORY": args.repository,
+                "RATE_LIMITS": "login=off,signup=off,analyze=off",
+            }
+            output = subprocess.run(
+                [sys.executable, "-m", "benchmarks.harness", "_worker", "--target", args.target,
+                 "--workers", str(args.workers), "--catalog", str(catalog), "--requests", str(args.requests),
+                 "--concurrency", str(args.concurrency), "--scenarios", *scenarios],
+                env=env, check=True, stdout=subprocess.PIPE, text=True,
+            ).stdout
+            for name, summary in json.loads(output).items():
+                results[name] = summary
+                print(
+                    f"{name:28} {summary['rps']:7.1f} req/s  p50={summary['p50']:.1f}ms "
+                    f"p95={summary['p95']:.1f}ms p99={summary['p99']:.1f}ms  errors={summary['errors']}",
+                    file=sys.stderr,
+                )
+
+    report = {
+        "meta": {
+            "target": args.target,
+            "workers": args.workers if args.target == "serve" else 1,
+            "repository": args.repository,
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "revision": _git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "createdAt": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        },
+        "results": results,
+    }
+    with open(args.out, "w") as out:
+        json.dump(report, out, indent=2)
+    print(f"wrote {args.out}", file=sys.stderr)
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            return _report(json.load(baseline), report, args.threshold)
+    return 0
+
+
+def _report(baseline, current, threshold):
+    lines, regressed = compare(baseline, current, threshold)
+    print("\n".join(lines))
+    if regressed:
+        print(f"{len(regressed)} scenario(s) regressed by more than {threshold:.0%}")
+        return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed, load-test and write a results file")
+    run_parser.add_argument("--target", choices=("asgi", "uvicorn", "serve"), default="asgi")
+    run_parser.add_argument("--workers", type=int, default=2, help="server processes for --target serve")
+    run_parser.add_argument("--repository", choices=("sql", "memory"), default="sql", help="job catalog backend")
+    run_parser.add_argument("--jobs", type=int, nargs="+", default=[1000, 10000, 100000])
+    run_parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=list(SCENARIOS))
+    run_parser.add_argument("--requests", type=int, default=200, help="requests per scenario")
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--out", default="benchmark-results.json")
+    run_parser.add_argument("--baseline", help="compare against this results file when done")
+    run_parser.add_argument("--threshold", type=float, default=0.2)
+
+    compare_parser = commands.add_parser("compare", help="compare two results files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.2)
+
+    worker_parser = commands.add_parser("_worker")
+    worker_parser.add_argument("--target", choices=("asgi", "uvicorn", "serve"), required=True)
+    worker_parser.add_argument("--workers", type=int, default=2)
+    worker_parser.add_argument("--catalog", type=int, required=True)
+    worker_parser.add_argument("--requests", type=int, required=True)
+    worker_parser.add_argument("--concurrency", type=int, required=True)
+    worker_parser.add_argument("--scenarios", nargs="+", required=True)
+
+    args = parser.parse_args()
+    if args.command == "_worker":
+        # Results go to stdout for the parent; anything the app logs goes to stderr.
+        print(json.dumps(asyncio.run(worker(args))))
+    elif args.command == "run":
+        sys.exit(run(args))
+    else:
+        with open(args.baseline) as baseline, open(args.current) as current:
+            sys.exit(_report(json.load(baseline), json.load(current), args.threshold))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+import os
+import shutil
+import tempfile
+
+# The app's modules read DATABASE_URL when first imported, and startup
+# migrates and seeds that database. Point it at a throwaway file before any
+# test module imports them, so no run touches a developer's sql_app.db.
+_database_dir = tempfile.mkdtemp(prefix="resume-boost-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_database_dir}/test.db"
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_database_dir, ignore_errors=True)
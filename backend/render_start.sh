@@ -20,5 +20,5 @@ python -c "import sys; print(sys.path)"
 python -c "import backendapp.main; print('Import successful from script')" || echo "Import failed in script"
 
 # Start application with python -m to ensure path ensures
-echo "Starting uvicorn via python -m..."
-python -m uvicorn backend.app.main:app --host 0.0.0.0 --port $PORT
+echo "Starting ${WEB_CONCURRENCY:-one per core} workers via python -m..."
+exec python -m backend.app.serve --host 0.0.0.0 --port $PORT
@@ -0,0 +1,100 @@
+import io
+import zipfile
+import zlib
+
+import pytest
+
+from app.extract import extract_text
+from app.scoring import score_text
+from app.analysis import analyze_path
+
+RESUME_TEXT = """Jane Doe
+jane@example.com | +1 (555) 123-4567
+
+Summary
+Backend engineer who led teams and delivered scalable platforms.
+
+Experience
+- Led migration to Kubernetes on AWS, reduced costs by 30%
+- Built Python and FastAPI services handling 500 requests per second
+- Improved deployment automation with Terraform and Docker
+2016 - 2024 Senior Engineer, TechCorp
+
+Education
+Bachelor of Science, State University
+
+Skills
+Python, Django, PostgreSQL, Redis, React, TypeScript, Git, Linux
+"""
+
+
+def _write(tmp_path, name, data):
+    path = tmp_path / name
+    path.write_bytes(data)
+    return str(path)
+
+
+def _pdf(content: bytes, compress: bool) -> bytes:
+    body = zlib.compress(content) if compress else content
+    flt = b" /Filter /FlateDecode" if compress else b""
+    return (
+        b"%PDF-1.4\n1 0 obj\n<< /Length " + str(len(body)).encode() + flt + b" >>\nstream\n"
+        + body + b"\nendstream\nendobj\n%%EOF\n"
+    )
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_extract_pdf_text(tmp_path, compress):
+    content = b"BT /F1 12 Tf (Senior Python) Tj T* [(Engi) 20 (neer) -300 (at\\(AWS\\))] TJ ET"
+    path = _write(tmp_path, "resume.pdf", _pdf(content, compress))
+    text = extract_text(path, "resume.pdf")
+    assert "Senior Python" in text
+    assert "Engineer at(AWS)" in text
+
+
+def test_extract_pdf_skips_streams_that_inflate_past_the_cap(tmp_path, monkeypatch):
+    content = b"BT (Senior Python) Tj ET" + b" " * 4096
+    path = _write(tmp_path, "resume.pdf", _pdf(content, compress=True))
+    monkeypatch.setattr("app.extract.MAX_DECODED_BYTES", 1024)
+    assert "Senior Python" not in extract_text(path, "resume.pdf")
+    monkeypatch.setattr("app.extract.MAX_DECODED_BYTES", len(content))
+    assert "Senior Python" in extract_text(path, "resume.pdf")
+
+
+def test_extract_docx_text(tmp_path):
+    ns = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+    xml = (
+        f'<w:document xmlns:w="{ns}"><w:body>'
+        "<w:p><w:r><w:t>Skills</w:t></w:r></w:p>"
+        "<w:p><w:r><w:t>Python</w:t><w:tab/><w:t>React</w:t></w:r></w:p>"
+        "</w:body></w:document>"
+    )
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w") as archive:
+        archive.writestr("word/document.xml", xml)
+    path = _write(tmp_path, "resume.docx", buf.getvalue())
+    assert extract_text(path, "resume.docx").split("\n")[:2] == ["Skills", "Python\tReact"]
+
+
+def test_extract_falls_back_to_plain_text(tmp_path):
+    path = _write(tmp_path, "resume.pdf", b"not really a pdf")
+    assert extract_text(path, "resume.pdf") == "not really a pdf"
+    assert extract_text(_write(tmp_path, "empty.txt", b""), "empty.txt") == ""
+
+
+def test_score_is_deterministic_and_rewards_content():
+    strong = score_text(RESUME_TEXT)
+    assert strong == score_text(RESUME_TEXT)
+    weak = score_text("dummy resume content")
+    assert strong["overall"] > weak["overall"] > 0
+    for name in ("formatting", "keywords", "experience", "education", "skills"):
+        assert 0 <= strong["categories"][name] <= 100
+        assert strong["categories"][name] >= weak["categories"][name]
+    assert 1 <= len(weak["suggestions"]) <= 5
+
+
+def test_analyze_path_reports_stage_timings(tmp_path):
+    path = _write(tmp_path, "resume.txt", RESUME_TEXT.encode())
+    outcome = analyze_path(path, "resume.txt")
+    assert outcome["score"] == score_text(RESUME_TEXT)
+    assert set(outcome["timings"]) == {"extract", "score"}
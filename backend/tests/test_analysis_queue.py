@@ -0,0 +1,121 @@
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import sql_models
+from app.analysis import SpooledUpload
+from app.analysis_queue import (
+    AnalysisQueue, QueueFull, claim, complete, load, pending_count, release, requeue_abandoned, submit,
+)
+from app.cache import resume_cache
+
+
+def _sessions():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    sql_models.Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+
+def _upload(content: bytes, name="resume.txt") -> SpooledUpload:
+    fd, path = tempfile.mkstemp(suffix=".txt")
+    with os.fdopen(fd, "wb") as out:
+        out.write(content)
+    return SpooledUpload(path=path, filename=name, size=len(content), sha256=f"sha-{content.hex()}")
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    resume_cache.memory.clear()
+    yield
+    resume_cache.memory.clear()
+
+
+def test_claims_by_priority_then_age():
+    db = _sessions()()
+    low = submit(db, _upload(b"low"), priority=0)
+    high = submit(db, _upload(b"high"), priority=5)
+    later = submit(db, _upload(b"later"), priority=5)
+    assert pending_count(db) == 3
+    assert [claim(db).id for _ in range(3)] == [high.id, later.id, low.id]
+    assert claim(db) is None
+
+    path = load(db, high.id).path
+    complete(db, high.id, score={"overall": 1, "categories": {}, "suggestions": []})
+    assert not os.path.exists(path)
+    assert load(db, high.id).status == "done"
+    release(db, low.id)
+    assert load(db, low.id).status == "queued"
+    assert pending_count(db) == 2
+
+
+def test_backpressure_and_cached_documents():
+    db = _sessions()()
+    submit(db, _upload(b"first"), max_pending=1)
+    rejected = _upload(b"second")
+    with pytest.raises(QueueFull):
+        submit(db, rejected, max_pending=1)
+    rejected.discard()
+
+    # Already analysed: finished on submission, never counted against the limit.
+    resume_cache.set("sha-" + b"known".hex(), {"overall": 70, "categories": {}, "suggestions": []})
+    task = submit(db, _upload(b"known"), max_pending=1)
+    assert task.status == "done" and task.result["overall"] == 70
+
+
+def test_abandoned_tasks_are_requeued():
+    db = _sessions()()
+    task = submit(db, _upload(b"abandoned"))
+    claim(db)
+    task.startedAt = datetime.now(timezone.utc) - timedelta(hours=1)
+    db.commit()
+    assert requeue_abandoned(db, timeout=60) == 1
+    requeued = load(db, task.id)
+    assert requeued.status == "queued"
+    os.unlink(requeued.path)
+
+
+def test_dispatcher_runs_tasks_on_the_pool():
+    factory = _sessions()
+    queue = AnalysisQueue(concurrency=1, poll_interval=0.05, session_factory=factory)
+    with factory() as db:
+        ids = [submit(db, _upload(f"Python engineer {n}".encode())).id for n in range(2)]
+    queue.start()
+    try:
+        deadline = time.monotonic() + 60
+        with factory() as db:
+            while any(load(db, task_id).status not in ("done", "failed") for task_id in ids):
+                assert time.monotonic() < deadline
+                time.sleep(0.05)
+            db.expire_all()
+            tasks = [db.get(sql_models.AnalysisTask, task_id) for task_id in ids]
+            assert [task.status for task in tasks] == ["done", "done"]
+            assert all(task.result["overall"] >= 0 and task.path is None for task in tasks)
+    finally:
+        queue.stop()
+    assert queue.running == 0
+
+
+def test_failed_submit_hands_back_task_and_slots(monkeypatch):
+    class BrokenPool:
+        def submit(self, *args):
+            raise RuntimeError("cannot schedule new futures after shutdown")
+
+    held = []
+    monkeypatch.setattr("app.analysis_queue.get_executor", BrokenPool)
+    monkeypatch.setattr("app.analysis_queue.try_acquire_slot", lambda: held.append(1) or True)
+    monkeypatch.setattr("app.analysis_queue.release_slot", lambda: held.pop())
+    factory = _sessions()
+    queue = AnalysisQueue(concurrency=1, poll_interval=0.05, session_factory=factory)
+    with factory() as db:
+        task_id = submit(db, _upload(b"Python engineer")).id
+    with pytest.raises(RuntimeError):
+        queue.dispatch()
+    assert held == [] and queue.running == 0
+    with factory() as db:
+        assert load(db, task_id).status == "queued"
@@ -1,11 +1,20 @@
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy.pool import StaticPool
 import pytest
 from app.main import app
 from app.database import Base, get_db
 from app import sql_models
+from app.matching import job_index
+from app.ratelimit import limiter
+from app.security import revocations, user_cache
+from app.seed import demo_jobs, seed_jobs
+from app.repository import MemoryJobRepository, job_runner, memory_runner
+from app import catalog, ingest, recommendations
+from app.pagination import encode_cursor
+from app.analysis_queue import analysis_queue
 
 # Setup test DB
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -37,8 +46,15 @@ client = TestClient(app)
 @pytest.fixture(autouse=True)
 def run_around_tests():
     Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        seed_jobs(db)
     yield
     Base.metadata.drop_all(bind=engine)
+    job_index.reset()
+    catalog.clear_cache()
+    limiter.reset()
+    revocations.clear()
+    user_cache.clear()
 
 def test_read_main():
     response = client.get("/")
@@ -72,6 +88,39 @@ def test_auth_signup_login():
     assert response.status_code == 200
     assert response.json()["email"] == "testuser@example.com"
 
+def test_login_upgrades_plaintext_password():
+    db = TestingSessionLocal()
+    db.add(sql_models.User(id="legacy", email="legacy@example.com", username="legacy", password="password123"))
+    db.commit()
+    response = client.post("/auth/login", json={"email": "legacy@example.com", "password": "password123"})
+    assert response.status_code == 200
+    db.expire_all()
+    assert db.get(sql_models.User, "legacy").password.startswith("$argon2")
+    db.close()
+    assert client.post("/auth/login", json={"email": "legacy@example.com", "password": "wrong"}).status_code == 401
+
+def test_auth_rejects_tampered_and_revoked_tokens():
+    response = client.post("/auth/signup", json={
+        "email": "logout@example.com", "username": "logout", "password": "password123"
+    })
+    token = response.json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    body, signature = token.split(".")
+    forged = {"Authorization": f"Bearer {body}x.{signature}"}
+    assert client.get("/auth/me", headers=forged).status_code == 401
+
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+    # Another process only learns about the logout from the table.
+    revocations.clear()
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+def _auth_headers(email="applicant@example.com"):
+    response = client.post("/auth/signup", json={"email": email, "username": email, "password": "password123"})
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
 def test_job_recommendations():
     # Because valid user is not required for recommendations endpoint currently
     response = client.post("/api/jobs/recommendations", json=None)
@@ -81,10 +130,261 @@ def test_job_recommendations():
     job_id = response.json()[0]["id"]
     
     # Test Apply
-    response = client.post(f"/api/jobs/{job_id}/apply")
+    assert client.post(f"/api/jobs/{job_id}/apply").status_code == 401
+    response = client.post(f"/api/jobs/{job_id}/apply", headers=_auth_headers())
     assert response.status_code == 200
     assert response.json()["success"] is True
 
+def test_apply_is_idempotent_and_listed():
+    headers = _auth_headers()
+    first = client.post("/api/jobs/1/apply", headers=headers).json()
+    again = client.post("/api/jobs/1/apply", headers=headers).json()
+    assert not first["alreadyApplied"] and again["alreadyApplied"]
+    assert again["applicationId"] == first["applicationId"]
+    client.post("/api/jobs/2/apply", headers=headers)
+    client.post("/api/jobs/2/apply", headers=_auth_headers("other@example.com"))
+    assert client.post("/api/jobs/missing/apply", headers=headers).status_code == 404
+
+    assert client.get("/api/jobs/2/applicants/count").json() == {"jobId": "2", "count": 2}
+    assert client.get("/api/jobs/1/applicants/count").json()["count"] == 1
+    assert client.get("/api/jobs/missing/applicants/count").status_code == 404
+
+    page = client.get("/api/applications", params={"limit": 1}, headers=headers).json()
+    assert len(page["items"]) == 1 and page["nextCursor"]
+    rest = client.get("/api/applications", params={"cursor": page["nextCursor"]}, headers=headers).json()
+    assert {item["jobId"] for item in page["items"] + rest["items"]} == {"1", "2"}
+    assert rest["nextCursor"] is None
+    assert rest["items"][0]["job"]["id"] in {"1", "2"}
+    assert client.get("/api/applications").status_code == 401
+
+def test_apply_does_not_retry_a_persistent_integrity_error(monkeypatch):
+    headers = _auth_headers("stuck@example.com")
+
+    def commit(session):
+        raise IntegrityError("INSERT INTO applications", {}, Exception("FOREIGN KEY constraint failed"))
+
+    # E.g. the job exists only in an in-memory catalog, or the user row is gone.
+    monkeypatch.setattr(Session, "commit", commit)
+    response = client.post("/api/jobs/3/apply", headers=headers)
+    assert response.status_code == 409
+
+def test_job_recommendations_ranked_by_resume_keywords():
+    score = {
+        "overall": 80,
+        "categories": {"formatting": 80, "keywords": 80, "experience": 80, "education": 80, "skills": 80},
+        "suggestions": [],
+        "keywords": ["kubernetes", "terraform", "aws"],
+    }
+    response = client.post("/api/jobs/recommendations?limit=2", json=score)
+    assert response.status_code == 200
+    jobs = response.json()
+    assert len(jobs) <= 2
+    assert jobs[0]["title"] == "DevOps Engineer"
+    assert jobs[0]["matchScore"] >= jobs[-1]["matchScore"]
+
+def test_list_jobs_keyset_pagination():
+    seen = []
+    cursor = None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/jobs", params=params).json()
+        seen.extend(job["id"] for job in page["items"])
+        cursor = page["nextCursor"]
+        if cursor is None:
+            break
+    assert seen == ["1", "2", "3", "4", "5"]  # seed data is ordered by matchScore DESC
+
+    assert client.get("/api/jobs", params={"cursor": "not-a-cursor"}).status_code == 400
+    # Well-formed cursors whose values are not the sort columns' types.
+    for values in ({"matchScore": [1], "id": {}}, {"matchScore": "90", "id": "1"}, {"matchScore": 90, "id": None}):
+        assert client.get("/api/jobs", params={"cursor": encode_cursor(values)}).status_code == 400, values
+    bad_date = encode_cursor({"posted_at": 5, "id": "1"})
+    assert client.get("/api/jobs", params={"sort": "recent", "cursor": bad_date}).status_code == 400
+
+def test_list_jobs_filters():
+    page = client.get("/api/jobs", params={"type": "Full-time", "minMatchScore": 80}).json()
+    assert [job["id"] for job in page["items"]] == ["1", "3"]
+    page = client.get("/api/jobs", params={"company": "StartupXYZ"}).json()
+    assert [job["id"] for job in page["items"]] == ["2"]
+    response = client.post("/api/jobs/recommendations?location=Remote", json=None)
+    assert [job["id"] for job in response.json()] == ["2"]
+
+def test_list_jobs_salary_range_and_sort():
+    page = client.get("/api/jobs", params={"minSalary": 165000, "sort": "salary_desc"}).json()
+    assert [job["id"] for job in page["items"]] == ["1", "5", "4"]
+    assert page["items"][0]["salaryMin"] == 150000
+    assert page["items"][0]["salaryCurrency"] == "USD"
+    page = client.get("/api/jobs", params={"maxSalary": 125000, "sort": "salary_asc", "limit": 1}).json()
+    assert [job["id"] for job in page["items"]] == ["3"]
+    page = client.get("/api/jobs", params={"maxSalary": 125000, "sort": "salary_asc", "limit": 1,
+                                          "cursor": page["nextCursor"]}).json()
+    assert [job["id"] for job in page["items"]] == ["2"]
+    assert page["nextCursor"] is None
+
+def test_list_jobs_recent_sort_and_posted_within():
+    page = client.get("/api/jobs", params={"sort": "recent", "limit": 2}).json()
+    assert [job["id"] for job in page["items"]] == ["5", "1"]
+    assert page["items"][1]["postedAt"] == "2 days ago"
+    assert page["items"][1]["postedDate"] is not None
+    page = client.get("/api/jobs", params={"sort": "recent", "limit": 2, "cursor": page["nextCursor"]}).json()
+    assert [job["id"] for job in page["items"]] == ["3", "4"]
+    page = client.get("/api/jobs", params={"sort": "recent", "postedWithinDays": 4}).json()
+    assert [job["id"] for job in page["items"]] == ["5", "1", "3"]
+
+def test_list_jobs_conditional_requests():
+    first = client.get("/api/jobs", params={"limit": 5})
+    etag = first.headers["ETag"]
+    assert etag.startswith('W/"')
+    assert "max-age" in first.headers["Cache-Control"]
+
+    again = client.get("/api/jobs", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["ETag"] == etag
+    assert client.get("/api/jobs", params={"limit": 6}).headers["ETag"] != etag
+
+    with TestingSessionLocal() as db:
+        db.get(sql_models.Job, "1").title = "Retitled"
+        db.commit()
+    changed = client.get("/api/jobs", params={"limit": 5}, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+
+def test_search_ranks_and_highlights():
+    response = client.get("/api/jobs/search", params={"q": "engineer"})
+    assert response.status_code == 200
+    titles = [job["title"] for job in response.json()["items"]]
+    assert set(titles) == {"Senior Software Engineer", "Frontend Engineer", "DevOps Engineer"}
+    hit = response.json()["items"][0]
+    assert "<mark>Engineer</mark>" in hit["highlights"]["title"]
+
+    # The last word is a prefix unless prefix=false.
+    assert [job["title"] for job in client.get("/api/jobs/search", params={"q": "devo"}).json()["items"]] == [
+        "DevOps Engineer"
+    ]
+    assert client.get("/api/jobs/search", params={"q": "devo", "prefix": "false"}).json()["items"] == []
+    # Query syntax is not passed through, and an all-punctuation query matches nothing.
+    assert client.get("/api/jobs/search", params={"q": '" OR *'}).json() == {"items": [], "nextCursor": None}
+
+def test_search_filters_pages_and_follows_writes():
+    first = client.get("/api/jobs/search", params={"q": "engineer", "limit": 2}).json()
+    second = client.get("/api/jobs/search", params={"q": "engineer", "cursor": first["nextCursor"]}).json()
+    assert len(first["items"]) == 2 and len(second["items"]) == 1 and second["nextCursor"] is None
+    for rank in ("x", [1], -1):
+        params = {"q": "engineer", "cursor": encode_cursor({"rank": rank})}
+        assert client.get("/api/jobs/search", params=params).status_code == 400
+    contract = client.get("/api/jobs/search", params={"q": "engineer", "type": "Contract"}).json()["items"]
+    assert [job["title"] for job in contract] == ["DevOps Engineer"]
+
+    with TestingSessionLocal() as db:
+        db.get(sql_models.Job, "3").title = "Frontend <Wizard>"
+        db.commit()
+    items = client.get("/api/jobs/search", params={"q": "wizard"}).json()["items"]
+    assert [job["highlights"]["title"] for job in items] == ["Frontend &lt;<mark>Wizard</mark>&gt;"]
+    assert len(client.get("/api/jobs/search", params={"q": "engineer"}).json()["items"]) == 2
+
+def test_skill_filter_and_skill_matches():
+    react = client.get("/api/jobs", params={"skill": "React"}).json()["items"]
+    assert {job["id"] for job in react} == {"1", "2", "3"}
+    both = client.get("/api/jobs", params=[("skill", "react"), ("skill", "typescript")]).json()["items"]
+    assert [job["id"] for job in both] == ["1"]
+
+    response = client.get("/api/jobs/skill-matches", params=[("have", "React/Node.js"), ("have", "postgres")])
+    assert response.status_code == 200
+    items = response.json()["items"]
+    # Full Stack Developer asks for all three; matchScore is the share matched.
+    assert (items[0]["id"], items[0]["matchScore"]) == ("2", 100)
+    assert {job["id"] for job in items} == {"1", "2", "3"}
+    contract = client.get("/api/jobs/skill-matches", params={"have": "aws", "type": "Contract"}).json()["items"]
+    assert [job["id"] for job in contract] == ["5"]
+    assert client.get("/api/jobs/skill-matches", params={"have": "10 years"}).json()["items"] == []
+    page = client.get("/api/jobs/skill-matches", params={"have": "react", "limit": 1}).json()
+    after = client.get("/api/jobs/skill-matches", params={"have": "react", "cursor": page["nextCursor"]}).json()
+    assert {job["id"] for job in page["items"] + after["items"]} == {"1", "2", "3"}
+    for rank in ("x", [1], -1):
+        params = {"have": "react", "cursor": encode_cursor({"rank": rank})}
+        assert client.get("/api/jobs/skill-matches", params=params).status_code == 400
+
+def test_large_listings_are_gzipped():
+    response = client.get("/api/jobs", params={"limit": 100}, headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.json()["items"]
+
+def test_recommendations_next_cursor_header():
+    first = client.post("/api/jobs/recommendations?limit=3", json=None)
+    second = client.post(f"/api/jobs/recommendations?limit=3&cursor={first.headers['X-Next-Cursor']}", json=None)
+    assert [job["id"] for job in first.json() + second.json()] == ["1", "2", "3", "4", "5"]
+    assert "X-Next-Cursor" not in second.headers
+
+def test_ranked_recommendations_reject_bad_rank_cursors():
+    score = {
+        "overall": 80, "keywords": ["kubernetes", "terraform", "aws", "react"], "suggestions": [],
+        "categories": {"formatting": 80, "keywords": 80, "experience": 80, "education": 80, "skills": 80},
+    }
+    url = "/api/jobs/recommendations?limit=1"
+    first = client.post(url, json=score)
+    second = client.post(f"{url}&cursor={first.headers['X-Next-Cursor']}", json=score)
+    assert second.status_code == 200 and second.json()[0]["id"] != first.json()[0]["id"]
+    for rank in ("x", [1], -1, True, None):
+        response = client.post(f"{url}&cursor={encode_cursor({'rank': rank})}", json=score)
+        assert response.status_code == 400, rank
+
+def test_routes_serve_the_memory_catalog_alike():
+    score = {
+        "overall": 80, "keywords": ["react", "aws"], "suggestions": [],
+        "categories": {"formatting": 80, "keywords": 80, "experience": 80, "education": 80, "skills": 80},
+    }
+
+    def fetch():
+        pages = [
+            client.get("/api/jobs", params={"limit": 2, "sort": "salary_desc"}).json(),
+            client.get("/api/jobs", params={"type": "Full-time", "skill": "react"}).json(),
+            client.get("/api/jobs/skill-matches", params={"have": ["React", "AWS/GCP"]}).json(),
+            {"items": client.post("/api/jobs/recommendations", json=score).json()},
+        ]
+        for page in pages:
+            for item in page["items"]:
+                # Each backend stamped "2 days ago" when it loaded the demo jobs.
+                item.pop("postedDate")
+        return [
+            *pages,
+            sorted(hit["id"] for hit in client.get("/api/jobs/search", params={"q": "engineer clo"}).json()["items"]),
+            client.post("/api/jobs/recommendations/batch", json={"resumes": [score]}).json(),
+            client.get("/api/jobs/3/applicants/count").json(),
+            client.get("/api/jobs/missing/applicants/count").status_code,
+        ]
+
+    expected = fetch()
+    app.dependency_overrides[job_runner] = lambda: memory_runner(MemoryJobRepository(demo_jobs()))
+    try:
+        assert fetch() == expected
+    finally:
+        del app.dependency_overrides[job_runner]
+
+def test_batch_recommendations():
+    base = {
+        "overall": 80,
+        "categories": {"formatting": 80, "keywords": 80, "experience": 80, "education": 80, "skills": 80},
+        "suggestions": [],
+    }
+    body = {"resumes": [{**base, "keywords": ["react", "figma"]}, {**base, "keywords": ["kubernetes"]}], "limit": 3}
+    response = client.post("/api/jobs/recommendations/batch", json=body)
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 2
+    assert results[0][0]["jobId"] == "3"
+    assert results[1][0]["jobId"] == "5"
+
+def test_ingest_endpoint_requires_key(monkeypatch):
+    feed = b'{"id": "f1", "title": "Elixir Engineer", "company": "Beam"}\n{"title": ""}\n'
+    files = {"file": ("feed.jsonl", feed, "application/x-ndjson")}
+    assert client.post("/api/jobs/ingest", files=files).status_code == 403
+    monkeypatch.setattr(ingest, "INGEST_API_KEY", "s3cret")
+    assert client.post("/api/jobs/ingest", files=files, headers={"X-API-Key": "nope"}).status_code == 401
+    response = client.post("/api/jobs/ingest", files=files, headers={"X-API-Key": "s3cret"})
+    assert response.status_code == 200
+    assert (response.json()["written"], response.json()["invalid"]) == (1, 1)
+    listed = client.get("/api/jobs", params={"company": "Beam"}).json()["items"]
+    assert [job["id"] for job in listed] == ["f1"]
+
 def test_resume_analyze():
     # Create a dummy file
     file_content = b"dummy resume content"
@@ -94,3 +394,100 @@ def test_resume_analyze():
     assert response.status_code == 200
     data = response.json()
     assert "overall" in data
+    assert "extract;dur=" in response.headers["Server-Timing"]
+
+def test_recommendations_materialised_for_signed_in_upload(monkeypatch):
+    monkeypatch.setattr(recommendations.refresher, "session_factory", TestingSessionLocal)
+    headers = _auth_headers("resume@example.com")
+    assert client.get("/api/jobs/recommendations/me").status_code == 401
+    assert client.get("/api/jobs/recommendations/me", headers=headers).status_code == 404
+
+    files = {"file": ("resume.txt", b"Senior engineer: kubernetes, terraform, aws, python", "text/plain")}
+    assert client.post("/api/resume/analyze", files=files, headers=headers).status_code == 200
+    # Until the refresher has run, reads answer at once with nothing yet.
+    pending = client.get("/api/jobs/recommendations/me", headers=headers)
+    assert pending.json()["items"] == [] and pending.json()["stale"] is True
+
+    assert recommendations.refresher.run_pending() == 1
+    response = client.get("/api/jobs/recommendations/me", headers=headers)
+    assert response.headers["ETag"] != pending.headers["ETag"]
+    assert response.status_code == 200
+    data = response.json()
+    assert data["items"] and data["stale"] is False
+    assert all(job["postedAt"] for job in data["items"])
+    revalidated = client.get(
+        "/api/jobs/recommendations/me", headers={**headers, "If-None-Match": response.headers["ETag"]}
+    )
+    assert revalidated.status_code == 304
+
+def test_resume_analysis_task_with_events(monkeypatch):
+    monkeypatch.setattr(analysis_queue, "session_factory", TestingSessionLocal)
+    files = {"file": ("resume.txt", b"Queued resume: python, sql, docker", "text/plain")}
+    response = client.post("/api/resume/tasks", files=files, params={"priority": 3})
+    assert response.status_code == 202
+    task = response.json()
+    assert task["status"] == "queued" and task["priority"] == 3
+    assert response.headers["Location"] == f"/api/resume/tasks/{task['id']}"
+    assert client.get(f"/api/resume/tasks/{task['id']}").json()["status"] == "queued"
+    assert client.get("/api/resume/tasks/missing").status_code == 404
+
+    analysis_queue.start()
+    try:
+        with client.stream("GET", f"/api/resume/tasks/{task['id']}/events") as events:
+            assert events.headers["content-type"].startswith("text/event-stream")
+            body = "".join(events.iter_text())
+    finally:
+        analysis_queue.stop()
+    assert body.startswith("event: status")
+    finished = client.get(f"/api/resume/tasks/{task['id']}").json()
+    assert finished["status"] == "done" and finished["result"]["overall"] >= 0
+    assert '"status":"done"' in body
+
+def test_signed_in_analysis_tasks_are_private():
+    owner, other = _auth_headers("owner@example.com"), _auth_headers("other@example.com")
+    files = {"file": ("resume.txt", b"Private resume: go, rust", "text/plain")}
+    task = client.post("/api/resume/tasks", files=files, headers=owner).json()
+    path = f"/api/resume/tasks/{task['id']}"
+    assert client.get(path, headers=owner).status_code == 200
+    assert client.get(path, headers=other).status_code == 404
+    assert client.get(path).status_code == 404
+    assert client.get(f"{path}/events", headers=other).status_code == 404
+
+def test_resume_analysis_queue_full(monkeypatch):
+    monkeypatch.setattr("app.analysis_queue.ANALYSIS_QUEUE_MAX_PENDING", 0)
+    files = {"file": ("resume.txt", b"Nobody has analysed this yet", "text/plain")}
+    response = client.post("/api/resume/tasks", files=files)
+    assert response.status_code == 429
+    assert "Retry-After" in response.headers
+
+def test_login_rate_limited(monkeypatch):
+    from app.ratelimit import Limit
+    monkeypatch.setitem(limiter.limits, "login", Limit(burst=2, per_second=0.001))
+    credentials = {"email": "nobody@example.com", "password": "wrong"}
+    assert [client.post("/auth/login", json=credentials).status_code for _ in range(3)] == [401, 401, 429]
+
+def test_resume_analyze_sheds_load_when_busy(monkeypatch):
+    monkeypatch.setattr("app.analysis.try_acquire_slot", lambda: False)
+    files = {"file": ("resume.txt", b"Busy server resume", "text/plain")}
+    response = client.post("/api/resume/analyze", files=files)
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "5"
+
+def test_db_stats_need_the_ops_key(monkeypatch):
+    assert client.get("/api/db/stats").status_code == 403
+    monkeypatch.setattr("app.api.auth.OPS_API_KEY", "ops-key")
+    assert client.get("/api/db/stats", headers={"X-API-Key": "wrong"}).status_code == 401
+    assert "checkouts" in client.get("/api/db/stats", headers={"X-API-Key": "ops-key"}).json()
+
+def test_resume_analyze_cache_hit(monkeypatch):
+    files = {"file": ("resume.txt", b"Python engineer resume for cache test", "text/plain")}
+    first = client.post("/api/resume/analyze", files=files)
+    second = client.post("/api/resume/analyze", files=files)
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert first.json() == second.json()
+    assert client.get("/api/resume/cache/stats").status_code == 403
+    monkeypatch.setattr("app.api.auth.OPS_API_KEY", "ops-key")
+    assert client.get("/api/resume/cache/stats", headers={"X-API-Key": "wrong"}).status_code == 401
+    stats = client.get("/api/resume/cache/stats", headers={"X-API-Key": "ops-key"}).json()
+    assert stats["memory"]["hits"] >= 1
@@ -0,0 +1,80 @@
+"""The routes against an AsyncSession (DATABASE_ASYNC mode) on aiosqlite."""
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import Base, async_url, get_db
+from app.main import app
+from app.matching import job_index
+from app.ratelimit import limiter
+from app.security import revocations, user_cache
+from app.seed import seed_jobs
+
+
+@pytest.fixture
+def client(tmp_path):
+    url = f"sqlite:///{tmp_path}/async.db"
+    sync_engine = create_engine(url)
+    Base.metadata.create_all(bind=sync_engine)
+    with Session(bind=sync_engine) as db:
+        seed_jobs(db)
+    async_engine = create_async_engine(async_url(url))
+    sessions = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+    async def override_get_db():
+        async with sessions() as db:
+            yield db
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    job_index.reset()
+    with TestClient(app) as test_client:
+        yield test_client
+        test_client.portal.call(async_engine.dispose)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    job_index.reset()
+    revocations.clear()
+    limiter.reset()
+    user_cache.clear()
+    sync_engine.dispose()
+
+
+def test_async_url():
+    assert async_url("sqlite:///./sql_app.db") == "sqlite+aiosqlite:///./sql_app.db"
+    assert async_url("postgresql://u:p@db/app") == "postgresql+asyncpg://u:p@db/app"
+
+
+def test_auth_flow(client):
+    response = client.post("/auth/signup", json={"email": "a@example.com", "username": "a", "password": "pw123456"})
+    assert response.status_code == 201
+    token = client.post("/auth/login", json={"email": "a@example.com", "password": "pw123456"}).json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.get("/auth/me", headers=headers).json()["email"] == "a@example.com"
+    assert client.post("/auth/logout", headers=headers).status_code == 200
+    assert client.get("/auth/me", headers=headers).status_code == 401
+
+
+def test_job_routes(client):
+    page = client.get("/api/jobs", params={"limit": 2}).json()
+    assert len(page["items"]) == 2 and page["nextCursor"]
+    score = {
+        "overall": 80,
+        "categories": {"formatting": 80, "keywords": 80, "experience": 80, "education": 80, "skills": 80},
+        "suggestions": [],
+        "keywords": ["kubernetes", "terraform"],
+    }
+    ranked = client.post("/api/jobs/recommendations", json=score).json()
+    assert ranked[0]["title"] == "DevOps Engineer"
+    batch = client.post("/api/jobs/recommendations/batch", json={"resumes": [score], "limit": 2})
+    assert batch.json()["results"][0][0]["jobId"] == "5"
+    token = client.post("/auth/signup", json={"email": "b@example.com", "username": "b", "password": "pw123456"}).json()["token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    assert client.post("/api/jobs/404/apply", headers=headers).status_code == 404
+    assert client.post("/api/jobs/1/apply", headers=headers).json()["alreadyApplied"] is False
+    assert client.post("/api/jobs/1/apply", headers=headers).json()["alreadyApplied"] is True
+    assert client.get("/api/applications", headers=headers).json()["items"][0]["jobId"] == "1"
@@ -0,0 +1,36 @@
+import numpy as np
+
+from app.batch_scoring import JobMatrix, score_matrix, top_matches
+from app.models import ResumeCategories, ResumeScore
+
+JOBS = [
+    ("py", "Python Backend Engineer", "Build APIs with Django", ["Python", "PostgreSQL"]),
+    ("fe", "Frontend Engineer", "React interfaces", ["React", "TypeScript"]),
+    ("ops", "DevOps Engineer", "Kubernetes and Terraform on AWS", ["AWS", "Kubernetes"]),
+]
+
+
+def _resume(*keywords):
+    categories = ResumeCategories(formatting=0, keywords=0, experience=0, education=0, skills=0)
+    return ResumeScore(overall=0, categories=categories, suggestions=[], keywords=list(keywords))
+
+
+def test_score_matrix_matches_per_chunk_and_whole():
+    matrix = JobMatrix.from_rows(JOBS)
+    resumes = [_resume("python", "django"), ["react", "typescript"], ["kubernetes", "aws"]]
+    whole = score_matrix(resumes, matrix, chunk_size=len(JOBS))
+    chunked = score_matrix(resumes, matrix, chunk_size=1)
+    np.testing.assert_allclose(whole, chunked, rtol=1e-6)
+    assert whole.shape == (3, 3)
+    assert list(whole.argmax(axis=1)) == [0, 1, 2]
+    assert np.all((whole >= 0) & (whole <= 1 + 1e-6))
+
+
+def test_top_matches_agrees_with_full_matrix():
+    matrix = JobMatrix.from_rows(JOBS)
+    resumes = [["engineer", "python"], ["terraform"], ["cobol"]]
+    full = score_matrix(resumes, matrix)
+    top = top_matches(resumes, matrix, k=2, chunk_size=2)
+    assert [job_id for job_id, _ in top[0]] == [matrix.job_ids[i] for i in np.argsort(-full[0])[:2]]
+    assert [job_id for job_id, _ in top[1]] == ["ops"]
+    assert top[2] == []
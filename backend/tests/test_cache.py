@@ -0,0 +1,48 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.cache import LRUCache, ResumeScoreCache
+from app.database import Base
+
+SCORE = {"overall": 70, "categories": {}, "suggestions": []}
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2, max_bytes=10_000, ttl=60)
+    cache.set("a", SCORE)
+    cache.set("b", SCORE)
+    assert cache.get("a") == SCORE
+    cache.set("c", SCORE)
+    assert cache.get("b") is None
+    assert cache.get("a") == SCORE
+    stats = cache.stats()
+    assert stats["evictions"] == 1
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+
+
+def test_lru_respects_byte_budget_and_ttl():
+    cache = LRUCache(max_entries=100, max_bytes=100, ttl=60)
+    cache.set("a", SCORE)
+    cache.set("b", SCORE)
+    assert cache.stats()["entries"] == 1
+    expiring = LRUCache(max_entries=10, max_bytes=10_000, ttl=-1)
+    expiring.set("a", SCORE)
+    assert expiring.get("a") is None
+    assert expiring.stats()["expirations"] == 1
+
+
+def test_persistent_tier_survives_new_process_cache():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    first = ResumeScoreCache(LRUCache(10, 10_000, 60), persist=True)
+    first.set("abc", SCORE)
+    first.store("abc", SCORE, db)
+
+    restarted = ResumeScoreCache(LRUCache(10, 10_000, 60), persist=True)
+    assert restarted.get("abc") is None
+    assert restarted.load("abc", db) == SCORE
+    assert restarted.get("abc") == SCORE
+    assert restarted.stats()["persistent"]["hits"] == 1
+    db.close()
@@ -0,0 +1,57 @@
+import threading
+
+from sqlalchemy import text
+
+from app.database import DB_MAX_OVERFLOW, TimedQueuePool, make_engine, pool_metrics, pool_stats
+
+
+def test_sqlite_connections_use_wal_and_busy_timeout(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/wal.db")
+    assert isinstance(engine.pool, TimedQueuePool)
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conn.execute(text("PRAGMA busy_timeout")).scalar() == 5000
+        assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+    engine.dispose()
+
+
+def test_concurrent_writers_wait_instead_of_failing(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/writers.db")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE t (n INTEGER)"))
+    errors = []
+
+    def write(n):
+        try:
+            for _ in range(20):
+                with engine.begin() as conn:
+                    conn.execute(text("INSERT INTO t VALUES (:n)"), {"n": n})
+        except Exception as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=write, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    with engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM t")).scalar() == 160
+    engine.dispose()
+
+
+def test_pool_stats_report_checkouts_and_saturation(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/stats.db")
+    pool_metrics.reset()
+    with engine.connect():
+        stats = pool_stats(engine)
+        assert stats["checkedOut"] == 1
+        assert stats["saturation"] == round(1 / (stats["size"] + DB_MAX_OVERFLOW), 3)
+    assert pool_metrics.stats()["checkouts"] == 1
+    engine.dispose()
+
+
+def test_in_memory_sqlite_keeps_single_connection_pool():
+    engine = make_engine("sqlite://")
+    assert not isinstance(engine.pool, TimedQueuePool)
+    assert "checkedOut" not in pool_stats(engine)
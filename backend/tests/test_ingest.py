@@ -0,0 +1,108 @@
+import csv
+import io
+import json
+from datetime import timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import sql_models
+from app.database import Base
+from app.ingest import ingest_stream
+from app.matching import JobIndex, job_index
+from app.recency import utcnow
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _jsonl(*records):
+    return io.StringIO("\n".join(json.dumps(r) if isinstance(r, dict) else r for r in records) + "\n")
+
+
+def test_jsonl_batches_validate_and_dedupe():
+    db = _session()
+    feed = _jsonl(
+        {"title": "Rust Engineer", "company": "Ferris", "location": "Remote", "salary": "$150k - $180k",
+         "requirements": ["rust"], "postedAt": "2 days ago", "type": "Remote"},
+        {"title": "Rust Engineer", "company": "ferris ", "location": "remote", "description": "updated"},
+        {"id": "j3", "title": "Go Developer", "company": "Gopher"},
+        {"title": "", "company": "Nobody"},
+        "not json",
+    )
+    report = ingest_stream(db, feed, batch_size=1)
+    assert (report.received, report.written, report.invalid) == (5, 3, 2)
+    assert [error.line for error in report.errors] == [4, 5]
+    # Same natural key in two batches: updated in place, not duplicated.
+    assert db.scalar(select(func.count()).select_from(sql_models.Job)) == 2
+    job = db.scalars(select(sql_models.Job).where(sql_models.Job.id != "j3")).one()
+    assert job.description == "updated"
+    assert job.posted_at is not None
+
+
+def test_csv_feed_and_reimport_updates_rows():
+    db = _session()
+    csv_feed = (
+        "id,title,company,location,salary,requirements,type\n"
+        "c1,Data Engineer,Acme,Berlin,€70k - €90k,python; spark,Full-time\n"
+        "c2,Analyst,Acme,Berlin,,sql,Part-time\n"
+    )
+    report = ingest_stream(db, io.StringIO(csv_feed), "csv")
+    assert (report.written, report.invalid) == (2, 0)
+    job = db.get(sql_models.Job, "c1")
+    assert job.requirements == ["python", "spark"]
+    assert (job.salary_min, job.salary_max, job.salary_currency) == (70000, 90000, "EUR")
+    assert db.get(sql_models.Job, "c2").salary is None
+
+    ingest_stream(db, io.StringIO(csv_feed.replace("Analyst", "Senior Analyst")), "csv")
+    db.expire_all()
+    assert db.get(sql_models.Job, "c2").title == "Senior Analyst"
+    assert db.scalar(select(func.count()).select_from(sql_models.Job)) == 2
+
+
+def test_reimport_keeps_the_date_of_undated_postings():
+    db = _session()
+    feed = _jsonl(
+        {"id": "u1", "title": "Ops", "company": "Acme"},
+        {"id": "d1", "title": "Dev", "company": "Acme", "postedAt": "3 days ago"},
+    ).getvalue()
+    ingest_stream(db, io.StringIO(feed))
+    first = db.get(sql_models.Job, "u1")
+    first.posted_at -= timedelta(days=40)
+    db.commit()
+    imported = first.posted_at
+
+    ingest_stream(db, io.StringIO(feed.replace("Ops", "Ops Lead")))
+    db.expire_all()
+    job = db.get(sql_models.Job, "u1")
+    assert (job.title, job.posted_at) == ("Ops Lead", imported)
+    # A date the feed does give still wins.
+    assert utcnow().replace(tzinfo=None) - db.get(sql_models.Job, "d1").posted_at > timedelta(days=2)
+
+
+def test_unreadable_csv_records_are_reported_not_raised():
+    db = _session()
+    huge = "x" * (csv.field_size_limit() + 10)
+    csv_feed = (
+        "id,title,company\n"
+        "c1,Data Engineer,Acme\n"
+        f'c2,"{huge}",Acme\n'
+        "c3,Analyst,Acme\n"
+    )
+    report = ingest_stream(db, io.StringIO(csv_feed), "csv", batch_size=1)
+    assert (report.received, report.written, report.invalid) == (3, 2, 1)
+    assert "field larger than field limit" in report.errors[0].error
+    assert db.get(sql_models.Job, "c3") is not None
+
+
+def test_bulk_upsert_reaches_loaded_index():
+    index = JobIndex()
+    index.loaded = True
+    generation = index.generation
+    index.apply_bulk_upsert([("x", "Kotlin Developer", "android apps", ["kotlin"], None)])
+    assert index.generation == generation + 1
+    assert index.search(["kotlin"], k=1)[0][0] == "x"
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import sql_models
+from app.database import Base
+from app.matching import JobIndex, job_index, relevance_to_match_score
+
+
+def _index():
+    index = JobIndex()
+    index.upsert("py", "Python Backend Engineer", "Build APIs with Django", ["Python", "PostgreSQL"])
+    index.upsert("fe", "Frontend Engineer", "React interfaces", ["React", "TypeScript"])
+    index.upsert("ops", "DevOps Engineer", "Kubernetes and Terraform on AWS", ["AWS", "Kubernetes"])
+    return index
+
+
+def test_search_ranks_by_relevance():
+    index = _index()
+    hits = index.search(["python", "django", "react"], k=3)
+    assert [job_id for job_id, _ in hits] == ["py", "fe"]
+    assert hits[0][1] > hits[1][1]
+    assert index.search(["cobol"]) == []
+
+
+def test_search_keeps_only_top_k():
+    index = _index()
+    assert [job_id for job_id, _ in index.search(["engineer", "kubernetes"], k=1)] == ["ops"]
+
+
+def test_upsert_and_remove_are_incremental():
+    index = _index()
+    index.upsert("fe", "Rust Engineer", "Systems work", ["Rust"])
+    assert index.search(["react"]) == []
+    assert index.search(["rust"])[0][0] == "fe"
+    index.remove("ops")
+    assert index.search(["kubernetes"]) == []
+    assert len(index) == 2
+
+
+def test_compaction_preserves_results():
+    index = JobIndex()
+    for i in range(2000):
+        index.upsert(str(i), f"Engineer {i}", "python" if i % 2 else "java", [])
+    for i in range(1500):
+        index.remove(str(i))
+    assert len(index) == 500
+    assert len(index._job_ids) < 2000
+    hits = index.search(["python"], k=1000)
+    assert sorted(int(job_id) for job_id, _ in hits) == list(range(1501, 2000, 2))
+
+
+def test_recency_breaks_ties_between_equal_jobs():
+    index = JobIndex()
+    now = datetime.now(timezone.utc)
+    index.upsert("old", "Python Engineer", "", [], now - timedelta(days=90))
+    index.upsert("new", "Python Engineer", "", [], now - timedelta(days=1))
+    assert [job_id for job_id, _ in index.search(["python"])] == ["new", "old"]
+    hits = index.search(["python"], recency=False)
+    assert hits[0][1] == hits[1][1]
+
+
+def test_match_scores_are_scaled_to_best_hit():
+    assert relevance_to_match_score([4.0, 2.0, 0.1]) == [99, 50, 2]
+
+
+def test_committed_jobs_update_loaded_index():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    job_index.load(db)
+    try:
+        db.add(sql_models.Job(id="x", title="Go Developer", company="A", location="Remote", matchScore=50,
+                              description="Golang services", requirements=["Go"], postedAt="today", type="Remote"))
+        db.commit()
+        assert job_index.search(["golang"])[0][0] == "x"
+        db.add(sql_models.Job(id="y", title="Golang Lead", company="B", location="Remote", matchScore=50,
+                              description="", requirements=[], postedAt="today", type="Remote"))
+        db.flush()
+        db.rollback()
+        assert [job_id for job_id, _ in job_index.search(["golang"])] == ["x"]
+    finally:
+        job_index.reset()
+        db.close()
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.main import app
+from app.matching import job_index
+from app.profiling import SlowRequestProfiler
+from app.seed import seed_jobs
+
+
+@pytest.fixture
+def client(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path}/metrics.db")
+    Base.metadata.create_all(bind=engine)
+    sessions = sessionmaker(bind=engine)
+    with sessions() as db:
+        seed_jobs(db)
+
+    def override_get_db():
+        with sessions() as db:
+            yield db
+
+    previous = app.dependency_overrides.get(get_db)
+    app.dependency_overrides[get_db] = override_get_db
+    job_index.reset()
+    yield TestClient(app)
+    if previous is None:
+        app.dependency_overrides.pop(get_db, None)
+    else:
+        app.dependency_overrides[get_db] = previous
+    job_index.reset()
+    engine.dispose()
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+def test_requests_labelled_by_route_template(client):
+    before = _sample("http_requests_total", method="GET", route="/api/jobs/{id}/applicants/count", status="404")
+    client.get("/api/jobs/missing/applicants/count")
+    after = _sample("http_requests_total", method="GET", route="/api/jobs/{id}/applicants/count", status="404")
+    assert after == before + 1
+    client.get("/no/such/path")
+    assert _sample("http_requests_total", method="GET", route="<unmatched>", status="404") >= 1
+
+    body = client.get("/metrics").text
+    assert 'http_request_duration_seconds_bucket{le="0.005",method="GET",route="/api/jobs/{id}/applicants/count"}' in body
+    assert "http_requests_in_progress" in body
+
+
+def test_db_queries_counted_per_request(client):
+    selects = _sample("db_queries_total", operation="SELECT")
+    response = client.get("/api/jobs")
+    assert _sample("db_queries_total", operation="SELECT") > selects
+    assert 'db;dur=' in response.headers["Server-Timing"]
+    assert _sample("http_request_db_queries_count", route="/api/jobs") >= 1
+    assert _sample("http_response_size_bytes_sum", method="GET", route="/api/jobs") >= len(response.content)
+
+
+def test_slow_request_profile_written(tmp_path):
+    profiler = SlowRequestProfiler(threshold_ms=1, sample_rate=1.0, interval_ms=1, directory=str(tmp_path))
+    sampler = profiler.begin()
+    # Only one request is sampled at a time.
+    assert profiler.begin() is None
+    time.sleep(0.05)
+    path = profiler.end(sampler, "GET", "/api/jobs/{id}", 50)
+    assert path and path.endswith("-GET-api_jobs_id-50ms.folded")
+    stack, count = open(path).readline().rsplit(" ", 1)
+    assert int(count) >= 1 and "(" in stack
+    # Fast requests are dropped.
+    assert profiler.end(profiler.begin(), "GET", "/", 0) is None
+    assert len(list(tmp_path.iterdir())) == 1
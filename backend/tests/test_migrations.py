@@ -0,0 +1,78 @@
+from sqlalchemy import create_engine, inspect, select, text
+from sqlalchemy.pool import StaticPool
+
+from app import sql_models
+from app.migrations import _index_names, run_migrations, schema_fingerprint
+
+LEGACY_JOBS = """
+CREATE TABLE jobs (
+    id VARCHAR NOT NULL, title VARCHAR, company VARCHAR, location VARCHAR, salary VARCHAR,
+    "matchScore" INTEGER, description TEXT, requirements JSON, "postedAt" VARCHAR, type VARCHAR,
+    PRIMARY KEY (id)
+)
+"""
+
+
+def _legacy_engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text(LEGACY_JOBS))
+    return engine
+
+
+def test_migrations_upgrade_legacy_schema_idempotently():
+    engine = _legacy_engine()
+    run_migrations(engine)
+    run_migrations(engine)
+    inspector = inspect(engine)
+    indexes = _index_names(engine, inspector, "jobs")
+    assert {"ix_jobs_type_match_score_id", "ix_jobs_salary_high_id", "ix_jobs_salary_low_id"} <= indexes
+    assert inspector.has_table("applications")
+
+
+def test_salary_backfill_runs_once_on_legacy_rows():
+    engine = _legacy_engine()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO jobs (id, title, salary) VALUES ('a', 'A', '$100k - $120k'), ('b', 'B', 'Competitive')"
+        ))
+    run_migrations(engine)
+    job = sql_models.Job.__table__
+    with engine.connect() as conn:
+        rows = dict(conn.execute(select(job.c.id, job.c.salary_max)).all())
+        applied = conn.execute(select(sql_models.SchemaMigration.name)).scalars().all()
+    assert rows == {"a": 120000, "b": None}
+    assert "0001_backfill_salaries" in applied
+
+
+def test_posted_at_backfill_converts_relative_strings():
+    engine = _legacy_engine()
+    with engine.begin() as conn:
+        conn.execute(text(
+            "INSERT INTO jobs (id, title, \"postedAt\") VALUES ('a', 'A', '2 days ago'), ('b', 'B', 'soon')"
+        ))
+    run_migrations(engine)
+    job = sql_models.Job.__table__
+    with engine.connect() as conn:
+        rows = dict(conn.execute(select(job.c.id, job.c.posted_at)).all())
+    assert (rows["b"] - rows["a"]).days == 2  # unparseable strings fall back to the migration time
+
+
+def test_up_to_date_database_skips_reflection():
+    engine = _legacy_engine()
+    assert run_migrations(engine) is True
+    assert run_migrations(engine) is False
+    names = set(engine.connect().execute(select(sql_models.SchemaMigration.name)).scalars())
+    assert schema_fingerprint() in names
+
+
+def test_full_text_index_covers_legacy_rows():
+    engine = _legacy_engine()
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO jobs (id, title, requirements) VALUES ('a', 'Kubernetes Wrangler', '[\"Go\"]')"))
+    run_migrations(engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO jobs (id, title) VALUES ('b', 'Kubernetes Admin')"))
+        matches = conn.execute(text("SELECT count(*) FROM jobs_fts WHERE jobs_fts MATCH 'kubernetes'")).scalar()
+        by_requirement = conn.execute(text("SELECT count(*) FROM jobs_fts WHERE jobs_fts MATCH 'go'")).scalar()
+    assert (matches, by_requirement) == (2, 1)
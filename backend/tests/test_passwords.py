@@ -0,0 +1,36 @@
+import asyncio
+
+import bcrypt
+
+from app import passwords
+from app.passwords import hash_password, verify_password, verify_password_async
+
+
+def test_hash_round_trip():
+    stored = hash_password("s3cret!")
+    assert stored != "s3cret!"
+    assert verify_password("s3cret!", stored) == (True, None)
+    assert verify_password("wrong", stored) == (False, None)
+
+
+def test_legacy_plaintext_is_upgraded():
+    ok, new_hash = verify_password("password123", "password123")
+    assert ok and new_hash.startswith("$argon2")
+    assert verify_password("nope", "password123") == (False, None)
+
+
+def test_other_scheme_or_cost_triggers_rehash(monkeypatch):
+    legacy = bcrypt.hashpw(b"pw", bcrypt.gensalt(4)).decode()
+    ok, new_hash = verify_password("pw", legacy)
+    assert ok and new_hash.startswith("$argon2")
+
+    monkeypatch.setattr(passwords, "PASSWORD_SCHEME", "bcrypt")
+    monkeypatch.setattr(passwords, "BCRYPT_ROUNDS", 5)
+    ok, new_hash = verify_password("pw", legacy)
+    assert ok and new_hash.startswith("$2b$05$")
+    assert verify_password("pw", new_hash) == (True, None)
+
+
+def test_unknown_account_fails_and_runs_on_hash_pool():
+    assert asyncio.run(verify_password_async("pw", None)) == (False, None)
+    assert passwords.get_executor()._max_workers == passwords.HASH_WORKERS
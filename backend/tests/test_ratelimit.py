@@ -0,0 +1,113 @@
+import secrets
+
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+
+from app import sql_models
+from app.database import Base
+from app.ratelimit import DatabaseBackend, Limit, MemoryBackend, RateLimiter, RateLimitMiddleware
+from app.security import issue_token, signing_key
+from app.upload_limit import UploadSizeLimitMiddleware
+
+
+def test_limit_parsing():
+    assert Limit.parse("10/60") == Limit(burst=10, per_second=10 / 60)
+    assert Limit.parse("off") is None
+
+
+def _exercise(backend):
+    limit = Limit(burst=2, per_second=1.0)
+    assert backend.take("k", limit, now=100.0) == 0
+    assert backend.take("k", limit, now=100.0) == 0
+    wait = backend.take("k", limit, now=100.0)
+    assert 0 < wait <= 1
+    # Half a second refills half a token: still short.
+    assert backend.take("k", limit, now=100.5) > 0
+    assert backend.take("k", limit, now=101.0) == 0
+    # Other clients have their own buckets.
+    assert backend.take("other", limit, now=101.0) == 0
+
+
+def test_memory_backend():
+    backend = MemoryBackend(max_clients=2)
+    _exercise(backend)
+    backend.take("third", Limit(1, 1.0), now=0)
+    assert len(backend._buckets) == 2
+
+
+def test_database_backend_shared_between_instances():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    _exercise(DatabaseBackend(lambda: engine))
+    # A second worker sees the same buckets.
+    other = DatabaseBackend(lambda: engine)
+    assert other.take("k", Limit(burst=2, per_second=1.0), now=101.0) > 0
+    other.reset()
+    assert other.take("k", Limit(burst=2, per_second=1.0), now=101.0) == 0
+
+
+def _upload_app(max_bytes=1000):
+    app = FastAPI()
+
+    @app.post("/api/resume/analyze")
+    async def analyze(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    limiter = RateLimiter({"analyze": "2/3600"}, MemoryBackend())
+    app.add_middleware(UploadSizeLimitMiddleware, max_bytes=max_bytes)
+    app.add_middleware(RateLimitMiddleware, limiter=limiter)
+    return TestClient(app)
+
+
+def test_rate_limit_middleware_answers_429_with_retry_after(monkeypatch):
+    client = _upload_app()
+    files = {"file": ("r.txt", b"x", "text/plain")}
+    assert client.post("/api/resume/analyze", files=files).status_code == 200
+    assert client.post("/api/resume/analyze", files=files).status_code == 200
+    response = client.post("/api/resume/analyze", files=files)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
+    # A signed-in user is their own client; a made-up token is not.
+    monkeypatch.setattr(signing_key, "_key", b"test-key")
+    token = issue_token(sql_models.User(id="user-1"), db=None)
+    assert client.post("/api/resume/analyze", files=files, headers={"Authorization": "Bearer abc"}).status_code == 429
+    assert client.post("/api/resume/analyze", files=files, headers={"Authorization": f"Bearer {token}"}).status_code == 200
+
+
+def test_made_up_tokens_do_not_escape_the_login_limit(monkeypatch):
+    monkeypatch.setattr(signing_key, "_key", b"test-key")
+    app = FastAPI()
+
+    @app.post("/auth/login")
+    def login():
+        return {}
+
+    app.add_middleware(RateLimitMiddleware, limiter=RateLimiter({"login": "3/60"}, MemoryBackend()))
+    client = TestClient(app)
+    statuses = [
+        client.post("/auth/login", headers={"Authorization": f"Bearer {secrets.token_urlsafe(16)}"}).status_code
+        for _ in range(5)
+    ]
+    assert statuses == [200, 200, 200, 429, 429]
+    # Even a genuine token shares the address's login budget.
+    token = issue_token(sql_models.User(id="user-1"), db=None)
+    assert client.post("/auth/login", headers={"Authorization": f"Bearer {token}"}).status_code == 429
+
+
+def test_upload_size_limit_by_header_and_while_streaming():
+    client = _upload_app(max_bytes=1000)
+    declared = client.post("/api/resume/analyze", files={"file": ("r.txt", b"x" * 5000, "text/plain")})
+    assert declared.status_code == 413
+
+    def chunks():
+        yield b"--b\r\nContent-Disposition: form-data; name=\"file\"; filename=\"r.txt\"\r\n\r\n"
+        for _ in range(10):
+            yield b"y" * 500
+        yield b"\r\n--b--\r\n"
+
+    streamed = client.post(
+        "/api/resume/analyze", content=chunks(), headers={"Content-Type": "multipart/form-data; boundary=b"}
+    )
+    assert streamed.status_code == 413
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+
+from app.recency import decay_factors, humanize_age, parse_posted_at
+
+NOW = datetime(2025, 6, 15, 12, 0, tzinfo=timezone.utc)
+
+
+def test_parse_relative_and_absolute_dates():
+    assert parse_posted_at("2 days ago", NOW) == NOW - timedelta(days=2)
+    assert parse_posted_at("1 week ago", NOW) == NOW - timedelta(weeks=1)
+    assert parse_posted_at("an hour ago", NOW) == NOW - timedelta(hours=1)
+    assert parse_posted_at("30+ days ago", NOW) == NOW - timedelta(days=30)
+    assert parse_posted_at("yesterday", NOW) == NOW - timedelta(days=1)
+    assert parse_posted_at("2025-06-01", NOW) == datetime(2025, 6, 1, tzinfo=timezone.utc)
+    assert parse_posted_at("whenever", NOW) is None
+
+
+def test_humanize_age_round_trips_common_strings():
+    for text in ("today", "1 day ago", "3 days ago", "1 week ago", "2 months ago"):
+        assert humanize_age(parse_posted_at(text, NOW), NOW) == text
+    assert humanize_age(datetime(2025, 6, 13, 12, 0), NOW) == "2 days ago"  # naive values are UTC
+
+
+def test_decay_prefers_fresh_postings():
+    now = NOW.timestamp()
+    posted = np.array([now, now - 10 * 86400, now - 100 * 86400, np.nan, now + 86400])
+    fresh, ten, hundred, unknown, future = decay_factors(posted, now)
+    assert fresh == unknown == future == 1.0
+    assert fresh > ten > hundred >= 0.7
@@ -0,0 +1,77 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import catalog, sql_models
+from app.database import Base
+from app.matching import job_index
+from app.recommendations import RecommendationRefresher, read, record_resume
+from app.seed import seed_jobs
+
+
+def _sessions():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    factory = sessionmaker(bind=engine)
+    with factory() as db:
+        seed_jobs(db)
+        db.add(sql_models.User(id="u1", email="u1@example.com", username="u1", password="x"))
+        db.commit()
+    job_index.reset()
+    return factory
+
+
+def test_job_writes_bump_catalog_version():
+    factory = _sessions()
+    with factory() as db:
+        before = catalog.current(db)
+        db.get(sql_models.Job, "1").title = "Renamed"
+        db.rollback()
+        assert catalog.current(db) == before
+        db.get(sql_models.Job, "1").title = "Renamed"
+        db.commit()
+        assert catalog.current(db) == before + 1
+
+
+def test_refresher_materialises_and_refreshes_stale_rows():
+    factory = _sessions()
+    refresher = RecommendationRefresher(interval=60, session_factory=factory)
+    with factory() as db:
+        assert record_resume(db, "u1", "hash-a", ["kubernetes", "aws"])
+        refresher.enqueue("u1")
+        assert refresher.run_pending() == 1
+        first = read(db, "u1")
+        assert first.items and not first.stale
+        assert first.resumeHash == "hash-a"
+        # Same resume again: nothing to recompute.
+        assert not record_resume(db, "u1", "hash-a", ["kubernetes", "aws"])
+
+        db.add(sql_models.Job(id="k8s", title="Kubernetes AWS Engineer", company="Ops", location="Remote",
+                              description="kubernetes aws", requirements=["kubernetes", "aws"], type="Remote"))
+        db.commit()
+        assert read(db, "u1").stale
+        assert refresher.run_pending() == 1
+        db.expire_all()
+        refreshed = read(db, "u1")
+        assert not refreshed.stale
+        assert "k8s" in [job.id for job in refreshed.items]
+
+        # A new resume replaces the old row; reads wait for the refresher rather than ranking themselves.
+        assert record_resume(db, "u1", "hash-b", ["terraform"])
+        assert db.query(sql_models.UserRecommendation).count() == 1
+        pending = read(db, "u1")
+        assert pending.resumeHash == "hash-b" and pending.items == [] and pending.stale
+        refresher.enqueue("u1")
+        assert refresher.run_pending() == 1
+        db.expire_all()
+        assert read(db, "u1").items
+    job_index.reset()
+
+
+def test_refresher_thread_starts_and_stops():
+    refresher = RecommendationRefresher(interval=0.01, session_factory=_sessions())
+    refresher.start()
+    refresher.enqueue("u1")
+    refresher.stop()
+    assert refresher._thread is None
+    job_index.reset()
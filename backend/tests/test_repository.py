@@ -0,0 +1,286 @@
+"""Conformance: the SQL and in-memory job repositories answer alike."""
+import asyncio
+import threading
+from datetime import timedelta
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
+
+from app import catalog, sql_models
+from app.api.jobs import JobFilters, _listing_etag
+from app.database import Base
+from app.matching import job_index
+from app.models import JobSort, JobType
+from app.pagination import encode_cursor
+from app.recency import utcnow
+from app.repository import MemoryJobRepository, SqlJobRepository, memory_runner, runs_inline
+
+TITLES = ["Backend Engineer", "Frontend Developer", "Data Scientist", "DevOps Engineer", "Café Manager"]
+REQUIREMENTS = [
+    ["Python/Django", "PostgreSQL"],
+    ["React/TypeScript", "CSS"],
+    ["Python", "Machine Learning", "SQL"],
+    ["Kubernetes", "AWS/GCP", "Terraform"],
+    ["3+ years experience"],
+]
+NOW = utcnow().replace(tzinfo=None, microsecond=0)
+
+
+def _salary(i):
+    if i % 6 == 0:
+        return None
+    # Open-ended postings parse with a single bound.
+    if i % 10 == 3:
+        return f"${100 + i},000+"
+    if i % 10 == 5:
+        return f"Up to ${70 + i},000"
+    return f"${80 + i},000 - ${110 + i},000"
+
+
+def _jobs():
+    types = list(JobType)
+    return [
+        sql_models.Job(
+            id=f"job-{i:02d}",
+            title=TITLES[i % 5],
+            company=["Acme", "Globex", "Initech"][i % 3],
+            location=["Remote", "Berlin"][i % 2],
+            salary=_salary(i),
+            matchScore=50 + (i * 7) % 30,
+            description=f"Build {TITLES[i % 5].lower()} tooling for team {i % 4} with kubernetes and python.",
+            requirements=REQUIREMENTS[i % 5],
+            postedAt="",
+            posted_at=NOW - timedelta(days=i % 9, hours=i),
+            type=types[i % len(types)],
+        )
+        for i in range(45)
+    ]
+
+
+def _filters(**values):
+    fields = (
+        "type", "location", "company", "min_match_score", "min_salary", "max_salary", "currency",
+        "posted_within_days", "skill",
+    )
+    return JobFilters(**{field: values.get(field) for field in fields})
+
+
+FILTERS = [
+    {},
+    {"type": JobType.FULL_TIME},
+    {"company": "Globex", "location": "Remote"},
+    {"min_salary": 100000, "max_salary": 120000, "currency": "usd"},
+    {"min_salary": 135000},
+    {"max_salary": 95000},
+    {"min_match_score": 70, "posted_within_days": 4},
+    {"skill": ["python"]},
+    {"skill": ["Python", "sql"], "company": "Initech"},
+    {"company": "Nobody"},
+]
+
+
+@pytest.fixture
+def backends():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    db = sessionmaker(bind=engine)()
+    sql = SqlJobRepository(db)
+    sql.add(_jobs())
+    yield sql, MemoryJobRepository(_jobs())
+    db.close()
+    job_index.reset()
+    catalog.clear_cache()
+
+
+def _walk(repository, filters, sort, limit=4):
+    """Every page of a listing, as (ids, cursor) pairs."""
+    pages, cursor = [], None
+    while True:
+        rows, cursor = repository.page(filters, sort, cursor, limit)
+        pages.append(([job.id for job in rows], cursor))
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize("sort", list(JobSort))
+@pytest.mark.parametrize("values", FILTERS)
+def test_pages_and_cursors_match(backends, sort, values):
+    sql, memory = backends
+    expected = _walk(sql, _filters(**values), sort)
+    assert _walk(memory, _filters(**values), sort) == expected
+    # Cursors are interchangeable, so a client is never tied to one backend.
+    if len(expected) > 1:
+        cursor = expected[0][1]
+        assert [job.id for job in memory.page(_filters(**values), sort, cursor, 4)[0]] == expected[1][0]
+
+
+def test_page_orders_and_skips_missing_keys(backends):
+    _, memory = backends
+    ids = [job_id for page, _ in _walk(memory, _filters(), JobSort.SALARY_ASC) for job_id in page]
+    jobs = memory.get_many(ids)
+    assert len(ids) == len([job for job in _jobs() if job.salary])
+    keys = [(jobs[job_id].salary_low, job_id) for job_id in ids]
+    assert keys == sorted(keys)
+
+
+def test_open_ended_salaries_filter_and_sort(backends):
+    for repository in backends:
+        # "$143,000+" overlaps 135k and up; "Up to $105,000" does not.
+        ids = [job_id for page, _ in _walk(repository, _filters(min_salary=135000), JobSort.MATCH) for job_id in page]
+        assert "job-43" in ids and "job-35" not in ids
+        ids = [job_id for page, _ in _walk(repository, _filters(max_salary=95000), JobSort.MATCH) for job_id in page]
+        assert "job-35" in ids and "job-43" not in ids
+        # Both sorts keep them, placed by the bound they advertise.
+        for sort in (JobSort.SALARY_DESC, JobSort.SALARY_ASC):
+            ids = [job_id for page, _ in _walk(repository, _filters(), sort) for job_id in page]
+            assert {"job-43", "job-35"} <= set(ids)
+            jobs = repository.get_many(ids)
+            key = "salary_high" if sort is JobSort.SALARY_DESC else "salary_low"
+            keys = [getattr(jobs[job_id], key) for job_id in ids]
+            assert keys == sorted(keys, reverse=sort is JobSort.SALARY_DESC)
+
+
+def test_cursor_past_unkeyed_rows_is_the_end(backends):
+    cursor = encode_cursor({"matchScore": None, "id": "job-00"})
+    for repository in backends:
+        assert repository.page(_filters(), JobSort.MATCH, cursor, 5) == ([], None)
+
+
+def test_get_and_get_many(backends):
+    for repository in backends:
+        assert repository.get("job-03").title == "DevOps Engineer"
+        assert repository.get("missing") is None
+        assert sorted(repository.get_many(["job-01", "missing", "job-02"])) == ["job-01", "job-02"]
+        assert repository.get("job-07").salary_min == 87000
+
+
+@pytest.mark.parametrize("words,prefix", [
+    (["python"], False), (["kube"], True), (["engineer", "acme"], False), (["cafe"], False), (["nothing"], False),
+])
+def test_search_finds_the_same_jobs(backends, words, prefix):
+    sql, memory = backends
+    filters = _filters()
+    expected = {job.id for job in sql.search(words, prefix, filters, 0, 100)}
+    assert {job.id for job in memory.search(words, prefix, filters, 0, 100)} == expected
+    remote = _filters(location="Remote")
+    assert {job.id for job in memory.search(words, prefix, remote, 0, 100)} == {
+        job.id for job in sql.search(words, prefix, remote, 0, 100)
+    }
+
+
+def test_search_ranks_title_matches_first(backends):
+    _, memory = backends
+    hits = memory.search(["devops"], False, _filters(), 0, 5)
+    assert hits and all(job.title == "DevOps Engineer" for job in hits)
+
+
+@pytest.mark.parametrize("values", [{}, {"company": "Acme"}])
+def test_skill_matches_agree(backends, values):
+    sql, memory = backends
+    names = ["python", "sql", "react"]
+    expected = [(job.id, count) for job, count in sql.skill_matches(names, _filters(**values), 0, 100)]
+    assert expected and expected[0][1] == 2
+    assert [(job.id, count) for job, count in memory.skill_matches(names, _filters(**values), 0, 100)] == expected
+    assert [(job.id, count) for job, count in memory.skill_matches(names, _filters(**values), 3, 4)] == expected[3:7]
+
+
+def test_rank_and_matrix_agree(backends):
+    sql, memory = backends
+    for filters in (None, _filters(type=JobType.CONTRACT)):
+        expected = sql.rank(["kubernetes", "terraform"], filters, 10)
+        hits = memory.rank(["kubernetes", "terraform"], filters, 10)
+        assert [job_id for job_id, _ in hits] == [job_id for job_id, _ in expected]
+        assert [score for _, score in hits] == pytest.approx([score for _, score in expected])
+    assert sorted(memory.matrix().job_ids) == sorted(sql.matrix().job_ids)
+
+
+def test_writes_are_visible_and_bump_the_version(backends):
+    for repository in backends:
+        version = repository.version()
+        job = _jobs()[0]
+        job.title, job.matchScore, job.requirements = "Golang Developer", 99, ["Go"]
+        repository.add([job])
+        assert repository.version() > version
+        assert repository.page(_filters(), JobSort.MATCH, None, 1)[0][0].id == "job-00"
+        assert [job.id for job, _ in repository.skill_matches(["go"], _filters(), 0, 10)] == ["job-00"]
+        assert [job.id for job in repository.search(["golang"], False, _filters(), 0, 10)] == ["job-00"]
+        assert repository.rank(["golang"], None, 5)[0][0] == "job-00"
+
+        version = repository.version()
+        repository.remove(["job-00", "job-01"])
+        assert repository.version() > version
+        assert repository.get("job-00") is None
+        assert repository.search(["golang"], False, _filters(), 0, 10) == []
+        assert repository.rank(["golang"], None, 5) == []
+    sql, memory = backends
+    assert _walk(memory, _filters(), JobSort.RECENT) == _walk(sql, _filters(), JobSort.RECENT)
+
+
+def test_rank_reloads_after_another_workers_write(backends, monkeypatch):
+    sql, _ = backends
+    sql.rank(["kubernetes"], None, 5)
+    loads = []
+    load = job_index.load
+    monkeypatch.setattr(job_index, "load", lambda db: loads.append(1) or load(db))
+
+    # This process's own writes reach the index through the Session hooks.
+    job = _jobs()[0]
+    job.title, job.requirements = "Golang Developer", ["Go"]
+    sql.add([job])
+    assert sql.rank(["golang"], None, 5)[0][0] == "job-00"
+    assert loads == []
+
+    # Another worker's: only the catalog version tells.
+    with sql.db.get_bind().begin() as conn:
+        conn.execute(text("UPDATE jobs SET title = 'Rust Developer' WHERE id = 'job-01'"))
+        conn.execute(text("UPDATE catalog_versions SET version = version + 1 WHERE name = 'jobs'"))
+    catalog.clear_cache()
+    sql.db.expire_all()
+    assert sql.rank(["rust"], None, 5)[0][0] == "job-01"
+    assert loads == [1]
+
+
+def test_memory_writes_go_through_sql_first(backends):
+    sql, _ = backends
+    memory = MemoryJobRepository()
+    memory.load(sql.db.get_bind())
+    row = {column.key: getattr(_jobs()[0], column.key) for column in sql_models.Job.__table__.columns}
+    memory.write_rows([{**row, "id": "job-new", "title": "Golang Developer", "posted_at": None}])
+
+    stored = sql.get("job-new")
+    assert stored is not None and stored.title == "Golang Developer"
+    # Memory holds what SQL stored, the date it assigned included.
+    assert memory.get("job-new").posted_at == stored.posted_at
+
+
+def test_memory_runner_keeps_only_marked_calls_on_the_event_loop():
+    run = memory_runner(MemoryJobRepository(_jobs()))
+
+    def thread(jobs):
+        return threading.get_ident()
+
+    async def both():
+        return threading.get_ident(), await run(runs_inline(lambda jobs: threading.get_ident())), await run(thread)
+
+    loop, inline, offloaded = asyncio.run(both())
+    assert inline == loop
+    assert offloaded != loop
+
+
+def test_memory_version_survives_a_restart(backends):
+    sql, _ = backends
+    request = Request({"type": "http", "query_string": b"limit=5"})
+    memory = MemoryJobRepository()
+    memory.load(sql.db.get_bind())
+    before, etag = memory.version(), _listing_etag(memory, request)
+    row = {column.key: getattr(_jobs()[0], column.key) for column in sql_models.Job.__table__.columns}
+    memory.write_rows([{**row, "id": "job-new"}])
+    assert memory.version() > before
+
+    restarted = MemoryJobRepository()
+    restarted.load(sql.db.get_bind())
+    assert restarted.version() == memory.version() == catalog.current(sql.db)
+    assert _listing_etag(restarted, request) != etag
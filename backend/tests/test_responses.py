@@ -0,0 +1,52 @@
+import json
+from datetime import datetime, timezone
+from typing import List
+
+from pydantic import TypeAdapter
+
+from app import sql_models
+from app.models import Job, JobPage
+from app.responses import json_response, matches_etag, not_modified, weak_etag
+
+
+def _row(**overrides):
+    fields = dict(
+        id="1", title="Engineer", company="Acme", location="Remote", salary="$100k - $120k",
+        salary_min=100000, salary_max=120000, salary_currency="USD", matchScore=80,
+        description="Build things", requirements=["python"], postedAt="2 days ago",
+        posted_at=datetime(2024, 1, 1, tzinfo=timezone.utc), type="Full-time",
+    )
+    fields.update(overrides)
+    return sql_models.Job(**fields)
+
+
+def test_payload_encodes_like_the_validated_model():
+    rows = [_row(), _row(id="2", salary=None, salary_min=None, salary_max=None, salary_currency=None, posted_at=None)]
+    fast = json.loads(json_response([Job.payload(row, match_score=55) for row in rows]).body)
+    validated = TypeAdapter(List[Job]).dump_python([Job.from_row(row, 55) for row in rows], mode="json")
+    assert fast == validated
+    assert fast[0]["postedDate"] == "2024-01-01T00:00:00Z"
+
+
+def test_models_and_headers():
+    page = JobPage(items=[Job.from_row(_row())], nextCursor="abc")
+    response = json_response(page, headers={"X-Next-Cursor": "abc"})
+    assert response.media_type == "application/json"
+    assert response.headers["X-Next-Cursor"] == "abc"
+    assert json.loads(response.body) == page.model_dump(mode="json")
+
+
+def test_if_none_match_uses_weak_comparison():
+    from starlette.requests import Request
+
+    def request(value):
+        return Request({"type": "http", "headers": [(b"if-none-match", value.encode())] if value else []})
+
+    etag = weak_etag("jobs", 3)
+    assert etag == weak_etag("jobs", 3) != weak_etag("jobs", 4)
+    assert matches_etag(request(etag), etag)
+    assert matches_etag(request(f'"other", {etag.removeprefix("W/")}'), etag)
+    assert matches_etag(request("*"), etag)
+    assert not matches_etag(request('W/"other"'), etag)
+    assert not matches_etag(request(""), etag)
+    assert not_modified(etag, "no-cache").status_code == 304
@@ -0,0 +1,23 @@
+import pytest
+
+from app.salary import ParsedSalary, parse_salary
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("$150,000 - $200,000", ParsedSalary(150000, 200000, "USD")),
+    ("$120k-$160k", ParsedSalary(120000, 160000, "USD")),
+    ("£40,000 to £55,000 per year", ParsedSalary(40000, 55000, "GBP")),
+    ("EUR 60.000 - 70.000", ParsedSalary(60000, 70000, "EUR")),
+    ("€45/hr", ParsedSalary(93600, 93600, "EUR")),
+    ("$8,000 - $10,000 per month", ParsedSalary(96000, 120000, "USD")),
+    ("Up to $90k", ParsedSalary(None, 90000, "USD")),
+    ("$100,000+", ParsedSalary(100000, None, "USD")),
+    ("CA$95,000", ParsedSalary(95000, 95000, "CAD")),
+])
+def test_parse_salary(text, expected):
+    assert parse_salary(text) == expected
+
+
+@pytest.mark.parametrize("text", [None, "", "Competitive", "DOE"])
+def test_unparseable_salary(text):
+    assert parse_salary(text) is None
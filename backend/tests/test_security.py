@@ -0,0 +1,58 @@
+import time
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import security, sql_models
+from app.database import Base
+from app.security import InvalidToken, RevocationList, SigningKey, decode_token, issue_token
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite:///:memory:", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def test_token_round_trip_without_user_lookup(db):
+    user = sql_models.User(id="u1", email="a@example.com", username="a")
+    claims = decode_token(issue_token(user, db), db)
+    assert claims["sub"] == "u1"
+    assert claims["exp"] > time.time()
+
+
+def test_expired_and_malformed_tokens_rejected(db, monkeypatch):
+    user = sql_models.User(id="u1", email="a@example.com", username="a")
+    monkeypatch.setattr(security, "TOKEN_TTL_SECONDS", -1)
+    with pytest.raises(InvalidToken):
+        decode_token(issue_token(user, db), db)
+    for token in ("", "abc", "a.b.c", "!!!.???"):
+        with pytest.raises(InvalidToken):
+            decode_token(token, db)
+
+
+def test_generated_key_is_shared_through_database(db):
+    if security.SECRET_KEY:
+        pytest.skip("SECRET_KEY is set")
+    first, second = SigningKey(), SigningKey()
+    assert first.get(db) == second.get(db)
+    assert db.query(sql_models.ServerSecret).count() == 1
+
+
+def test_revocation_list_syncs_from_table(db):
+    writer, reader = RevocationList(sync_interval=0), RevocationList(sync_interval=0)
+    claims = {"jti": "abc", "exp": int(time.time()) + 60}
+    assert not reader.is_revoked("abc", db)
+    writer.revoke(claims, db)
+    assert writer.is_revoked("abc", db)
+    assert reader.is_revoked("abc", db)
+    # Expired revocations are pruned from the table and the mirror.
+    writer.revoke({"jti": "old", "exp": int(time.time()) - 1}, db)
+    writer.revoke({"jti": "new", "exp": int(time.time()) + 60}, db)
+    assert db.get(sql_models.RevokedToken, "old") is None
+    assert not reader.is_revoked("old", db)
@@ -0,0 +1,99 @@
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import pytest
+
+from app import serve
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+
+def test_shared_state_defaults():
+    assert serve.shared_state_defaults(1, 8) == {}
+    defaults = serve.shared_state_defaults(4, 8)
+    assert defaults["RATE_LIMIT_BACKEND"] == "database"
+    assert defaults["RESUME_CACHE_PERSIST"] == "1"
+    assert defaults["ANALYSIS_WORKERS"] == defaults["HASH_WORKERS"] == "2"
+    assert serve.shared_state_defaults(16, 4)["ANALYSIS_WORKERS"] == "1"
+
+
+def test_memory_catalog_needs_a_single_worker(monkeypatch):
+    monkeypatch.setenv("JOB_REPOSITORY", "memory")
+    with pytest.raises(SystemExit) as exc:
+        serve.main(["--workers", "2"])
+    assert exc.value.code == 2
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for(predicate, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.1)
+    return False
+
+
+def _alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A zombie still answers kill(); it has exited all the same.
+    try:
+        return Path(f"/proc/{pid}/stat").read_text().split()[2] != "Z"
+    except OSError:
+        return True
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="the launcher forks its workers")
+def test_workers_serve_restart_and_stop_gracefully(tmp_path):
+    port = _free_port()
+    log = tmp_path / "serve.log"
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path}/serve.db", "SECRET_KEY": "test-secret"}
+    env.pop("PROMETHEUS_MULTIPROC_DIR", None)
+    with open(log, "w") as out:
+        master = subprocess.Popen(
+            [sys.executable, "-m", "app.serve", "--host", "127.0.0.1", "--port", str(port), "--workers", "2",
+             "--graceful-timeout", "5"],
+            cwd=BACKEND, env=env, stdout=out, stderr=subprocess.STDOUT,
+        )
+
+    def started():
+        return [int(pid) for pid in re.findall(r"worker (\d+) started", log.read_text())]
+
+    def get(path):
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}{path}", timeout=5) as response:
+            return response.status, response.read()
+
+    try:
+        assert _wait_for(lambda: log.read_text().count("Application startup complete") == 2), log.read_text()
+        assert all(get("/api/jobs")[0] == 200 for _ in range(4))
+        # Counted by whichever worker served them, reported together. A request
+        # is counted once its response is sent, so the last may lag a moment.
+        assert _wait_for(lambda: b'route="/api/jobs",status="200"} 4.0' in get("/metrics")[1], timeout=5)
+
+        first, second = started()
+        os.kill(first, signal.SIGKILL)
+        assert _wait_for(lambda: len(started()) == 3), log.read_text()
+        assert get("/")[0] == 200
+
+        master.send_signal(signal.SIGTERM)
+        assert master.wait(timeout=30) == 0
+        assert not any(_alive(pid) for pid in started()[1:])
+    finally:
+        if master.poll() is None:
+            master.kill()
+            master.wait()
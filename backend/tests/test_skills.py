@@ -0,0 +1,74 @@
+import io
+import json
+
+from sqlalchemy import create_engine, select, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app import skills, sql_models
+from app.database import Base
+from app.ingest import ingest_stream
+from app.migrations import run_migrations
+
+
+def _session():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)()
+
+
+def _skills_of(db, job_id):
+    return sorted(db.scalars(
+        select(sql_models.Skill.name)
+        .join(sql_models.JobSkill, sql_models.JobSkill.skill_id == sql_models.Skill.id)
+        .where(sql_models.JobSkill.job_id == job_id)
+    ))
+
+
+def test_canonicalize_splits_compounds_and_maps_aliases():
+    assert skills.canonicalize(["5+ years experience", "React/TypeScript", "AWS/GCP"]) == [
+        "react", "typescript", "aws", "gcp"
+    ]
+    assert skills.canonicalize(["Golang, Postgres & k8s", "Machine Learning and NLP"]) == [
+        "go", "postgresql", "kubernetes", "machine-learning", "nlp"
+    ]
+    # Names containing a separator stay whole; duplicates collapse.
+    assert skills.canonicalize(["CI/CD", "C++", "Node.js", "nodejs", "REST APIs"]) == ["ci/cd", "c++", "node.js", "rest"]
+    assert skills.canonicalize(None) == []
+
+
+def test_orm_writes_keep_job_skills_in_sync():
+    db = _session()
+    db.add(sql_models.Job(id="a", title="A", requirements=["Python/Django", "AWS"]))
+    db.add(sql_models.Job(id="b", title="B", requirements=["python"]))
+    db.commit()
+    assert _skills_of(db, "a") == ["aws", "django", "python"]
+    # One skills row per canonical name, shared across jobs.
+    assert db.scalars(select(sql_models.Skill.name)).all().count("python") == 1
+
+    db.get(sql_models.Job, "a").requirements = ["Kubernetes"]
+    db.commit()
+    assert _skills_of(db, "a") == ["kubernetes"]
+    db.delete(db.get(sql_models.Job, "b"))
+    db.commit()
+    assert _skills_of(db, "b") == []
+
+
+def test_ingest_upserts_rewrite_job_skills():
+    db = _session()
+    record = {"id": "j1", "title": "Dev", "company": "Acme", "requirements": ["React/Redux"]}
+    ingest_stream(db, io.StringIO(json.dumps(record) + "\n"))
+    assert _skills_of(db, "j1") == ["react", "redux"]
+    ingest_stream(db, io.StringIO(json.dumps({**record, "requirements": "Vue.js; SQL"}) + "\n"))
+    assert _skills_of(db, "j1") == ["sql", "vue"]
+
+
+def test_migration_backfills_existing_jobs():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE jobs (id VARCHAR PRIMARY KEY, title VARCHAR, requirements JSON)"))
+        conn.execute(text("""INSERT INTO jobs VALUES ('a', 'A', '["AWS/GCP", "3+ years"]'), ('b', 'B', NULL)"""))
+    run_migrations(engine)
+    db = sessionmaker(bind=engine)()
+    assert _skills_of(db, "a") == ["aws", "gcp"]
+    assert _skills_of(db, "b") == []
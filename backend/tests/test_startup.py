@@ -0,0 +1,29 @@
+import threading
+
+from sqlalchemy import func, select
+
+from app import sql_models
+from app.database import make_engine
+from app.startup import prepare_database
+
+
+def test_concurrent_workers_migrate_and_seed_once(tmp_path):
+    engine = make_engine(f"sqlite:///{tmp_path}/boot.db")
+    errors = []
+
+    def boot():
+        try:
+            prepare_database(engine)
+        except Exception as exc:
+            errors.append(exc)
+
+    workers = [threading.Thread(target=boot) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    assert errors == []
+    with engine.connect() as conn:
+        assert conn.execute(select(func.count()).select_from(sql_models.Job)).scalar() == 5
+    assert (tmp_path / "boot.db.startup.lock").exists()
+    engine.dispose()
@@ -6,6 +6,8 @@ import pytest
 from app.main import app
 from app.database import Base, get_db
 from app import sql_models
+from app.ratelimit import limiter
+from app.seed import seed_jobs
 
 # Use a separate in-memory DB for integration tests to ensure isolation
 SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
@@ -21,6 +23,8 @@ TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engin
 def db_engine():
     # Create tables once for the session
     Base.metadata.create_all(bind=engine)
+    with TestingSessionLocal() as db:
+        seed_jobs(db)
     yield engine
     Base.metadata.drop_all(bind=engine)
 
@@ -43,6 +47,7 @@ def client(db_session):
         yield db_session
         
     app.dependency_overrides[get_db] = override_get_db
+    limiter.reset()
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
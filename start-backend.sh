@@ -1,4 +1,5 @@
 #!/usr/bin/env bash
 # Start script for Render deployment
 
-uvicorn backend.app.main:app --host 0.0.0.0 --port $PORT
+# Preforked workers (WEB_CONCURRENCY, default one per core); see backend/app/serve.py.
+exec python -m backend.app.serve --host 0.0.0.0 --port $PORT